@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import re
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from os import path as osp
 
@@ -14,7 +15,7 @@ from mmdet3d.core import (Box3DMode, CameraInstance3DBoxes, Coord3DMode,
                           show_multi_modality_result, show_result,
                           show_seg_result)
 from mmdet3d.core.bbox import get_box_type
-from mmdet3d.datasets.pipelines import Compose
+from mmdet3d.datasets.pipelines import Compose, LoadPointsFromFile
 from mmdet3d.models import build_model
 from mmdet3d.utils import get_root_logger
 
@@ -152,6 +153,135 @@ def inference_detector(model, pcd):
     return result, data
 
 
+class InferenceSession(object):
+    """Run a detector on batches of point clouds.
+
+    Unlike :func:`inference_detector`, the test pipeline and the box types
+    are built once, the point clouds are forwarded in batches, and the next
+    batch is preprocessed by a thread pool while the current one is
+    forwarded. The transforms of the pipeline are shared by the threads.
+
+    Examples:
+        >>> model = init_model(config, checkpoint, device='cuda:0')
+        >>> with InferenceSession(model, batch_size=8) as session:
+        >>>     results = session(['000000.bin', '000001.bin'])
+
+    Args:
+        model (nn.Module): The loaded detector.
+        batch_size (int, optional): Number of point clouds forwarded
+            together. Defaults to 8.
+        num_workers (int, optional): Number of threads preprocessing the
+            point clouds. Defaults to 2.
+    """
+
+    def __init__(self, model, batch_size=8, num_workers=2):
+        self.model = model
+        self.batch_size = batch_size
+        self.device = next(model.parameters()).device
+        cfg = model.cfg
+        self.pipeline = Compose(deepcopy(cfg.data.test.pipeline))
+        self.loader = self.pipeline.transforms[0]
+        assert isinstance(self.loader, LoadPointsFromFile), \
+            'the test pipeline should start with LoadPointsFromFile'
+        # applied to the points given as arrays or BasePoints
+        self.points_pipeline = Compose(self.pipeline.transforms[1:])
+        self.box_type_3d, self.box_mode_3d = get_box_type(
+            cfg.data.test.box_type_3d)
+        self._pool = ThreadPoolExecutor(num_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Shut down the preprocessing threads."""
+        self._pool.shutdown()
+
+    def preprocess(self, pcd):
+        """Run the test pipeline on a point cloud.
+
+        Args:
+            pcd (str | np.ndarray | :obj:`BasePoints`): Point cloud file, or
+                its points with the ``load_dim`` values of the loading
+                transform per point, or the loaded points.
+
+        Returns:
+            dict: Data from the pipeline.
+        """
+        data = dict(
+            box_type_3d=self.box_type_3d,
+            box_mode_3d=self.box_mode_3d,
+            # for ScanNet demo we need axis_align_matrix
+            ann_info=dict(axis_align_matrix=np.eye(4)),
+            sweeps=[],
+            # set timestamp = 0
+            timestamp=[0],
+            img_fields=[],
+            bbox3d_fields=[],
+            pts_mask_fields=[],
+            pts_seg_fields=[],
+            bbox_fields=[],
+            mask_fields=[],
+            seg_fields=[])
+        if isinstance(pcd, str):
+            data['pts_filename'] = pcd
+            return self.pipeline(data)
+        if isinstance(pcd, np.ndarray):
+            pcd = self.loader.format_points(pcd)
+        data['points'] = pcd
+        return self.points_pipeline(data)
+
+    def _submit(self, pcds):
+        return [self._pool.submit(self.preprocess, pcd) for pcd in pcds]
+
+    def forward(self, samples):
+        """Forward a batch of preprocessed point clouds.
+
+        Args:
+            samples (list[dict]): Data from the pipeline.
+
+        Returns:
+            list[dict]: Predicted results of the point clouds.
+        """
+        data = collate(samples, samples_per_gpu=len(samples))
+        if self.device.type == 'cuda':
+            # scatter to specified GPU
+            data = scatter(data, [self.device.index])[0]
+        else:
+            # this is a workaround to avoid the bug of MMDataParallel
+            data['img_metas'] = data['img_metas'][0].data
+            data['points'] = data['points'][0].data
+        with torch.no_grad():
+            return self.model(return_loss=False, rescale=True, **data)
+
+    def __call__(self, pcds):
+        """Inference point clouds with the detector.
+
+        Args:
+            pcds (list[str | np.ndarray | :obj:`BasePoints`]): Point clouds,
+                see :meth:`preprocess`.
+
+        Returns:
+            list[dict]: Predicted results of the point clouds.
+        """
+        results = []
+        batches = [
+            pcds[i:i + self.batch_size]
+            for i in range(0, len(pcds), self.batch_size)
+        ]
+        if len(batches) == 0:
+            return results
+        pending = self._submit(batches[0])
+        for i in range(len(batches)):
+            samples = [future.result() for future in pending]
+            if i + 1 < len(batches):
+                pending = self._submit(batches[i + 1])
+            results.extend(self.forward(samples))
+        return results
+
+
 def inference_multi_modality_detector(model, pcd, image, ann_file):
     """Inference point cloud with the multi-modality detector.
 
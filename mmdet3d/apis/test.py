@@ -4,6 +4,7 @@ from os import path as osp
 import mmcv
 import torch
 from mmcv.image import tensor2imgs
+from mmcv.runner import get_dist_info
 
 from mmdet3d.models import (Base3DDetector, Base3DSegmentor,
                             SingleStageMono3DDetector)
@@ -13,7 +14,8 @@ def single_gpu_test(model,
                     data_loader,
                     show=False,
                     out_dir=None,
-                    show_score_thr=0.3):
+                    show_score_thr=0.3,
+                    evaluator=None):
     """Test model with single gpu.
 
     This method tests model with single gpu and gives the 'show' option.
@@ -27,12 +29,18 @@ def single_gpu_test(model,
             Default: True.
         out_dir (str, optional): The path to save visualization results.
             Default: None.
+        evaluator (:obj:`BaseEvaluator`, optional): Streaming evaluator.
+            If given, the results are fed to it batch by batch instead of
+            being collected, e.g. to bound the memory of long test runs.
+            Default: None.
 
     Returns:
-        list[dict]: The prediction results.
+        list[dict]: The prediction results. It is empty if ``evaluator`` is
+            given.
     """
     model.eval()
     results = []
+    sample_idx = 0
     dataset = data_loader.dataset
     prog_bar = mmcv.ProgressBar(len(dataset))
     for i, data in enumerate(data_loader):
@@ -82,9 +90,54 @@ def single_gpu_test(model,
                         show=show,
                         out_file=out_file,
                         score_thr=show_score_thr)
-        results.extend(result)
+        if evaluator is not None:
+            for result_ in result:
+                evaluator.update(sample_idx, result_)
+                sample_idx += 1
+        else:
+            results.extend(result)
 
         batch_size = len(result)
         for _ in range(batch_size):
             prog_bar.update()
     return results
+
+
+def multi_gpu_stream_test(model, data_loader, evaluator):
+    """Test model with multiple gpus and evaluate the results on the fly.
+
+    Each rank feeds the results of its part of the dataset to its own
+    evaluator, then the statistics of the evaluators are reduced across the
+    ranks with ``evaluator.all_reduce()``, so the results are never
+    gathered. The data loader is expected to use the non-shuffled
+    distributed sampler of :func:`mmdet3d.datasets.build_dataloader`. The
+    samples it repeats to pad the last ranks are skipped.
+
+    Args:
+        model (nn.Module): Model to be tested.
+        data_loader (nn.Dataloader): Pytorch data loader.
+        evaluator (:obj:`BaseEvaluator`): Streaming evaluator that supports
+            ``all_reduce``, e.g. :obj:`SegEvaluator`.
+    """
+    model.eval()
+    dataset = data_loader.dataset
+    rank, world_size = get_dist_info()
+    sample_inds = list(data_loader.sampler)
+    if rank == 0:
+        prog_bar = mmcv.ProgressBar(len(dataset))
+    pos = 0
+    for data in data_loader:
+        with torch.no_grad():
+            result = model(return_loss=False, rescale=True, **data)
+        for result_ in result:
+            # the sampler takes every world_size-th sample of the dataset
+            # padded to a multiple of world_size
+            if rank + pos * world_size < len(dataset):
+                evaluator.update(sample_inds[pos], result_)
+            pos += 1
+
+        if rank == 0:
+            batch_size = len(result)
+            for _ in range(batch_size * world_size):
+                prog_bar.update()
+    evaluator.all_reduce()
@@ -1,4 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from collections import OrderedDict
+
 import mmcv
 import torch
 
@@ -34,6 +36,9 @@ class Anchor3DRangeGenerator(object):
             different sizes. If size_per_range is True, the ranges should have
             the same length as the sizes, if not, it will be duplicated.
             Defaults to True.
+        cache_size (int, optional): Maximum number of feature map sizes,
+            devices and dtypes whose anchors are cached by
+            :meth:`grid_anchors`. 0 disables the cache. Defaults to 4.
     """
 
     def __init__(self,
@@ -43,7 +48,8 @@ class Anchor3DRangeGenerator(object):
                  rotations=[0, 1.5707963],
                  custom_values=(),
                  reshape_out=True,
-                 size_per_range=True):
+                 size_per_range=True,
+                 cache_size=4):
         assert mmcv.is_list_of(ranges, list)
         if size_per_range:
             if len(sizes) != len(ranges):
@@ -60,9 +66,10 @@ class Anchor3DRangeGenerator(object):
         self.ranges = ranges
         self.rotations = rotations
         self.custom_values = custom_values
-        self.cached_anchors = None
         self.reshape_out = reshape_out
         self.size_per_range = size_per_range
+        self.cache_size = cache_size
+        self.cached_anchors = OrderedDict()
 
     def __repr__(self):
         s = self.__class__.__name__ + '('
@@ -101,7 +108,18 @@ class Anchor3DRangeGenerator(object):
                 N = width * height * num_base_anchors, width and height
                 are the sizes of the corresponding feature level,
                 num_base_anchors is the number of anchors for that level.
+
+        Note:
+            The anchors are cached by feature map sizes, device and dtype,
+            so the returned tensors are shared between calls and must not be
+            modified in place.
         """
+        return self.get_cached_anchors(featmap_sizes, device,
+                                       self._grid_anchors)
+
+    def _grid_anchors(self, featmap_sizes, device):
+        """Generate grid anchors in multiple feature levels without the
+        cache."""
         assert self.num_levels == len(featmap_sizes)
         multi_level_anchors = []
         for i in range(self.num_levels):
@@ -112,6 +130,35 @@ class Anchor3DRangeGenerator(object):
             multi_level_anchors.append(anchors)
         return multi_level_anchors
 
+    def get_cached_anchors(self, featmap_sizes, device, generate):
+        """Get the anchors of the feature map sizes from the cache, or
+        generate them with ``generate(featmap_sizes, device)`` and cache them.
+
+        The least recently used anchors are dropped when there are more
+        than ``self.cache_size`` of them.
+
+        Args:
+            featmap_sizes (list[tuple]): List of feature map sizes.
+            device (str | torch.device): Device of the anchors.
+            generate (callable): Function that generates the anchors.
+
+        Returns:
+            list: Anchors in multiple feature levels.
+        """
+        key = (tuple(tuple(featmap_size) for featmap_size in featmap_sizes),
+               torch.device(device), torch.get_default_dtype())
+        anchors = self.cached_anchors.get(key)
+        if anchors is None:
+            anchors = generate(featmap_sizes, device)
+            if self.cache_size > 0:
+                self.cached_anchors[key] = anchors
+                while len(self.cached_anchors) > self.cache_size:
+                    self.cached_anchors.popitem(last=False)
+        else:
+            self.cached_anchors.move_to_end(key)
+        # the callers may replace the levels of the returned list
+        return list(anchors)
+
     def single_level_grid_anchors(self, featmap_size, scale, device='cuda'):
         """Generate grid anchors of a single level feature map.
 
@@ -372,7 +419,17 @@ class AlignedAnchor3DRangeGeneratorPerCls(AlignedAnchor3DRangeGenerator):
                 support single feature level. The sizes of each tensor
                 should be [num_sizes/ranges*num_rots*featmap_size,
                 box_code_size].
+
+        Note:
+            The anchors are cached by feature map sizes, device and dtype,
+            so the returned tensors are shared between calls and must not be
+            modified in place.
         """
+        return self.get_cached_anchors(featmap_sizes, device,
+                                       self._grid_anchors)
+
+    def _grid_anchors(self, featmap_sizes, device):
+        """Generate grid anchors of the classes without the cache."""
         multi_level_anchors = []
         anchors = self.multi_cls_grid_anchors(
             featmap_sizes, self.scales[0], device=device)
@@ -3,8 +3,17 @@ import torch
 
 from mmdet.core.bbox import bbox_overlaps
 from mmdet.core.bbox.iou_calculators.builder import IOU_CALCULATORS
+from ...utils import TensorCache
 from ..structures import get_box_type
 
+# nearest BEV boxes of the anchors, which are the same in every iteration
+_nearest_bev_cache = TensorCache()
+
+
+def _nearest_bev(bboxes, coordinate):
+    box_type, _ = get_box_type(coordinate)
+    return box_type(bboxes, box_dim=bboxes.shape[-1]).nearest_bev
+
 
 @IOU_CALCULATORS.register_module()
 class BboxOverlapsNearest3D(object):
@@ -129,16 +138,12 @@ def bbox_overlaps_nearest_3d(bboxes1,
     """
     assert bboxes1.size(-1) == bboxes2.size(-1) >= 7
 
-    box_type, _ = get_box_type(coordinate)
-
-    bboxes1 = box_type(bboxes1, box_dim=bboxes1.shape[-1])
-    bboxes2 = box_type(bboxes2, box_dim=bboxes2.shape[-1])
-
     # Change the bboxes to bev
     # box conversion and iou calculation in torch version on CUDA
     # is 10x faster than that in numpy version
-    bboxes1_bev = bboxes1.nearest_bev
-    bboxes2_bev = bboxes2.nearest_bev
+    bboxes1_bev = _nearest_bev(bboxes1, coordinate)
+    # the assigners pass the anchors as bboxes2
+    bboxes2_bev = _nearest_bev_cache.get(bboxes2, _nearest_bev, coordinate)
 
     ret = bbox_overlaps(
         bboxes1_bev, bboxes2_bev, mode=mode, is_aligned=is_aligned)
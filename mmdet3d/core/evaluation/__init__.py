@@ -1,4 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .evaluator import (BaseEvaluator, IndoorEvaluator, KittiEvaluator,
+                        SegEvaluator)
 from .indoor_eval import indoor_eval
 from .instance_seg_eval import instance_seg_eval
 from .kitti_utils import kitti_eval, kitti_eval_coco_style
@@ -7,5 +9,6 @@ from .seg_eval import seg_eval
 
 __all__ = [
     'kitti_eval_coco_style', 'kitti_eval', 'indoor_eval', 'lyft_eval',
-    'seg_eval', 'instance_seg_eval'
+    'seg_eval', 'instance_seg_eval', 'BaseEvaluator', 'IndoorEvaluator',
+    'KittiEvaluator', 'SegEvaluator'
 ]
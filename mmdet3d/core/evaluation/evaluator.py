@@ -0,0 +1,349 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+import torch
+from mmcv.utils import print_log
+from torch import distributed as dist
+
+from .indoor_eval import (average_precision, greedy_match,
+                          summarize_indoor_results)
+from .kitti_utils import kitti_eval
+from .seg_eval import scene_hist, summarize_seg_hist
+
+
+class BaseEvaluator(metaclass=ABCMeta):
+    """Base class of streaming evaluators.
+
+    A streaming evaluator consumes the prediction of each sample as soon as
+    it is produced by the test loop (see :func:`mmdet3d.apis.single_gpu_test`)
+    and only keeps compact per-sample statistics, so the predictions do not
+    have to be held in memory until the end of inference.
+
+    Args:
+        logger (logging.Logger | str, optional): Logger used for printing
+            related information during evaluation. Defaults to None.
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger
+
+    @abstractmethod
+    def update(self, sample_idx, result):
+        """Accumulate the statistics of one sample.
+
+        Args:
+            sample_idx (int): Index of the sample in the dataset.
+            result (dict): Prediction of the sample.
+        """
+        pass
+
+    @abstractmethod
+    def compute(self):
+        """Compute the metrics from the accumulated statistics.
+
+        Returns:
+            dict[str, float]: Evaluation results.
+        """
+        pass
+
+
+class IndoorEvaluator(BaseEvaluator):
+    """Streaming evaluator of the indoor detection protocol.
+
+    The detections of each class are greedily matched to the ground truths
+    of their own sample in :meth:`update`, so only the scores and the
+    true-positive flags are kept. The results are the same as
+    :func:`indoor_eval`.
+
+    Args:
+        gt_annos (list[dict]): Ground truth annotations.
+        metric (list[float]): IoU thresholds for computing average precisions.
+        label2cat (dict): Map from label to category.
+        box_type_3d (type): Type of the ground truth boxes.
+        box_mode_3d (:obj:`Box3DMode`): Box mode used to compute IoUs.
+        logger (logging.Logger | str, optional): Logger used for printing
+            related information during evaluation. Defaults to None.
+    """
+
+    def __init__(self,
+                 gt_annos,
+                 metric,
+                 label2cat,
+                 box_type_3d,
+                 box_mode_3d,
+                 logger=None):
+        super().__init__(logger=logger)
+        self.gt_annos = gt_annos
+        self.metric = metric
+        self.label2cat = label2cat
+        self.box_type_3d = box_type_3d
+        self.box_mode_3d = box_mode_3d
+        # {label: {'npos': int, 'scores': list, 'tp': list, 'has_pred': bool}}
+        # the insertion order follows the one of `indoor_eval`
+        self.stats = dict()
+
+    def _get_stats(self, label):
+        if label not in self.stats:
+            self.stats[label] = dict(npos=0, scores=[], tp=[], has_pred=False)
+        return self.stats[label]
+
+    def update(self, sample_idx, result):
+        """Match the detections of one sample to its ground truths.
+
+        Args:
+            sample_idx (int): Index of the sample in the dataset.
+            result (dict): Detection result with the keys ``boxes_3d``,
+                ``labels_3d`` and ``scores_3d``.
+        """
+        pred_labels = result['labels_3d'].numpy()
+        pred_scores = result['scores_3d'].numpy()
+        pred_boxes = result['boxes_3d'].convert_to(self.box_mode_3d)
+
+        gt_anno = self.gt_annos[sample_idx]
+        if gt_anno['gt_num'] != 0:
+            gt_boxes = self.box_type_3d(
+                gt_anno['gt_boxes_upright_depth'],
+                box_dim=gt_anno['gt_boxes_upright_depth'].shape[-1],
+                origin=(0.5, 0.5, 0.5)).convert_to(self.box_mode_3d)
+            gt_labels = np.asarray(gt_anno['class'])
+        else:
+            gt_boxes = None
+            gt_labels = np.array([], dtype=np.int64)
+
+        for label in pred_labels:
+            self._get_stats(int(label))['has_pred'] = True
+        for label in gt_labels:
+            self._get_stats(int(label))['npos'] += 1
+
+        for label in np.unique(pred_labels):
+            pred_mask = pred_labels == label
+            gt_inds = np.where(gt_labels == label)[0]
+            scores = pred_scores[pred_mask]
+            if len(gt_inds) > 0:
+                cls_pred_boxes = pred_boxes[torch.from_numpy(pred_mask)]
+                ious = cls_pred_boxes.overlaps(
+                    cls_pred_boxes, gt_boxes[torch.from_numpy(gt_inds)])
+                ious = ious.numpy()
+            else:
+                ious = np.zeros((len(scores), 0))
+            stats = self.stats[int(label)]
+            stats['scores'].append(scores)
+            stats['tp'].append(self._match(scores, ious))
+
+    def _match(self, scores, ious):
+        """Greedily match detections to ground truths in descending order of
+        scores for all IoU thresholds, as ``eval_det_cls`` does per image.
+
+        Returns:
+            np.ndarray: True positive flags with the shape of
+                (num_thresholds, num_dets), in the input order.
+        """
+        num_dets, num_gts = ious.shape
+        tp = np.zeros((len(self.metric), num_dets))
+        if num_gts == 0:
+            return tp
+        sorted_ind = np.argsort(-scores, kind='stable')
+        tp_sorted = np.zeros((len(self.metric), num_dets), dtype=bool)
+        greedy_match(
+            np.array([0, num_dets]),
+            ious.max(axis=1)[sorted_ind],
+            ious.argmax(axis=1)[sorted_ind],
+            np.array(self.metric, dtype=np.float32), tp_sorted,
+            np.zeros((len(self.metric), num_gts), dtype=bool))
+        tp[:, sorted_ind] = tp_sorted
+        return tp
+
+    def compute(self):
+        """Compute the average precisions and recalls of all classes.
+
+        Returns:
+            dict[str, float]: Evaluation results.
+        """
+        rec = [{} for _ in self.metric]
+        ap = [{} for _ in self.metric]
+        for label, stats in self.stats.items():
+            if not stats['has_pred']:
+                for iou_idx in range(len(self.metric)):
+                    rec[iou_idx][label] = np.zeros(1)
+                    ap[iou_idx][label] = np.zeros(1)
+                continue
+            scores = np.concatenate(stats['scores'])
+            sorted_ind = np.argsort(-scores, kind='stable')
+            tp_thr = np.concatenate(stats['tp'], axis=1)[:, sorted_ind]
+            for iou_idx in range(len(self.metric)):
+                tp = np.cumsum(tp_thr[iou_idx])
+                fp = np.cumsum(1. - tp_thr[iou_idx])
+                recall = tp / float(stats['npos'])
+                # avoid divide by zero in case the first detection matches a
+                # difficult ground truth
+                precision = tp / np.maximum(tp + fp, np.finfo(np.float64).eps)
+                rec[iou_idx][label] = recall
+                ap[iou_idx][label] = average_precision(recall, precision)
+        return summarize_indoor_results(rec, ap, self.metric, self.label2cat,
+                                        self.logger)
+
+
+class SegEvaluator(BaseEvaluator):
+    """Streaming evaluator of semantic segmentation.
+
+    Only the ``num_classes x num_classes`` confusion matrix is kept, so the
+    memory does not grow with the size of the dataset. In distributed
+    testing, the matrices of the ranks are summed by :meth:`all_reduce`.
+
+    Args:
+        label2cat (dict): Map from label to category name.
+        ignore_index (int): Index that will be ignored in evaluation.
+        gt_loader (callable): Function that takes the index of a sample and
+            returns its ground truth labels.
+        logger (logging.Logger | str, optional): Logger used for printing
+            related information during evaluation. Defaults to None.
+    """
+
+    def __init__(self, label2cat, ignore_index, gt_loader, logger=None):
+        super().__init__(logger=logger)
+        self.label2cat = label2cat
+        self.ignore_index = ignore_index
+        self.gt_loader = gt_loader
+        num_classes = len(label2cat)
+        self.hist = np.zeros((num_classes, num_classes), dtype=np.int64)
+
+    def update(self, sample_idx, result):
+        """Accumulate the confusion matrix of one scene.
+
+        Args:
+            sample_idx (int): Index of the sample in the dataset.
+            result (dict): Segmentation result with the key
+                ``semantic_mask``.
+        """
+        self.hist += scene_hist(
+            self.gt_loader(sample_idx), result['semantic_mask'],
+            len(self.label2cat), self.ignore_index)
+
+    def all_reduce(self):
+        """Sum the confusion matrices of all the ranks in distributed testing.
+
+        It does nothing if the default process group is not initialized.
+        """
+        if not (dist.is_available() and dist.is_initialized()):
+            return
+        hist = torch.from_numpy(self.hist)
+        if dist.get_backend() == 'nccl':
+            hist = hist.cuda()
+        dist.all_reduce(hist)
+        self.hist = hist.cpu().numpy()
+
+    def compute(self):
+        """Compute the segmentation metrics from the confusion matrix.
+
+        Returns:
+            dict[str, float]: Evaluation results.
+        """
+        return summarize_seg_hist(self.hist, self.label2cat, self.logger)
+
+
+class KittiEvaluator(BaseEvaluator):
+    """Streaming evaluator of the KITTI protocol.
+
+    Each prediction is converted to the compact KITTI annotation format in
+    :meth:`update`, so the box structures of the model outputs are released
+    right away. As in :meth:`KittiDataset.evaluate`, the 2D results, i.e.
+    the results of the ``img`` keys and the lists of per-class boxes, are
+    converted by ``result2anno_2d``, and only the ``bbox`` type of the
+    results of the ``img`` keys is evaluated.
+
+    Args:
+        gt_annos (list[dict]): Ground truth annotations in KITTI format.
+        result2anno (callable): Function that takes the index of a sample
+            and its 3D detection result and returns the KITTI annotation.
+        classes (list[str]): Classes to evaluate.
+        eval_types (list[str], optional): Types to eval for the results
+            that are not in a dict of named results.
+            Defaults to ['bbox', 'bev', '3d'].
+        result2anno_2d (callable, optional): Function that takes the index
+            of a sample and its 2D detection result and returns the KITTI
+            annotation. Defaults to None.
+        num_workers (int, optional): Number of threads used by
+            :func:`kitti_eval`. Defaults to 0.
+        logger (logging.Logger | str, optional): Logger used for printing
+            related information during evaluation. Defaults to None.
+    """
+
+    def __init__(self,
+                 gt_annos,
+                 result2anno,
+                 classes,
+                 eval_types=['bbox', 'bev', '3d'],
+                 result2anno_2d=None,
+                 num_workers=0,
+                 logger=None):
+        super().__init__(logger=logger)
+        self.gt_annos = gt_annos
+        self.result2anno = result2anno
+        self.classes = classes
+        self.eval_types = eval_types
+        self.result2anno_2d = result2anno_2d
+        self.num_workers = num_workers
+        # {result name: {sample_idx: anno}}
+        self.dt_annos = dict()
+
+    def update(self, sample_idx, result):
+        """Convert the result of one sample to KITTI format.
+
+        Args:
+            sample_idx (int): Index of the sample in the dataset.
+            result (dict | list[np.ndarray]): 3D detection result, or 2D
+                boxes of each class. It may also be a dict of such results,
+                e.g. with the keys ``pts_bbox`` and ``img_bbox``.
+        """
+        if isinstance(result, dict) and ('pts_bbox' in result
+                                         or 'img_bbox' in result):
+            named_results = result
+        else:
+            named_results = {None: result}
+        for name, result_ in named_results.items():
+            if name is None:
+                is_2d = not isinstance(result_, dict)
+            else:
+                is_2d = 'img' in name
+            if is_2d:
+                assert self.result2anno_2d is not None, \
+                    'result2anno_2d is required by 2D results'
+                anno = self.result2anno_2d(sample_idx, result_)
+            else:
+                anno = self.result2anno(sample_idx, result_)
+            self.dt_annos.setdefault(name, dict())[sample_idx] = anno
+
+    def compute(self):
+        """Run KITTI evaluation on the converted results.
+
+        Returns:
+            dict[str, float]: Evaluation results.
+        """
+        ap_dict = dict()
+        for name, dt_annos in self.dt_annos.items():
+            assert len(dt_annos) == len(self.gt_annos), \
+                'results of some samples are missing'
+            dt_annos = [dt_annos[i] for i in range(len(self.gt_annos))]
+            if name is None:
+                eval_types = list(self.eval_types)
+            elif 'img' in name:
+                eval_types = ['bbox']
+            else:
+                eval_types = ['bbox', 'bev', '3d']
+            ap_result_str, ap_dict_ = kitti_eval(
+                self.gt_annos,
+                dt_annos,
+                self.classes,
+                eval_types=eval_types,
+                num_workers=self.num_workers)
+            if name is None:
+                print_log('\n' + ap_result_str, logger=self.logger)
+                ap_dict.update(ap_dict_)
+            else:
+                for ap_type, ap in ap_dict_.items():
+                    ap_dict[f'{name}/{ap_type}'] = float('{:.4f}'.format(ap))
+                print_log(
+                    f'Results of {name}:\n' + ap_result_str,
+                    logger=self.logger)
+        return ap_dict
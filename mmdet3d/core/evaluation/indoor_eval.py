@@ -1,6 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import numba
 import numpy as np
-import torch
 from mmcv.utils import print_log
 from terminaltables import AsciiTable
 
@@ -34,8 +34,8 @@ def average_precision(recalls, precisions, mode='area'):
         ones = np.ones((num_scales, 1), dtype=recalls.dtype)
         mrec = np.hstack((zeros, recalls, ones))
         mpre = np.hstack((zeros, precisions, zeros))
-        for i in range(mpre.shape[1] - 1, 0, -1):
-            mpre[:, i - 1] = np.maximum(mpre[:, i - 1], mpre[:, i])
+        # precision envelope, i.e. the max precision on the right
+        mpre = np.maximum.accumulate(mpre[:, ::-1], axis=1)[:, ::-1]
         for i in range(num_scales):
             ind = np.where(mrec[i, 1:] != mrec[i, :-1])[0]
             ap[i] = np.sum(
@@ -53,6 +53,131 @@ def average_precision(recalls, precisions, mode='area'):
     return ap
 
 
+@numba.njit(parallel=True)
+def greedy_match(det_offsets, iou_max, gt_inds, iou_thr, tp, matched):
+    """Greedily match the detections to the ground truths for all IoU
+    thresholds at once. The classes are processed in parallel.
+
+    Args:
+        det_offsets (np.ndarray): Offset of the detections of each class,
+            followed by the number of detections.
+        iou_max (np.ndarray): Max IoU of each detection with the ground
+            truths of its class in its image, -inf if there is none. The
+            detections of a class are in descending order of scores.
+        gt_inds (np.ndarray): Index of the ground truth with the max IoU of
+            each detection.
+        iou_thr (np.ndarray): IoU thresholds.
+        tp (np.ndarray): Created true positive flags of the detections with
+            the shape of (num_thresholds, num_dets).
+        matched (np.ndarray): Created matched flags of the ground truths
+            with the shape of (num_thresholds, num_gts).
+    """
+    num_classes = det_offsets.shape[0] - 1
+    for c in numba.prange(num_classes):
+        for d in range(det_offsets[c], det_offsets[c + 1]):
+            for t in range(iou_thr.shape[0]):
+                if iou_max[d] > iou_thr[t] and not matched[t, gt_inds[d]]:
+                    tp[t, d] = True
+                    matched[t, gt_inds[d]] = True
+
+
+def match_best_gts(pred_boxes, pred_labels, pred_offsets, gt_boxes, gt_labels,
+                   gt_offsets):
+    """Find the ground truth of the same class in the same image with the
+    max IoU of each prediction.
+
+    The predictions and the ground truths of all the images are stored in
+    flat arrays, and the IoUs are computed with one call per image.
+
+    Args:
+        pred_boxes (:obj:`BaseInstance3DBoxes`): Predicted boxes of all the
+            images.
+        pred_labels (np.ndarray): Labels of the predicted boxes.
+        pred_offsets (np.ndarray): Offset of the predictions of each image,
+            followed by the number of predictions.
+        gt_boxes (:obj:`BaseInstance3DBoxes`): Ground truth boxes of all the
+            images.
+        gt_labels (np.ndarray): Labels of the ground truth boxes.
+        gt_offsets (np.ndarray): Offset of the ground truths of each image,
+            followed by the number of ground truths.
+
+    Returns:
+        tuple[np.ndarray]: Max IoU of each prediction, -inf if there is no
+            ground truth of its class in its image, and index of the
+            ground truth with the max IoU, the first one in case of ties.
+    """
+    num_preds = len(pred_labels)
+    iou_max = np.full(num_preds, -np.inf, dtype=np.float32)
+    gt_inds = np.zeros(num_preds, dtype=np.int64)
+    for img_id in range(len(pred_offsets) - 1):
+        pred_start, pred_end = pred_offsets[img_id:img_id + 2]
+        gt_start, gt_end = gt_offsets[img_id:img_id + 2]
+        if pred_start == pred_end or gt_start == gt_end:
+            continue
+        ious = pred_boxes.overlaps(pred_boxes[int(pred_start):int(pred_end)],
+                                   gt_boxes[int(gt_start):int(gt_end)])
+        ious = ious.numpy()
+        same_class = pred_labels[pred_start:pred_end, None] == \
+            gt_labels[None, gt_start:gt_end]
+        ious[~same_class] = -np.inf
+        iou_max[pred_start:pred_end] = ious.max(axis=1)
+        gt_inds[pred_start:pred_end] = ious.argmax(axis=1) + gt_start
+    return iou_max, gt_inds
+
+
+def eval_det_flat(pred_labels, pred_scores, iou_max, gt_inds, gt_labels,
+                  labels, iou_thr):
+    """Compute precision/recall of several classes from the best ground
+    truth of each prediction.
+
+    Args:
+        pred_labels (np.ndarray): Labels of the predictions.
+        pred_scores (np.ndarray): Scores of the predictions.
+        iou_max (np.ndarray): Max IoU of each prediction, see
+            :func:`match_best_gts`.
+        gt_inds (np.ndarray): Index of the ground truth with the max IoU of
+            each prediction.
+        gt_labels (np.ndarray): Labels of the ground truths.
+        labels (list[int]): Classes to evaluate.
+        iou_thr (list[float]): A list of iou thresholds.
+
+    Return:
+        dict[int, list[tuple]]: Recalls, precisions and average precision of
+            each class for every IoU threshold, as :func:`eval_det_cls`.
+    """
+    # detections of each class in descending order of scores
+    det_inds = [np.zeros(0, dtype=np.int64)]
+    for label in labels:
+        inds = np.where(pred_labels == label)[0]
+        det_inds.append(inds[np.argsort(-pred_scores[inds])])
+    det_offsets = np.cumsum([0] + [len(inds) for inds in det_inds[1:]])
+    det_inds = np.concatenate(det_inds)
+
+    # IoUs and thresholds are compared in float32
+    iou_thr = np.array(iou_thr, dtype=np.float32)
+    tp_thr = np.zeros((len(iou_thr), len(det_inds)), dtype=bool)
+    matched = np.zeros((len(iou_thr), len(gt_labels)), dtype=bool)
+    greedy_match(det_offsets, iou_max[det_inds], gt_inds[det_inds], iou_thr,
+                 tp_thr, matched)
+
+    ret_values = {}
+    for i, label in enumerate(labels):
+        npos = np.count_nonzero(gt_labels == label)
+        tp_cls = tp_thr[:, det_offsets[i]:det_offsets[i + 1]]
+        # compute precision recall
+        fp = np.cumsum(~tp_cls, axis=1, dtype=np.float64)
+        tp = np.cumsum(tp_cls, axis=1, dtype=np.float64)
+        recall = tp / float(npos)
+        # avoid divide by zero in case the first detection matches a difficult
+        # ground truth
+        precision = tp / np.maximum(tp + fp, np.finfo(np.float64).eps)
+        ap = average_precision(recall, precision)
+        ret_values[label] = [(recall[iou_idx], precision[iou_idx],
+                              ap[iou_idx:iou_idx + 1])
+                             for iou_idx in range(len(iou_thr))]
+    return ret_values
+
+
 def eval_det_cls(pred, gt, iou_thr=None):
     """Generic functions to compute precision/recall for object detection for a
     single class.
@@ -67,98 +192,59 @@ def eval_det_cls(pred, gt, iou_thr=None):
         tuple (np.ndarray, np.ndarray, float): Recalls, precisions and
             average precision.
     """
+    # flatten the boxes of the images with predictions, then of the other
+    # images with ground truths
+    img_ids = list(pred.keys()) + [i for i in gt.keys() if i not in pred]
+    pred_boxes, pred_scores, pred_offsets = [], [], [0]
+    gt_boxes, gt_offsets = [], [0]
+    for img_id in img_ids:
+        for box, score in pred.get(img_id, []):
+            pred_boxes.append(box)
+            pred_scores.append(score)
+        pred_offsets.append(len(pred_boxes))
+        gt_boxes.extend(gt.get(img_id, []))
+        gt_offsets.append(len(gt_boxes))
+    if len(pred_boxes) > 0:
+        pred_boxes = pred_boxes[0].cat(pred_boxes)
+    if len(gt_boxes) > 0:
+        gt_boxes = gt_boxes[0].cat(gt_boxes)
+    pred_labels = np.zeros(len(pred_scores), dtype=np.int64)
+    gt_labels = np.zeros(len(gt_boxes), dtype=np.int64)
+
+    iou_max, gt_inds = match_best_gts(pred_boxes, pred_labels,
+                                      np.array(pred_offsets), gt_boxes,
+                                      gt_labels, np.array(gt_offsets))
+    return eval_det_flat(pred_labels, np.array(pred_scores), iou_max, gt_inds,
+                         gt_labels, [0], iou_thr)[0]
+
+
+def gather_map_recall(ret_values, labels, ovthresh):
+    """Gather the results of the classes for every IoU threshold.
 
-    # {img_id: {'bbox': box structure, 'det': matched list}}
-    class_recs = {}
-    npos = 0
-    for img_id in gt.keys():
-        cur_gt_num = len(gt[img_id])
-        if cur_gt_num != 0:
-            gt_cur = torch.zeros([cur_gt_num, 7], dtype=torch.float32)
-            for i in range(cur_gt_num):
-                gt_cur[i] = gt[img_id][i].tensor
-            bbox = gt[img_id][0].new_box(gt_cur)
-        else:
-            bbox = gt[img_id]
-        det = [[False] * len(bbox) for i in iou_thr]
-        npos += len(bbox)
-        class_recs[img_id] = {'bbox': bbox, 'det': det}
-
-    # construct dets
-    image_ids = []
-    confidence = []
-    ious = []
-    for img_id in pred.keys():
-        cur_num = len(pred[img_id])
-        if cur_num == 0:
-            continue
-        pred_cur = torch.zeros((cur_num, 7), dtype=torch.float32)
-        box_idx = 0
-        for box, score in pred[img_id]:
-            image_ids.append(img_id)
-            confidence.append(score)
-            pred_cur[box_idx] = box.tensor
-            box_idx += 1
-        pred_cur = box.new_box(pred_cur)
-        gt_cur = class_recs[img_id]['bbox']
-        if len(gt_cur) > 0:
-            # calculate iou in each image
-            iou_cur = pred_cur.overlaps(pred_cur, gt_cur)
-            for i in range(cur_num):
-                ious.append(iou_cur[i])
-        else:
-            for i in range(cur_num):
-                ious.append(np.zeros(1))
-
-    confidence = np.array(confidence)
-
-    # sort by confidence
-    sorted_ind = np.argsort(-confidence)
-    image_ids = [image_ids[x] for x in sorted_ind]
-    ious = [ious[x] for x in sorted_ind]
-
-    # go down dets and mark TPs and FPs
-    nd = len(image_ids)
-    tp_thr = [np.zeros(nd) for i in iou_thr]
-    fp_thr = [np.zeros(nd) for i in iou_thr]
-    for d in range(nd):
-        R = class_recs[image_ids[d]]
-        iou_max = -np.inf
-        BBGT = R['bbox']
-        cur_iou = ious[d]
-
-        if len(BBGT) > 0:
-            # compute overlaps
-            for j in range(len(BBGT)):
-                # iou = get_iou_main(get_iou_func, (bb, BBGT[j,...]))
-                iou = cur_iou[j]
-                if iou > iou_max:
-                    iou_max = iou
-                    jmax = j
-
-        for iou_idx, thresh in enumerate(iou_thr):
-            if iou_max > thresh:
-                if not R['det'][iou_idx][jmax]:
-                    tp_thr[iou_idx][d] = 1.
-                    R['det'][iou_idx][jmax] = 1
-                else:
-                    fp_thr[iou_idx][d] = 1.
-            else:
-                fp_thr[iou_idx][d] = 1.
+    Args:
+        ret_values (dict): Results of :func:`eval_det_cls` of the classes
+            with predictions.
+        labels (list[int]): All the classes to report.
+        ovthresh (list[float]): iou thresholds.
 
-    ret = []
-    for iou_idx, thresh in enumerate(iou_thr):
-        # compute precision recall
-        fp = np.cumsum(fp_thr[iou_idx])
-        tp = np.cumsum(tp_thr[iou_idx])
-        recall = tp / float(npos)
-        # avoid divide by zero in case the first detection matches a difficult
-        # ground truth
-        precision = tp / np.maximum(tp + fp, np.finfo(np.float64).eps)
-        ap = average_precision(recall, precision)
-        ret.append((recall, precision, ap))
+    Return:
+        tuple[dict]: dict results of recall, AP, and precision for all classes.
+    """
+    recall = [{} for i in ovthresh]
+    precision = [{} for i in ovthresh]
+    ap = [{} for i in ovthresh]
+
+    for label in labels:
+        for iou_idx, thresh in enumerate(ovthresh):
+            if label in ret_values:
+                recall[iou_idx][label], precision[iou_idx][label], ap[iou_idx][
+                    label] = ret_values[label][iou_idx]
+            else:
+                recall[iou_idx][label] = np.zeros(1)
+                precision[iou_idx][label] = np.zeros(1)
+                ap[iou_idx][label] = np.zeros(1)
 
-    return ret
+    return recall, precision, ap
 
 
 def eval_map_recall(pred, gt, ovthresh=None):
@@ -183,21 +269,7 @@ def eval_map_recall(pred, gt, ovthresh=None):
         if classname in pred:
             ret_values[classname] = eval_det_cls(pred[classname],
                                                  gt[classname], ovthresh)
-    recall = [{} for i in ovthresh]
-    precision = [{} for i in ovthresh]
-    ap = [{} for i in ovthresh]
-
-    for label in gt.keys():
-        for iou_idx, thresh in enumerate(ovthresh):
-            if label in pred:
-                recall[iou_idx][label], precision[iou_idx][label], ap[iou_idx][
-                    label] = ret_values[label][iou_idx]
-            else:
-                recall[iou_idx][label] = np.zeros(1)
-                precision[iou_idx][label] = np.zeros(1)
-                ap[iou_idx][label] = np.zeros(1)
-
-    return recall, precision, ap
+    return gather_map_recall(ret_values, gt.keys(), ovthresh)
 
 
 def indoor_eval(gt_annos,
@@ -229,47 +301,68 @@ def indoor_eval(gt_annos,
         dict[str, float]: Dict of results.
     """
     assert len(dt_annos) == len(gt_annos)
-    pred = {}  # map {class_id: pred}
-    gt = {}  # map {class_id: gt}
+    # boxes of all the images in flat arrays with image offsets
+    pred_boxes, pred_labels, pred_scores, pred_offsets = [], [], [], [0]
+    gt_boxes, gt_labels, gt_offsets = [], [], [0]
+    # classes in order of appearance, the predictions of an image first
+    labels = dict()
     for img_id in range(len(dt_annos)):
         # parse detected annotations
         det_anno = dt_annos[img_id]
-        for i in range(len(det_anno['labels_3d'])):
-            label = det_anno['labels_3d'].numpy()[i]
-            bbox = det_anno['boxes_3d'].convert_to(box_mode_3d)[i]
-            score = det_anno['scores_3d'].numpy()[i]
-            if label not in pred:
-                pred[int(label)] = {}
-            if img_id not in pred[label]:
-                pred[int(label)][img_id] = []
-            if label not in gt:
-                gt[int(label)] = {}
-            if img_id not in gt[label]:
-                gt[int(label)][img_id] = []
-            pred[int(label)][img_id].append((bbox, score))
+        labels_3d = det_anno['labels_3d'].numpy()
+        pred_boxes.append(det_anno['boxes_3d'].convert_to(box_mode_3d))
+        pred_labels.append(labels_3d)
+        pred_scores.append(det_anno['scores_3d'].numpy())
+        pred_offsets.append(pred_offsets[-1] + len(labels_3d))
+        labels.update(dict.fromkeys(labels_3d.tolist()))
 
         # parse gt annotations
         gt_anno = gt_annos[img_id]
         if gt_anno['gt_num'] != 0:
-            gt_boxes = box_type_3d(
-                gt_anno['gt_boxes_upright_depth'],
-                box_dim=gt_anno['gt_boxes_upright_depth'].shape[-1],
-                origin=(0.5, 0.5, 0.5)).convert_to(box_mode_3d)
-            labels_3d = gt_anno['class']
+            gt_boxes.append(
+                box_type_3d(
+                    gt_anno['gt_boxes_upright_depth'],
+                    box_dim=gt_anno['gt_boxes_upright_depth'].shape[-1],
+                    origin=(0.5, 0.5, 0.5)).convert_to(box_mode_3d))
+            labels_3d = np.asarray(gt_anno['class'])
+            gt_labels.append(labels_3d)
+            labels.update(dict.fromkeys(labels_3d.tolist()))
+            gt_offsets.append(gt_offsets[-1] + len(labels_3d))
         else:
-            gt_boxes = box_type_3d(np.array([], dtype=np.float32))
-            labels_3d = np.array([], dtype=np.int64)
-
-        for i in range(len(labels_3d)):
-            label = labels_3d[i]
-            bbox = gt_boxes[i]
-            if label not in gt:
-                gt[label] = {}
-            if img_id not in gt[label]:
-                gt[label][img_id] = []
-            gt[label][img_id].append(bbox)
-
-    rec, prec, ap = eval_map_recall(pred, gt, metric)
+            gt_offsets.append(gt_offsets[-1])
+
+    pred_boxes = pred_boxes[0].cat(pred_boxes) if pred_boxes else None
+    gt_boxes = gt_boxes[0].cat(gt_boxes) if gt_boxes else None
+    pred_labels = np.concatenate(pred_labels or [np.zeros(0, np.int64)])
+    pred_scores = np.concatenate(pred_scores or [np.zeros(0)])
+    gt_labels = np.concatenate(gt_labels or [np.zeros(0, np.int64)])
+
+    iou_max, gt_inds = match_best_gts(pred_boxes, pred_labels,
+                                      np.array(pred_offsets), gt_boxes,
+                                      gt_labels, np.array(gt_offsets))
+    pred_label_set = set(pred_labels.tolist())
+    det_labels = [label for label in labels if label in pred_label_set]
+    ret_values = eval_det_flat(pred_labels, pred_scores, iou_max, gt_inds,
+                               gt_labels, det_labels, metric)
+    rec, prec, ap = gather_map_recall(ret_values, labels, metric)
+    return summarize_indoor_results(rec, ap, metric, label2cat, logger)
+
+
+def summarize_indoor_results(rec, ap, metric, label2cat, logger=None):
+    """Collect the per-class results into a dict and print them as a table.
+
+    Args:
+        rec (list[dict]): Recalls of each class for every IoU threshold.
+        ap (list[dict]): Average precisions of each class for every IoU
+            threshold.
+        metric (list[float]): IoU thresholds for computing average precisions.
+        label2cat (dict): Map from label to category.
+        logger (logging.Logger | str, optional): The way to print the mAP
+            summary. See `mmdet.utils.print_log()` for details. Default: None.
+
+    Return:
+        dict[str, float]: Dict of results.
+    """
     ret_dict = dict()
     header = ['classes']
     table_columns = [[label2cat[label]
@@ -1,6 +1,8 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import gc
 import io as sysio
+from concurrent import futures as futures
+from functools import partial
 
 import numba
 import numpy as np
@@ -114,9 +116,23 @@ def image_box_overlap(boxes, query_boxes, criterion=-1):
     return overlaps
 
 
+def rotate_iou_eval(boxes, qboxes, criterion=-1):
+    """Compute rotated BEV IoU with the CUDA kernel when a GPU is available,
+    otherwise fall back to the multi-threaded CPU kernel.
+
+    The backend modules are imported lazily because ``rotate_iou`` compiles
+    its CUDA kernel at import time, which fails on CPU-only machines.
+    """
+    from numba import cuda
+    if cuda.is_available():
+        from .rotate_iou import rotate_iou_gpu_eval
+        return rotate_iou_gpu_eval(boxes, qboxes, criterion)
+    from .rotate_iou_cpu import rotate_iou_cpu_eval
+    return rotate_iou_cpu_eval(boxes, qboxes, criterion)
+
+
 def bev_box_overlap(boxes, qboxes, criterion=-1):
-    from .rotate_iou import rotate_iou_gpu_eval
-    riou = rotate_iou_gpu_eval(boxes, qboxes, criterion)
+    riou = rotate_iou_eval(boxes, qboxes, criterion)
     return riou
 
 
@@ -153,9 +169,8 @@ def d3_box_overlap_kernel(boxes, qboxes, rinc, criterion=-1):
 
 
 def d3_box_overlap(boxes, qboxes, criterion=-1):
-    from .rotate_iou import rotate_iou_gpu_eval
-    rinc = rotate_iou_gpu_eval(boxes[:, [0, 2, 3, 5, 6]],
-                               qboxes[:, [0, 2, 3, 5, 6]], 2)
+    rinc = rotate_iou_eval(boxes[:, [0, 2, 3, 5, 6]],
+                           qboxes[:, [0, 2, 3, 5, 6]], 2)
     d3_box_overlap_kernel(boxes, qboxes, rinc, criterion)
     return rinc
 
@@ -290,7 +305,42 @@ def get_split_parts(num, num_part):
         return [same_part] * num_part + [remain_num]
 
 
-@numba.jit(nopython=True)
+@numba.jit(nopython=True, nogil=True)
+def fused_compute_thresholds(overlaps, gt_nums, dt_nums, dc_nums, gt_datas,
+                             dt_datas, dontcares, ignored_gts, ignored_dets,
+                             metric, min_overlap):
+    """Collect the scores of the true positives of every sample in a part,
+    i.e. the ``thresholds`` returned by ``compute_statistics_jit`` with
+    ``compute_fp=False``, in a single call."""
+    thresholds = np.zeros((gt_datas.shape[0], ))
+    num_thresholds = 0
+    gt_num = 0
+    dt_num = 0
+    dc_num = 0
+    for i in range(gt_nums.shape[0]):
+        overlap = overlaps[dt_num:dt_num + dt_nums[i],
+                           gt_num:gt_num + gt_nums[i]]
+        _, _, _, _, thresholds_i = compute_statistics_jit(
+            overlap,
+            gt_datas[gt_num:gt_num + gt_nums[i]],
+            dt_datas[dt_num:dt_num + dt_nums[i]],
+            ignored_gts[gt_num:gt_num + gt_nums[i]],
+            ignored_dets[dt_num:dt_num + dt_nums[i]],
+            dontcares[dc_num:dc_num + dc_nums[i]],
+            metric,
+            min_overlap=min_overlap,
+            thresh=0.0,
+            compute_fp=False)
+        thresholds[num_thresholds:num_thresholds +
+                   thresholds_i.shape[0]] = thresholds_i
+        num_thresholds += thresholds_i.shape[0]
+        gt_num += gt_nums[i]
+        dt_num += dt_nums[i]
+        dc_num += dc_nums[i]
+    return thresholds[:num_thresholds]
+
+
+@numba.jit(nopython=True, nogil=True)
 def fused_compute_statistics(overlaps,
                              pr,
                              gt_nums,
@@ -449,6 +499,51 @@ def _prepare_data(gt_annos, dt_annos, current_class, difficulty):
             total_dc_num, total_num_valid_gt)
 
 
+def _prepare_parts(gt_annos, dt_annos, current_class, difficulty, split_parts):
+    """Run ``_prepare_data`` and concatenate its outputs part by part.
+
+    Returns:
+        tuple[list[tuple], int]: Data of each part in the order expected
+            by ``fused_compute_thresholds`` / ``fused_compute_statistics``
+            (dontcare numbers, gt datas, dt datas, dontcares, ignored gts,
+            ignored dets) and the number of valid ground truths.
+    """
+    rets = _prepare_data(gt_annos, dt_annos, current_class, difficulty)
+    (gt_datas_list, dt_datas_list, ignored_gts, ignored_dets, dontcares,
+     total_dc_num, total_num_valid_gt) = rets
+    parts = []
+    idx = 0
+    for num_part in split_parts:
+        parts.append((total_dc_num[idx:idx + num_part],
+                      np.concatenate(gt_datas_list[idx:idx + num_part], 0),
+                      np.concatenate(dt_datas_list[idx:idx + num_part], 0),
+                      np.concatenate(dontcares[idx:idx + num_part], 0),
+                      np.concatenate(ignored_gts[idx:idx + num_part], 0),
+                      np.concatenate(ignored_dets[idx:idx + num_part], 0)))
+        idx += num_part
+    return parts, total_num_valid_gt
+
+
+def _compute_part_thresholds(overlaps, nums, part, metric, min_overlap):
+    return fused_compute_thresholds(
+        overlaps, *nums, *part, metric, min_overlap=min_overlap)
+
+
+def _compute_part_statistics(overlaps, nums, part, metric, min_overlap,
+                             thresholds, compute_aos):
+    pr = np.zeros([len(thresholds), 4])
+    fused_compute_statistics(
+        overlaps,
+        pr,
+        *nums,
+        *part,
+        metric,
+        min_overlap=min_overlap,
+        thresholds=thresholds,
+        compute_aos=compute_aos)
+    return pr
+
+
 def eval_class(gt_annos,
                dt_annos,
                current_classes,
@@ -456,7 +551,9 @@ def eval_class(gt_annos,
                metric,
                min_overlaps,
                compute_aos=False,
-               num_parts=200):
+               num_parts=200,
+               num_workers=0,
+               prepared_parts=None):
     """Kitti eval. support 2d/bev/3d/aos eval. support 0.5:0.05:0.95 coco AP.
 
     Args:
@@ -468,6 +565,13 @@ def eval_class(gt_annos,
         min_overlaps (float): Min overlap. format:
             [num_overlap, metric, class].
         num_parts (int): A parameter for fast calculate algorithm
+        num_workers (int, optional): Number of threads used to compute the
+            statistics of the parts in parallel. The parts are processed
+            serially if set to 0. Defaults to 0.
+        prepared_parts (dict, optional): Cache of the per-part data keyed
+            by (class, difficulty). It does not depend on the metric, so the
+            same dict can be shared by the calls for different metrics.
+            Defaults to None.
 
     Returns:
         dict[str, np.ndarray]: recall, precision and aos
@@ -480,6 +584,21 @@ def eval_class(gt_annos,
 
     rets = calculate_iou_partly(dt_annos, gt_annos, metric, num_parts)
     overlaps, parted_overlaps, total_dt_num, total_gt_num = rets
+    part_nums = []
+    idx = 0
+    for num_part in split_parts:
+        part_nums.append((total_gt_num[idx:idx + num_part],
+                          total_dt_num[idx:idx + num_part]))
+        idx += num_part
+    if prepared_parts is None:
+        prepared_parts = dict()
+    if num_workers > 0:
+        executor = futures.ThreadPoolExecutor(num_workers)
+        map_fn = executor.map
+    else:
+        executor = None
+        map_fn = map
+
     N_SAMPLE_PTS = 41
     num_minoverlap = len(min_overlaps)
     num_class = len(current_classes)
@@ -491,57 +610,32 @@ def eval_class(gt_annos,
     aos = np.zeros([num_class, num_difficulty, num_minoverlap, N_SAMPLE_PTS])
     for m, current_class in enumerate(current_classes):
         for idx_l, difficulty in enumerate(difficultys):
-            rets = _prepare_data(gt_annos, dt_annos, current_class, difficulty)
-            (gt_datas_list, dt_datas_list, ignored_gts, ignored_dets,
-             dontcares, total_dc_num, total_num_valid_gt) = rets
+            key = (current_class, difficulty)
+            if key not in prepared_parts:
+                prepared_parts[key] = _prepare_parts(gt_annos, dt_annos,
+                                                     current_class, difficulty,
+                                                     split_parts)
+            parts, total_num_valid_gt = prepared_parts[key]
             for k, min_overlap in enumerate(min_overlaps[:, metric, m]):
-                thresholdss = []
-                for i in range(len(gt_annos)):
-                    rets = compute_statistics_jit(
-                        overlaps[i],
-                        gt_datas_list[i],
-                        dt_datas_list[i],
-                        ignored_gts[i],
-                        ignored_dets[i],
-                        dontcares[i],
-                        metric,
-                        min_overlap=min_overlap,
-                        thresh=0.0,
-                        compute_fp=False)
-                    tp, fp, fn, similarity, thresholds = rets
-                    thresholdss += thresholds.tolist()
-                thresholdss = np.array(thresholdss)
+                thresholds_fn = partial(
+                    _compute_part_thresholds,
+                    metric=metric,
+                    min_overlap=min_overlap)
+                thresholdss = list(
+                    map_fn(thresholds_fn, parted_overlaps, part_nums, parts))
+                thresholdss = np.concatenate(thresholdss)
                 thresholds = get_thresholds(thresholdss, total_num_valid_gt)
                 thresholds = np.array(thresholds)
+                statistics_fn = partial(
+                    _compute_part_statistics,
+                    metric=metric,
+                    min_overlap=min_overlap,
+                    thresholds=thresholds,
+                    compute_aos=compute_aos)
                 pr = np.zeros([len(thresholds), 4])
-                idx = 0
-                for j, num_part in enumerate(split_parts):
-                    gt_datas_part = np.concatenate(
-                        gt_datas_list[idx:idx + num_part], 0)
-                    dt_datas_part = np.concatenate(
-                        dt_datas_list[idx:idx + num_part], 0)
-                    dc_datas_part = np.concatenate(
-                        dontcares[idx:idx + num_part], 0)
-                    ignored_dets_part = np.concatenate(
-                        ignored_dets[idx:idx + num_part], 0)
-                    ignored_gts_part = np.concatenate(
-                        ignored_gts[idx:idx + num_part], 0)
-                    fused_compute_statistics(
-                        parted_overlaps[j],
-                        pr,
-                        total_gt_num[idx:idx + num_part],
-                        total_dt_num[idx:idx + num_part],
-                        total_dc_num[idx:idx + num_part],
-                        gt_datas_part,
-                        dt_datas_part,
-                        dc_datas_part,
-                        ignored_gts_part,
-                        ignored_dets_part,
-                        metric,
-                        min_overlap=min_overlap,
-                        thresholds=thresholds,
-                        compute_aos=compute_aos)
-                    idx += num_part
+                for pr_part in map_fn(statistics_fn, parted_overlaps,
+                                      part_nums, parts):
+                    pr += pr_part
                 for i in range(len(thresholds)):
                     recall[m, idx_l, k, i] = pr[i, 0] / (pr[i, 0] + pr[i, 2])
                     precision[m, idx_l, k, i] = pr[i, 0] / (
@@ -556,6 +650,8 @@ def eval_class(gt_annos,
                     if compute_aos:
                         aos[m, idx_l, k, i] = np.max(
                             aos[m, idx_l, k, i:], axis=-1)
+    if executor is not None:
+        executor.shutdown()
     ret_dict = {
         'recall': recall,
         'precision': precision,
@@ -597,9 +693,13 @@ def do_eval(gt_annos,
             dt_annos,
             current_classes,
             min_overlaps,
-            eval_types=['bbox', 'bev', '3d']):
+            eval_types=['bbox', 'bev', '3d'],
+            num_workers=0):
     # min_overlaps: [num_minoverlap, metric, num_class]
     difficultys = [0, 1, 2]
+    # the ignore flags and dontcare boxes of each (class, difficulty) are
+    # shared by all metrics, prepare them only once
+    prepared_parts = dict()
     mAP11_bbox = None
     mAP11_aos = None
     mAP40_bbox = None
@@ -612,7 +712,9 @@ def do_eval(gt_annos,
             difficultys,
             0,
             min_overlaps,
-            compute_aos=('aos' in eval_types))
+            compute_aos=('aos' in eval_types),
+            num_workers=num_workers,
+            prepared_parts=prepared_parts)
         # ret: [num_class, num_diff, num_minoverlap, num_sample_points]
         mAP11_bbox = get_mAP11(ret['precision'])
         mAP40_bbox = get_mAP40(ret['precision'])
@@ -623,16 +725,30 @@ def do_eval(gt_annos,
     mAP11_bev = None
     mAP40_bev = None
     if 'bev' in eval_types:
-        ret = eval_class(gt_annos, dt_annos, current_classes, difficultys, 1,
-                         min_overlaps)
+        ret = eval_class(
+            gt_annos,
+            dt_annos,
+            current_classes,
+            difficultys,
+            1,
+            min_overlaps,
+            num_workers=num_workers,
+            prepared_parts=prepared_parts)
         mAP11_bev = get_mAP11(ret['precision'])
         mAP40_bev = get_mAP40(ret['precision'])
 
     mAP11_3d = None
     mAP40_3d = None
     if '3d' in eval_types:
-        ret = eval_class(gt_annos, dt_annos, current_classes, difficultys, 2,
-                         min_overlaps)
+        ret = eval_class(
+            gt_annos,
+            dt_annos,
+            current_classes,
+            difficultys,
+            2,
+            min_overlaps,
+            num_workers=num_workers,
+            prepared_parts=prepared_parts)
         mAP11_3d = get_mAP11(ret['precision'])
         mAP40_3d = get_mAP40(ret['precision'])
     return (mAP11_bbox, mAP11_bev, mAP11_3d, mAP11_aos, mAP40_bbox, mAP40_bev,
@@ -662,7 +778,8 @@ def do_coco_style_eval(gt_annos, dt_annos, current_classes, overlap_ranges,
 def kitti_eval(gt_annos,
                dt_annos,
                current_classes,
-               eval_types=['bbox', 'bev', '3d']):
+               eval_types=['bbox', 'bev', '3d'],
+               num_workers=0):
     """KITTI evaluation.
 
     Args:
@@ -671,6 +788,8 @@ def kitti_eval(gt_annos,
         current_classes (list[str]): Classes to evaluation.
         eval_types (list[str], optional): Types to eval.
             Defaults to ['bbox', 'bev', '3d'].
+        num_workers (int, optional): Number of threads used to compute the
+            statistics in parallel. Defaults to 0.
 
     Returns:
         tuple: String and dict of evaluation results.
@@ -724,7 +843,7 @@ def kitti_eval(gt_annos,
     mAP11_bbox, mAP11_bev, mAP11_3d, mAP11_aos, mAP40_bbox, mAP40_bev, \
         mAP40_3d, mAP40_aos = do_eval(gt_annos, dt_annos,
                                       current_classes, min_overlaps,
-                                      eval_types)
+                                      eval_types, num_workers)
 
     ret_dict = {}
     difficulty = ['easy', 'moderate', 'hard']
@@ -1,4 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from multiprocessing import Pool
+
 import numpy as np
 from mmcv.utils import print_log
 from terminaltables import AsciiTable
@@ -67,10 +69,16 @@ def get_acc_cls(hist):
     return np.nanmean(np.diag(hist) / hist.sum(axis=1))
 
 
-def seg_eval(gt_labels, seg_preds, label2cat, ignore_index, logger=None):
+def seg_eval(gt_labels,
+             seg_preds,
+             label2cat,
+             ignore_index,
+             logger=None,
+             num_workers=0):
     """Semantic Segmentation  Evaluation.
 
-    Evaluate the result of the Semantic Segmentation.
+    Evaluate the result of the Semantic Segmentation. The confusion matrix
+    is accumulated scene by scene.
 
     Args:
         gt_labels (list[torch.Tensor]): Ground truth labels.
@@ -79,6 +87,10 @@ def seg_eval(gt_labels, seg_preds, label2cat, ignore_index, logger=None):
         ignore_index (int): Index that will be ignored in evaluation.
         logger (logging.Logger | str, optional): The way to print the mAP
             summary. See `mmdet.utils.print_log()` for details. Default: None.
+        num_workers (int, optional): Number of processes computing the
+            confusion matrices of the scenes, which are then summed. The
+            scenes are processed in the main process if set to 0.
+            Default: 0.
 
     Returns:
         dict[str, float]: Dict of results.
@@ -86,22 +98,66 @@ def seg_eval(gt_labels, seg_preds, label2cat, ignore_index, logger=None):
     assert len(seg_preds) == len(gt_labels)
     num_classes = len(label2cat)
 
-    hist_list = []
-    for i in range(len(gt_labels)):
-        gt_seg = gt_labels[i].clone().numpy().astype(np.int)
-        pred_seg = seg_preds[i].clone().numpy().astype(np.int)
+    hist = np.zeros((num_classes, num_classes), dtype=np.int64)
+    scenes = ((gt_labels[i], seg_preds[i], num_classes, ignore_index)
+              for i in range(len(gt_labels)))
+    if num_workers > 0:
+        with Pool(num_workers) as pool:
+            for scene in pool.imap_unordered(_scene_hist, scenes):
+                hist += scene
+    else:
+        for scene in scenes:
+            hist += _scene_hist(scene)
+
+    return summarize_seg_hist(hist, label2cat, logger=logger)
+
+
+def _scene_hist(args):
+    """Wrapper of :func:`scene_hist` with packed arguments for
+    ``Pool.imap_unordered``."""
+    return scene_hist(*args)
+
+
+def scene_hist(gt_labels, seg_preds, num_classes, ignore_index):
+    """Compute the confusion matrix of one scene.
+
+    Args:
+        gt_labels (torch.Tensor | np.ndarray): Ground truth labels.
+        seg_preds (torch.Tensor | np.ndarray): Predictions.
+        num_classes (int): Number of classes.
+        ignore_index (int): Index that will be ignored in evaluation.
+
+    Returns:
+        np.ndarray: Confusion matrix with shape of (num_classes, num_classes).
+    """
+    gt_seg = np.asarray(gt_labels).astype(np.int64, copy=False)
+    pred_seg = np.asarray(seg_preds).astype(np.int64, copy=False)
+
+    # filter out ignored points
+    valid = gt_seg != ignore_index
+
+    # calculate one instance result
+    return fast_hist(pred_seg[valid], gt_seg[valid], num_classes)
 
-        # filter out ignored points
-        pred_seg[gt_seg == ignore_index] = -1
-        gt_seg[gt_seg == ignore_index] = -1
 
-        # calculate one instance result
-        hist_list.append(fast_hist(pred_seg, gt_seg, num_classes))
+def summarize_seg_hist(hist, label2cat, logger=None):
+    """Compute the metrics from the confusion matrix of all the scenes and
+    print them as a table.
 
-    iou = per_class_iou(sum(hist_list))
+    Args:
+        hist (np.ndarray): Overall confusion matrix
+            (num_classes, num_classes).
+        label2cat (dict): Map from label to category name.
+        logger (logging.Logger | str, optional): The way to print the mAP
+            summary. See `mmdet.utils.print_log()` for details. Default: None.
+
+    Returns:
+        dict[str, float]: Dict of results.
+    """
+    iou = per_class_iou(hist)
     miou = np.nanmean(iou)
-    acc = get_acc(sum(hist_list))
-    acc_cls = get_acc_cls(sum(hist_list))
+    acc = get_acc(hist)
+    acc_cls = get_acc_cls(hist)
 
     header = ['classes']
     for i in range(len(label2cat)):
@@ -2,7 +2,7 @@
 import numba
 import numpy as np
 import torch
-from mmcv.ops import nms, nms_rotated
+from mmcv.ops import box_iou_rotated, nms, nms_rotated
 
 
 def box3d_multiclass_nms(mlvl_bboxes,
@@ -44,77 +44,30 @@ def box3d_multiclass_nms(mlvl_bboxes,
     # do multi class nms
     # the fg class id range: [0, num_classes-1]
     num_classes = mlvl_scores.shape[1] - 1
-    bboxes = []
-    scores = []
-    labels = []
-    dir_scores = []
-    attr_scores = []
-    bboxes2d = []
-    for i in range(0, num_classes):
-        # get bboxes and scores of this class
-        cls_inds = mlvl_scores[:, i] > score_thr
-        if not cls_inds.any():
-            continue
-
-        _scores = mlvl_scores[cls_inds, i]
-        _bboxes_for_nms = mlvl_bboxes_for_nms[cls_inds, :]
-
-        if cfg.use_rotate_nms:
-            nms_func = nms_bev
-        else:
-            nms_func = nms_normal_bev
-
-        selected = nms_func(_bboxes_for_nms, _scores, cfg.nms_thr)
-        _mlvl_bboxes = mlvl_bboxes[cls_inds, :]
-        bboxes.append(_mlvl_bboxes[selected])
-        scores.append(_scores[selected])
-        cls_label = mlvl_bboxes.new_full((len(selected), ),
-                                         i,
-                                         dtype=torch.long)
-        labels.append(cls_label)
-
-        if mlvl_dir_scores is not None:
-            _mlvl_dir_scores = mlvl_dir_scores[cls_inds]
-            dir_scores.append(_mlvl_dir_scores[selected])
-        if mlvl_attr_scores is not None:
-            _mlvl_attr_scores = mlvl_attr_scores[cls_inds]
-            attr_scores.append(_mlvl_attr_scores[selected])
-        if mlvl_bboxes2d is not None:
-            _mlvl_bboxes2d = mlvl_bboxes2d[cls_inds]
-            bboxes2d.append(_mlvl_bboxes2d[selected])
-
-    if bboxes:
-        bboxes = torch.cat(bboxes, dim=0)
-        scores = torch.cat(scores, dim=0)
-        labels = torch.cat(labels, dim=0)
-        if mlvl_dir_scores is not None:
-            dir_scores = torch.cat(dir_scores, dim=0)
-        if mlvl_attr_scores is not None:
-            attr_scores = torch.cat(attr_scores, dim=0)
-        if mlvl_bboxes2d is not None:
-            bboxes2d = torch.cat(bboxes2d, dim=0)
-        if bboxes.shape[0] > max_num:
-            _, inds = scores.sort(descending=True)
-            inds = inds[:max_num]
-            bboxes = bboxes[inds, :]
-            labels = labels[inds]
-            scores = scores[inds]
-            if mlvl_dir_scores is not None:
-                dir_scores = dir_scores[inds]
-            if mlvl_attr_scores is not None:
-                attr_scores = attr_scores[inds]
-            if mlvl_bboxes2d is not None:
-                bboxes2d = bboxes2d[inds]
-    else:
-        bboxes = mlvl_scores.new_zeros((0, mlvl_bboxes.size(-1)))
-        scores = mlvl_scores.new_zeros((0, ))
-        labels = mlvl_scores.new_zeros((0, ), dtype=torch.long)
-        if mlvl_dir_scores is not None:
-            dir_scores = mlvl_scores.new_zeros((0, ))
-        if mlvl_attr_scores is not None:
-            attr_scores = mlvl_scores.new_zeros((0, ))
-        if mlvl_bboxes2d is not None:
-            bboxes2d = mlvl_scores.new_zeros((0, 4))
+    # the boxes of all the classes are suppressed in a single pass, with the
+    # class as the group of the NMS
+    box_inds, labels = torch.nonzero(
+        mlvl_scores[:, :num_classes] > score_thr, as_tuple=True)
+    scores = mlvl_scores[box_inds, labels]
+    selected = batched_nms_bev(
+        mlvl_bboxes_for_nms[box_inds],
+        scores,
+        cfg.nms_thr,
+        groups=labels,
+        use_rotate_nms=cfg.use_rotate_nms)
+    if selected.shape[0] > max_num:
+        _, inds = scores[selected].sort(descending=True)
+        selected = selected[inds[:max_num]]
+    box_inds = box_inds[selected]
+    bboxes = mlvl_bboxes[box_inds]
+    scores = scores[selected]
+    labels = labels[selected]
+    if mlvl_dir_scores is not None:
+        dir_scores = mlvl_dir_scores[box_inds]
+    if mlvl_attr_scores is not None:
+        attr_scores = mlvl_attr_scores[box_inds]
+    if mlvl_bboxes2d is not None:
+        bboxes2d = mlvl_bboxes2d[box_inds]
 
     results = (bboxes, scores, labels)
 
@@ -198,7 +151,8 @@ def circle_nms(dets, thresh, post_max_size=83):
     x1 = dets[:, 0]
     y1 = dets[:, 1]
     scores = dets[:, 2]
-    order = scores.argsort()[::-1].astype(np.int32)  # highest->lowest
+    # highest->lowest, the ties are kept in index order
+    order = (-scores).argsort(kind='mergesort').astype(np.int32)
     ndets = dets.shape[0]
     suppressed = np.zeros((ndets), dtype=np.int32)
     keep = []
@@ -225,6 +179,298 @@ def circle_nms(dets, thresh, post_max_size=83):
     return keep
 
 
+def batched_circle_nms(centers,
+                       scores,
+                       thresh,
+                       groups=None,
+                       post_max_size=None):
+    """Circular NMS of several groups of detections on torch tensors.
+
+    It gives the same results as :func:`circle_nms` on each group, e.g. the
+    detections of one task in one sample, without leaving the device of the
+    inputs. The centers are bucketed into a BEV grid whose cells are at least
+    as large as the suppression radius, so that each detection is only
+    compared with the detections of the same group in the 3x3 neighbouring
+    cells. The greedy suppression is then resolved on these pairs in
+    parallel: a detection is kept once all the higher-scored detections
+    around it are suppressed, and suppressed once one of them is kept.
+
+    Args:
+        centers (torch.Tensor): BEV centers of the detections with the shape
+            of [N, 2].
+        scores (torch.Tensor): Scores of the detections with the shape of
+            [N].
+        thresh (float | torch.Tensor): Threshold on the squared distance,
+            either one for all the detections or one per detection with the
+            shape of [N]. The detections of a group must share the same
+            threshold, since each group is bucketed with a single cell
+            size.
+        groups (torch.Tensor, optional): Group index of each detection with
+            the shape of [N]. Detections of different groups never suppress
+            each other. Defaults to None, i.e. a single group.
+        post_max_size (int, optional): Max number of detections to be kept
+            in each group. Defaults to None.
+
+    Returns:
+        torch.Tensor: Indexes of the detections to be kept, sorted by group
+            and then by decreasing score.
+    """
+    num_dets = scores.shape[0]
+    device = scores.device
+    if num_dets == 0:
+        return torch.zeros(0, dtype=torch.long, device=device)
+    if groups is None:
+        groups = torch.zeros(num_dets, dtype=torch.long, device=device)
+    groups = groups.long()
+    thresh = torch.as_tensor(
+        thresh, dtype=torch.float64, device=device).expand(num_dets)
+    order, rank = _rank_by_group_and_score(scores, groups)
+
+    # cells slightly larger than the radius of each group
+    centers = centers.float()
+    src, dst = _neighbour_pairs(centers, groups,
+                                thresh.clamp(min=0).sqrt() * 1.01)
+
+    # a detection suppresses the lower-ranked detections within the radius
+    dist = ((centers[src] - centers[dst])**2).sum(1)
+    suppress = (rank[src] < rank[dst]) & (dist.double() <= thresh[src])
+    keep = _greedy_keep(order, src[suppress], dst[suppress])
+    if post_max_size is not None:
+        # position of the first kept detection of each group
+        keep_groups = groups[keep]
+        group_starts = _count_not_greater(keep_groups, keep_groups - 1)
+        keep = keep[torch.arange(keep.shape[0], device=device) -
+                    group_starts < post_max_size]
+    return keep
+
+
+def batched_nms_bev(boxes,
+                    scores,
+                    thresh,
+                    groups=None,
+                    use_rotate_nms=True,
+                    max_iters=16):
+    """NMS of several groups of BEV boxes in a single pass.
+
+    It keeps the same boxes as :func:`nms_bev` or :func:`nms_normal_bev` on
+    each group, e.g. the boxes of one class in one sample, without a call
+    per group. Like :func:`batched_circle_nms`, the boxes are bucketed into
+    a BEV grid to find the pairs of boxes of the same group that may
+    overlap, their IoUs are computed as in the NMS kernels of mmcv, and the
+    greedy suppression is resolved on these pairs in parallel. The same
+    torch operations run on CPU and CUDA tensors.
+
+    Sizing the grid and checking whether the suppression is resolved
+    synchronize with the device, the latter once per iteration of the
+    resolution. Long chains of overlapping boxes need many iterations, so
+    after ``max_iters`` iterations the NMS falls back to a call of
+    :func:`nms_bev` or :func:`nms_normal_bev` per group.
+
+    Args:
+        boxes (torch.Tensor): Input boxes with the shape of [N, 5]
+            ([x1, y1, x2, y2, ry]).
+        scores (torch.Tensor): Scores of boxes with the shape of [N].
+        thresh (float): Overlap threshold of NMS.
+        groups (torch.Tensor, optional): Group index of each box with the
+            shape of [N]. Boxes of different groups never suppress each
+            other. Defaults to None, i.e. a single group.
+        use_rotate_nms (bool, optional): Whether to use the rotated IoU of
+            :func:`nms_bev` rather than the axis-aligned IoU of
+            :func:`nms_normal_bev`. Defaults to True.
+        max_iters (int, optional): Max number of iterations of the parallel
+            suppression before falling back to a NMS call per group.
+            Defaults to 16.
+
+    Returns:
+        torch.Tensor: Indexes of the boxes to be kept, sorted by group and
+            then by decreasing score.
+    """
+    assert boxes.size(1) == 5, 'Input boxes shape should be [N, 5]'
+    num_boxes = scores.shape[0]
+    device = scores.device
+    if num_boxes == 0:
+        return torch.zeros(0, dtype=torch.long, device=device)
+    if groups is None:
+        groups = torch.zeros(num_boxes, dtype=torch.long, device=device)
+    groups = groups.long()
+    order, rank = _rank_by_group_and_score(scores, groups)
+
+    # two boxes overlap only if their centers are closer than the sum of
+    # their half diagonals, so cells of twice the largest one are enough
+    boxes = boxes.float()
+    centers = (boxes[:, :2] + boxes[:, 2:4]) / 2
+    dims = boxes[:, 2:4] - boxes[:, :2]
+    radius = dims.norm(dim=1) / 2 * 1.01
+    src, dst = _neighbour_pairs(centers, groups,
+                                (radius.max() * 2).expand(num_boxes))
+    dist = (centers[src] - centers[dst]).norm(dim=1)
+    candidates = (rank[src] < rank[dst]) & (dist <= radius[src] + radius[dst])
+    src, dst = src[candidates], dst[candidates]
+
+    # the IoUs of the pairs, with the operations of the kernels of mmcv
+    if src.shape[0] == 0:
+        ious = boxes.new_zeros(0)
+    elif use_rotate_nms:
+        boxes_xywhr = torch.cat([centers, dims, boxes[:, 4:]], dim=1)
+        ious = box_iou_rotated(
+            boxes_xywhr[src], boxes_xywhr[dst], aligned=True)
+    else:
+        areas = dims[:, 0] * dims[:, 1]
+        lt = torch.max(boxes[src, :2], boxes[dst, :2])
+        rb = torch.min(boxes[src, 2:4], boxes[dst, 2:4])
+        inter_dims = (rb - lt).clamp(min=0)
+        inter = inter_dims[:, 0] * inter_dims[:, 1]
+        ious = inter / (areas[src] + areas[dst] - inter)
+    suppress = ious > thresh
+    keep = _greedy_keep(order, src[suppress], dst[suppress], max_iters)
+    if keep is not None:
+        return keep
+
+    # too many iterations, suppress the boxes of each group on its own
+    nms_func = nms_bev if use_rotate_nms else nms_normal_bev
+    keep = []
+    for group in torch.unique(groups):
+        inds = torch.nonzero(groups == group, as_tuple=False).view(-1)
+        keep.append(inds[nms_func(boxes[inds], scores[inds], thresh)])
+    return torch.cat(keep)
+
+
+def _rank_by_group_and_score(scores, groups):
+    """Order and rank of the detections by group and then by decreasing
+    score.
+
+    The ties of scores are broken by index, as in :func:`circle_nms`.
+    """
+    num_dets = scores.shape[0]
+    arange = torch.arange(num_dets, device=scores.device)
+    # a unique key per detection, as stable sorts need PyTorch>=1.9
+    _, dense_rank = torch.unique(-scores, sorted=True, return_inverse=True)
+    score_rank = torch.empty_like(arange)
+    score_rank[torch.argsort(dense_rank * num_dets + arange)] = arange
+    order = torch.argsort(groups * num_dets + score_rank)
+    rank = torch.empty_like(arange)
+    rank[order] = arange
+    return order, rank
+
+
+def _neighbour_pairs(centers, groups, cell_size):
+    """Pairs of detections of the same group in neighbouring cells of a BEV
+    grid, including the pairs of a detection with itself.
+
+    Args:
+        centers (torch.Tensor): BEV centers of the detections with the shape
+            of [N, 2].
+        groups (torch.Tensor): Group index of each detection with the shape
+            of [N].
+        cell_size (torch.Tensor): Size of the cells of the group of each
+            detection with the shape of [N].
+
+    Returns:
+        tuple[torch.Tensor]: Indexes of the first and the second detection
+            of each pair.
+    """
+    device = centers.device
+    # the number of cells is bounded to keep the keys in int64
+    xy_min = centers.min(0)[0]
+    extent = float((centers.max(0)[0] - xy_min).max())
+    cell_size = cell_size.clamp(min=max(extent / 2**20, 1e-6)).float()
+    cells = ((centers - xy_min) / cell_size.view(-1, 1)).long() + 1
+    num_x, num_y = [int(c) + 2 for c in cells.max(0)[0]]
+    keys = (groups * num_x + cells[:, 0]) * num_y + cells[:, 1]
+    sorted_keys, key_order = torch.sort(keys)
+
+    # the 3 cells of a column are contiguous in the sorted keys
+    column_keys = keys.view(-1, 1) + torch.tensor([-num_y, 0, num_y],
+                                                  device=device).view(1, -1)
+    column_keys = column_keys.view(-1)
+    # the sorted keys from column_key - 1 to column_key + 1
+    bounds = _count_not_greater(sorted_keys,
+                                torch.cat([column_keys - 2, column_keys + 1]))
+    starts, ends = bounds.view(2, -1)
+    counts = ends - starts
+    segments = torch.arange(
+        counts.shape[0], device=device).repeat_interleave(counts)
+    offsets = (starts - counts.cumsum(0) + counts)[segments]
+    # the 3 columns of a detection are consecutive segments
+    num_pairs = counts.view(-1, 3).sum(1)
+    src = torch.arange(
+        keys.shape[0], device=device).repeat_interleave(num_pairs)
+    dst = key_order[torch.arange(segments.shape[0], device=device) + offsets]
+    return src, dst
+
+
+def _count_not_greater(sorted_values, values):
+    """Number of the sorted values that are not greater than each value.
+
+    It is ``torch.searchsorted(sorted_values, values, right=True)``, which is
+    only available since PyTorch 1.6, computed by sorting the values
+    together.
+
+    Args:
+        sorted_values (torch.Tensor): Sorted integer values with the shape
+            of [M].
+        values (torch.Tensor): Integer values with the shape of [N].
+
+    Returns:
+        torch.Tensor: The counts with the shape of [N].
+    """
+    num_sorted = sorted_values.shape[0]
+    # each value goes right after the equal sorted values
+    merged_order = torch.argsort(
+        torch.cat([sorted_values * 2, values * 2 + 1]))
+    is_value = merged_order >= num_sorted
+    counts = torch.arange(
+        merged_order.shape[0],
+        device=values.device) - is_value.long().cumsum(0) + 1
+    result = torch.empty_like(values)
+    result[merged_order[is_value] - num_sorted] = counts[is_value]
+    return result
+
+
+def _greedy_keep(order, src, dst, max_iters=None):
+    """Resolve the greedy suppression of the detections in parallel.
+
+    A detection is kept once all the detections that may suppress it are
+    suppressed, and suppressed once one of them is kept. Each iteration
+    decides at least the undecided detection of highest priority, so the
+    number of iterations is bounded by the length of the longest chain of
+    suppressions.
+
+    Args:
+        order (torch.Tensor): Indexes of the detections by decreasing
+            priority.
+        src (torch.Tensor): Indexes of the detections that suppress the
+            detections in ``dst`` if they are kept.
+        dst (torch.Tensor): Indexes of the suppressed detections.
+        max_iters (int, optional): Max number of iterations. Defaults to
+            None, i.e. no limit.
+
+    Returns:
+        torch.Tensor | None: Indexes of the kept detections, in the given
+            order, or None if they are not decided within ``max_iters``
+            iterations.
+    """
+    num_dets = order.shape[0]
+    device = order.device
+    # 1 for kept, -1 for suppressed and 0 for undecided detections
+    state = torch.zeros(num_dets, dtype=torch.int8, device=device)
+    num_iters = 0
+    while True:
+        if max_iters is not None and num_iters >= max_iters:
+            return None
+        num_iters += 1
+        state[dst[state[src] == 1]] = -1
+        blocked = torch.zeros(num_dets, dtype=torch.bool, device=device)
+        blocked[dst[state[src] == 0]] = True
+        state[(state == 0) & ~blocked] = 1
+        undecided = state == 0
+        if not undecided.any():
+            break
+        pending = undecided[dst] & (state[src] >= 0)
+        src, dst = src[pending], dst[pending]
+    return order[state[order] == 1]
+
+
 # This function duplicates functionality of mmcv.ops.iou_3d.nms_bev
 # from mmcv<=1.5, but using cuda ops from mmcv.ops.nms.nms_rotated.
 # Nms api will be unified in mmdetection3d one day.
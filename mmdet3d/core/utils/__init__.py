@@ -1,10 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .array_converter import ArrayConverter, array_converter
-from .gaussian import (draw_heatmap_gaussian, ellip_gaussian2D, gaussian_2d,
-                       gaussian_radius, get_ellip_gaussian_2D)
+from .gaussian import (draw_heatmap_gaussian, draw_heatmap_gaussian_batch,
+                       ellip_gaussian2D, gaussian_2d, gaussian_radius,
+                       get_ellip_gaussian_2D)
+from .tensor_cache import TensorCache
 
 __all__ = [
     'gaussian_2d', 'gaussian_radius', 'draw_heatmap_gaussian',
-    'ArrayConverter', 'array_converter', 'ellip_gaussian2D',
-    'get_ellip_gaussian_2D'
+    'draw_heatmap_gaussian_batch', 'ArrayConverter', 'array_converter',
+    'ellip_gaussian2D', 'get_ellip_gaussian_2D', 'TensorCache'
 ]
@@ -54,11 +54,63 @@ def draw_heatmap_gaussian(heatmap, center, radius, k=1):
     return heatmap
 
 
+def draw_heatmap_gaussian_batch(heatmap, map_inds, centers, radius, k=1):
+    """Draw the gaussians of many objects on a stack of heatmaps at once.
+
+    The result is the same as calling :func:`draw_heatmap_gaussian` on
+    ``heatmap[map_inds[i]]`` for each object ``i``, but the gaussians are
+    computed as a batch and written by a single scatter-max.
+
+    Args:
+        heatmap (torch.Tensor): Contiguous heatmaps in shape (M, H, W).
+        map_inds (torch.Tensor): Index of the heatmap of each object in
+            shape (N, ).
+        centers (torch.Tensor): Integer center coords (x, y) of each object
+            in shape (N, 2).
+        radius (torch.Tensor): Integer radius of each object in shape (N, ).
+        k (int, optional): Multiple of masked_gaussian. Defaults to 1.
+
+    Returns:
+        torch.Tensor: Masked heatmap.
+    """
+    if centers.shape[0] == 0:
+        return heatmap
+    if not hasattr(heatmap, 'scatter_reduce_'):
+        # scatter_reduce_ is only available since PyTorch 1.12
+        for map_ind, center, r in zip(map_inds.tolist(), centers.tolist(),
+                                      radius.tolist()):
+            draw_heatmap_gaussian(heatmap[map_ind], center, r, k=k)
+        return heatmap
+
+    height, width = heatmap.shape[1:]
+    radius = radius.long().view(-1, 1, 1)
+    max_radius = int(radius.max())
+    offsets = torch.arange(-max_radius, max_radius + 1, device=heatmap.device)
+    dy, dx = offsets.view(1, -1, 1), offsets.view(1, 1, -1)
+    xs = centers[:, 0].long().view(-1, 1, 1) + dx
+    ys = centers[:, 1].long().view(-1, 1, 1) + dy
+    valid = (dx.abs() <= radius) & (dy.abs() <= radius)
+    valid &= (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+
+    # same kernel as gaussian_2d, whose maximum is 1 at the center
+    sigma = (2 * radius + 1).double() / 6
+    gaussian = torch.exp(-(dx * dx + dy * dy).double() / (2 * sigma * sigma))
+    gaussian[gaussian < torch.finfo(gaussian.dtype).eps] = 0
+    gaussian = gaussian.to(torch.float32) * k
+
+    flat_inds = (map_inds.long().view(-1, 1, 1) * height + ys) * width + xs
+    heatmap.view(-1).scatter_reduce_(
+        0, flat_inds[valid], gaussian[valid].to(heatmap.dtype), reduce='amax')
+    return heatmap
+
+
 def gaussian_radius(det_size, min_overlap=0.5):
     """Get radius of gaussian.
 
     Args:
-        det_size (tuple[torch.Tensor]): Size of the detection result.
+        det_size (tuple[torch.Tensor]): Size of the detection result. The
+            radii of several objects are computed at once when the sizes
+            are tensors in shape (N, ).
         min_overlap (float, optional): Gaussian_overlap. Defaults to 0.5.
 
     Returns:
@@ -83,7 +135,7 @@ def gaussian_radius(det_size, min_overlap=0.5):
     c3 = (min_overlap - 1) * width * height
     sq3 = torch.sqrt(b3**2 - 4 * a3 * c3)
     r3 = (b3 + sq3) / 2
-    return min(r1, r2, r3)
+    return torch.min(torch.min(r1, r2), r3)
 
 
 def get_ellip_gaussian_2D(heatmap, center, radius_x, radius_y, k=1):
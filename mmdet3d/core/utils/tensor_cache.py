@@ -0,0 +1,56 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from collections import OrderedDict
+
+
+class TensorCache(object):
+    """LRU cache of values computed from tensors that are passed again and
+    again, e.g. the anchors of a given feature map size.
+
+    A tensor is identified by its memory, layout, dtype, device and version
+    counter, so that an in-place update of the tensor invalidates its values.
+    The tensor is kept alive with its value, so that its memory is not reused
+    by another tensor while it is cached. Tensors that require grad are not
+    cached.
+
+    Args:
+        max_size (int, optional): Maximum number of cached values.
+            Defaults to 8.
+    """
+
+    def __init__(self, max_size=8):
+        self.max_size = max_size
+        self._cache = OrderedDict()
+
+    def get(self, tensor, func, *args):
+        """Get ``func(tensor, *args)`` from the cache, or compute and cache
+        it.
+
+        Args:
+            tensor (torch.Tensor): Tensor the value is computed from.
+            func (callable): Function that computes the value.
+            args (tuple): Other hashable arguments of ``func``.
+
+        Returns:
+            Any: The value of ``func(tensor, *args)``.
+        """
+        if self.max_size <= 0 or tensor.requires_grad:
+            return func(tensor, *args)
+        try:
+            version = tensor._version
+        except RuntimeError:
+            # inference tensors do not track their version
+            return func(tensor, *args)
+        key = (tensor.data_ptr(), tensor.shape, tensor.stride(), tensor.dtype,
+               tensor.device, version, func, args)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key][1]
+        value = func(tensor, *args)
+        self._cache[key] = (tensor, value)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop all the cached values."""
+        self._cache.clear()
@@ -81,6 +81,12 @@ def points_to_voxel(points,
                     max_voxels=20000):
     """convert kitti points(N, >=3) to voxels.
 
+    The points are grouped by voxel with hash tables instead of a lookup
+    array of the whole voxel grid, and the work is spread over the threads
+    of numba (see ``NUMBA_NUM_THREADS``). The voxels are numbered in the
+    order of their first point, as if the points were processed one after
+    another.
+
     Args:
         points (np.ndarray): [N, ndim]. points[:, :3] contain xyz points and
             points[:, 3:] contain other information such as reflectivity.
@@ -106,175 +112,229 @@ def points_to_voxel(points,
         voxel_size = np.array(voxel_size, dtype=points.dtype)
     if not isinstance(coors_range, np.ndarray):
         coors_range = np.array(coors_range, dtype=points.dtype)
-    voxelmap_shape = (coors_range[3:] - coors_range[:3]) / voxel_size
-    voxelmap_shape = tuple(np.round(voxelmap_shape).astype(np.int32).tolist())
-    if reverse_index:
-        voxelmap_shape = voxelmap_shape[::-1]
-    # don't create large array in jit(nopython=True) code.
-    num_points_per_voxel = np.zeros(shape=(max_voxels, ), dtype=np.int32)
-    coor_to_voxelidx = -np.ones(shape=voxelmap_shape, dtype=np.int32)
-    voxels = np.zeros(
-        shape=(max_voxels, max_points, points.shape[-1]), dtype=points.dtype)
-    coors = np.zeros(shape=(max_voxels, 3), dtype=np.int32)
-    if reverse_index:
-        voxel_num = _points_to_voxel_reverse_kernel(
-            points, voxel_size, coors_range, num_points_per_voxel,
-            coor_to_voxelidx, voxels, coors, max_points, max_voxels)
-
-    else:
-        voxel_num = _points_to_voxel_kernel(points, voxel_size, coors_range,
-                                            num_points_per_voxel,
-                                            coor_to_voxelidx, voxels, coors,
-                                            max_points, max_voxels)
-
-    coors = coors[:voxel_num]
-    voxels = voxels[:voxel_num]
-    num_points_per_voxel = num_points_per_voxel[:voxel_num]
+    grid_size = (coors_range[3:] - coors_range[:3]) / voxel_size
+    grid_size = np.round(grid_size).astype(np.int64)
+    num_points = points.shape[0]
+
+    # linear index of the voxel of each point, -1 for the points out of range
+    keys = np.empty((num_points, ), dtype=np.int64)
+    _points_to_keys_kernel(points, voxel_size, coors_range, grid_size, keys)
 
+    # group the points by voxel with a hash table per partition of the keys,
+    # the partitions are processed in parallel
+    num_threads = numba.get_num_threads()
+    num_parts = num_threads * 4 if num_threads > 1 else 1
+    part_inds, part_offsets = _partition_keys_kernel(keys, num_threads,
+                                                     num_parts)
+    first_inds = np.empty((num_points, ), dtype=np.int64)
+    positions = np.empty((num_points, ), dtype=np.int64)
+    counts = np.empty((num_points, ), dtype=np.int64)
+    _group_keys_kernel(keys, part_inds, part_offsets, first_inds, positions,
+                       counts)
+
+    # voxels are numbered by their first point, as when the points are
+    # processed one after another
+    voxel_inds = np.empty((num_points, ), dtype=np.int64)
+    voxel_num = _number_voxels_kernel(keys, first_inds, voxel_inds)
+    voxel_num = min(voxel_num, max_voxels)
+
+    voxels = np.zeros(
+        shape=(voxel_num, max_points, points.shape[-1]), dtype=points.dtype)
+    coors = np.zeros(shape=(voxel_num, 3), dtype=np.int32)
+    num_points_per_voxel = np.zeros(shape=(voxel_num, ), dtype=np.int32)
+    _fill_voxels_kernel(points, keys, grid_size, first_inds, positions, counts,
+                        voxel_inds, voxels, coors, num_points_per_voxel,
+                        reverse_index)
     return voxels, coors, num_points_per_voxel
 
 
-@numba.jit(nopython=True)
-def _points_to_voxel_reverse_kernel(points,
-                                    voxel_size,
-                                    coors_range,
-                                    num_points_per_voxel,
-                                    coor_to_voxelidx,
-                                    voxels,
-                                    coors,
-                                    max_points=35,
-                                    max_voxels=20000):
-    """convert kitti points(N, >=3) to voxels.
+@numba.njit(parallel=True)
+def _points_to_keys_kernel(points, voxel_size, coors_range, grid_size, keys):
+    """Compute the linear voxel index of each point in parallel.
 
     Args:
-        points (np.ndarray): [N, ndim]. points[:, :3] contain xyz points and
-            points[:, 3:] contain other information such as reflectivity.
-        voxel_size (list, tuple, np.ndarray): [3] xyz, indicate voxel size
-        coors_range (list[float | tuple[float] | ndarray]): Range of voxels.
-            format: xyzxyz, minmax
-        num_points_per_voxel (int): Number of points per voxel.
-        coor_to_voxel_idx (np.ndarray): A voxel grid of shape (D, H, W),
-            which has the same shape as the complete voxel map. It indicates
-            the index of each corresponding voxel.
-        voxels (np.ndarray): Created empty voxels.
-        coors (np.ndarray): Created coordinates of each voxel.
-        max_points (int): Indicate maximum points contained in a voxel.
-        max_voxels (int): Maximum number of voxels this function create.
-            for second, 20000 is a good choice. Points should be shuffled for
-            randomness before this function because max_voxels drops points.
-
-    Returns:
-        tuple[np.ndarray]:
-            voxels: Shape [M, max_points, ndim], only contain points.
-            coordinates: Shape [M, 3].
-            num_points_per_voxel: Shape [M].
+        points (np.ndarray): [N, ndim]. points[:, :3] contain xyz points.
+        voxel_size (np.ndarray): [3] xyz, indicate voxel size.
+        coors_range (np.ndarray): Range of voxels. format: xyzxyz, minmax
+        grid_size (np.ndarray): [3] xyz, number of voxels along each axis.
+        keys (np.ndarray): Created keys of shape [N]. The key of a point is
+            ``(x * grid_size[1] + y) * grid_size[2] + z`` where (x, y, z) is
+            its voxel, or -1 if the point is out of range.
     """
-    # put all computations to one loop.
-    # we shouldn't create large array in main jit code, otherwise
-    # reduce performance
     N = points.shape[0]
-    # ndim = points.shape[1] - 1
     ndim = 3
-    ndim_minus_1 = ndim - 1
-    grid_size = (coors_range[3:] - coors_range[:3]) / voxel_size
-    # np.round(grid_size)
-    # grid_size = np.round(grid_size).astype(np.int64)(np.int32)
-    grid_size = np.round(grid_size, 0, grid_size).astype(np.int32)
-    coor = np.zeros(shape=(3, ), dtype=np.int32)
-    voxel_num = 0
-    failed = False
-    for i in range(N):
-        failed = False
+    for i in numba.prange(N):
+        key = 0
         for j in range(ndim):
             c = np.floor((points[i, j] - coors_range[j]) / voxel_size[j])
             if c < 0 or c >= grid_size[j]:
-                failed = True
+                key = -1
                 break
-            coor[ndim_minus_1 - j] = c
-        if failed:
-            continue
-        voxelidx = coor_to_voxelidx[coor[0], coor[1], coor[2]]
-        if voxelidx == -1:
-            voxelidx = voxel_num
-            if voxel_num >= max_voxels:
-                continue
+            key = key * grid_size[j] + np.int64(c)
+        keys[i] = key
+
+
+@numba.njit(parallel=True)
+def _partition_keys_kernel(keys, num_chunks, num_parts):
+    """Split the points in range into partitions of keys in parallel.
+
+    All the points of a voxel are in the same partition, which keeps them in
+    their order.
+
+    Args:
+        keys (np.ndarray): Keys of the points of shape [N].
+        num_chunks (int): Number of chunks of points processed in parallel.
+        num_parts (int): Number of partitions.
+
+    Returns:
+        tuple[np.ndarray]:
+            part_inds: Indices of the points in range, sorted by partition.
+            part_offsets: Shape [num_parts + 1], offset of each partition
+                in ``part_inds``.
+    """
+    N = keys.shape[0]
+    chunk_counts = np.zeros((num_chunks, num_parts), dtype=np.int64)
+    for t in numba.prange(num_chunks):
+        for i in range(t * N // num_chunks, (t + 1) * N // num_chunks):
+            if keys[i] >= 0:
+                chunk_counts[t, keys[i] % num_parts] += 1
+    # the chunks of a partition are written one after another
+    part_offsets = np.zeros((num_parts + 1, ), dtype=np.int64)
+    offset = 0
+    for p in range(num_parts):
+        part_offsets[p] = offset
+        for t in range(num_chunks):
+            count = chunk_counts[t, p]
+            chunk_counts[t, p] = offset
+            offset += count
+    part_offsets[num_parts] = offset
+    part_inds = np.empty((offset, ), dtype=np.int64)
+    for t in numba.prange(num_chunks):
+        for i in range(t * N // num_chunks, (t + 1) * N // num_chunks):
+            if keys[i] >= 0:
+                p = keys[i] % num_parts
+                part_inds[chunk_counts[t, p]] = i
+                chunk_counts[t, p] += 1
+    return part_inds, part_offsets
+
+
+@numba.njit(parallel=True)
+def _group_keys_kernel(keys, part_inds, part_offsets, first_inds, positions,
+                       counts):
+    """Group the points by voxel with a hash table per partition.
+
+    Args:
+        keys (np.ndarray): Keys of the points of shape [N].
+        part_inds (np.ndarray): Indices of the points in range, sorted by
+            partition.
+        part_offsets (np.ndarray): Offset of each partition in
+            ``part_inds``.
+        first_inds (np.ndarray): Created index of the first point of the
+            voxel of each point in range, of shape [N].
+        positions (np.ndarray): Created position of each point in range
+            within its voxel, of shape [N].
+        counts (np.ndarray): Created number of points of each voxel, set at
+            the first point of the voxel, of shape [N].
+    """
+    num_parts = part_offsets.shape[0] - 1
+    for p in numba.prange(num_parts):
+        start = part_offsets[p]
+        end = part_offsets[p + 1]
+        table_size = 16
+        while table_size < 2 * (end - start):
+            table_size *= 2
+        mask = table_size - 1
+        table_keys = np.full((table_size, ), -1, dtype=np.int64)
+        table_firsts = np.empty((table_size, ), dtype=np.int64)
+        table_counts = np.zeros((table_size, ), dtype=np.int64)
+        for k in range(start, end):
+            i = part_inds[k]
+            key = keys[i]
+            # open addressing with linear probing
+            slot = (key * 2654435761) & mask
+            while table_keys[slot] != -1 and table_keys[slot] != key:
+                slot = (slot + 1) & mask
+            if table_keys[slot] == -1:
+                table_keys[slot] = key
+                table_firsts[slot] = i
+            first_inds[i] = table_firsts[slot]
+            positions[i] = table_counts[slot]
+            table_counts[slot] += 1
+        for slot in range(table_size):
+            if table_keys[slot] != -1:
+                counts[table_firsts[slot]] = table_counts[slot]
+
+
+@numba.njit
+def _number_voxels_kernel(keys, first_inds, voxel_inds):
+    """Number the voxels in the order of their first point.
+
+    Args:
+        keys (np.ndarray): Keys of the points of shape [N].
+        first_inds (np.ndarray): Index of the first point of the voxel of
+            each point in range, of shape [N].
+        voxel_inds (np.ndarray): Created index of the voxel of each first
+            point, of shape [N].
+
+    Returns:
+        int: Number of voxels.
+    """
+    voxel_num = 0
+    for i in range(keys.shape[0]):
+        if keys[i] >= 0 and first_inds[i] == i:
+            voxel_inds[i] = voxel_num
             voxel_num += 1
-            coor_to_voxelidx[coor[0], coor[1], coor[2]] = voxelidx
-            coors[voxelidx] = coor
-        num = num_points_per_voxel[voxelidx]
-        if num < max_points:
-            voxels[voxelidx, num] = points[i]
-            num_points_per_voxel[voxelidx] += 1
     return voxel_num
 
 
-@numba.jit(nopython=True)
-def _points_to_voxel_kernel(points,
-                            voxel_size,
-                            coors_range,
-                            num_points_per_voxel,
-                            coor_to_voxelidx,
-                            voxels,
-                            coors,
-                            max_points=35,
-                            max_voxels=20000):
-    """convert kitti points(N, >=3) to voxels.
+@numba.njit(parallel=True)
+def _fill_voxels_kernel(points, keys, grid_size, first_inds, positions, counts,
+                        voxel_inds, voxels, coors, num_points_per_voxel,
+                        reverse_index):
+    """Copy the points into their voxels in parallel.
+
+    The points of the voxels beyond the number of created voxels and the
+    points beyond ``max_points`` in a voxel are dropped.
 
     Args:
         points (np.ndarray): [N, ndim]. points[:, :3] contain xyz points and
             points[:, 3:] contain other information such as reflectivity.
-        voxel_size (list, tuple, np.ndarray): [3] xyz, indicate voxel size.
-        coors_range (list[float | tuple[float] | ndarray]): Range of voxels.
-            format: xyzxyz, minmax
-        num_points_per_voxel (int): Number of points per voxel.
-        coor_to_voxel_idx (np.ndarray): A voxel grid of shape (D, H, W),
-            which has the same shape as the complete voxel map. It indicates
-            the index of each corresponding voxel.
+        keys (np.ndarray): Keys of the points of shape [N].
+        grid_size (np.ndarray): [3] xyz, number of voxels along each axis.
+        first_inds (np.ndarray): Index of the first point of the voxel of
+            each point in range, of shape [N].
+        positions (np.ndarray): Position of each point in range within its
+            voxel, of shape [N].
+        counts (np.ndarray): Number of points of each voxel, set at the
+            first point of the voxel, of shape [N].
+        voxel_inds (np.ndarray): Index of the voxel of each first point,
+            of shape [N].
         voxels (np.ndarray): Created empty voxels.
         coors (np.ndarray): Created coordinates of each voxel.
-        max_points (int): Indicate maximum points contained in a voxel.
-        max_voxels (int): Maximum number of voxels this function create.
-            for second, 20000 is a good choice. Points should be shuffled for
-            randomness before this function because max_voxels drops points.
-
-    Returns:
-        tuple[np.ndarray]:
-            voxels: Shape [M, max_points, ndim], only contain points.
-            coordinates: Shape [M, 3].
-            num_points_per_voxel: Shape [M].
+        num_points_per_voxel (np.ndarray): Created number of points per
+            voxel.
+        reverse_index (bool): Whether to write the coordinates in zyx
+            order.
     """
     N = points.shape[0]
-    # ndim = points.shape[1] - 1
-    ndim = 3
-    grid_size = (coors_range[3:] - coors_range[:3]) / voxel_size
-    # grid_size = np.round(grid_size).astype(np.int64)(np.int32)
-    grid_size = np.round(grid_size, 0, grid_size).astype(np.int32)
-
-    # lower_bound = coors_range[:3]
-    # upper_bound = coors_range[3:]
-    coor = np.zeros(shape=(3, ), dtype=np.int32)
-    voxel_num = 0
-    failed = False
-    for i in range(N):
-        failed = False
-        for j in range(ndim):
-            c = np.floor((points[i, j] - coors_range[j]) / voxel_size[j])
-            if c < 0 or c >= grid_size[j]:
-                failed = True
-                break
-            coor[j] = c
-        if failed:
+    voxel_num = voxels.shape[0]
+    max_points = voxels.shape[1]
+    for i in numba.prange(N):
+        if keys[i] < 0:
             continue
-        voxelidx = coor_to_voxelidx[coor[0], coor[1], coor[2]]
-        if voxelidx == -1:
-            voxelidx = voxel_num
-            if voxel_num >= max_voxels:
-                continue
-            voxel_num += 1
-            coor_to_voxelidx[coor[0], coor[1], coor[2]] = voxelidx
-            coors[voxelidx] = coor
-        num = num_points_per_voxel[voxelidx]
-        if num < max_points:
-            voxels[voxelidx, num] = points[i]
-            num_points_per_voxel[voxelidx] += 1
-    return voxel_num
+        first = first_inds[i]
+        voxelidx = voxel_inds[first]
+        if voxelidx >= voxel_num:
+            continue
+        if positions[i] < max_points:
+            voxels[voxelidx, positions[i]] = points[i]
+        if first == i:
+            num_points_per_voxel[voxelidx] = min(counts[i], max_points)
+            key = keys[i]
+            for j in range(2, -1, -1):
+                c = key % grid_size[j]
+                key //= grid_size[j]
+                if reverse_index:
+                    coors[voxelidx, 2 - j] = c
+                else:
+                    coors[voxelidx, j] = c
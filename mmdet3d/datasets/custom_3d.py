@@ -9,8 +9,10 @@ from torch.utils.data import Dataset
 
 from ..core.bbox import get_box_type
 from .builder import DATASETS
-from .pipelines import Compose
-from .utils import extract_result_dict, get_loading_pipeline
+from .info_store import load_infos
+from .pipelines import Compose, build_pipeline
+from .utils import (check_streaming_evaluation, extract_result_dict,
+                    get_loading_pipeline)
 
 
 @DATASETS.register_module()
@@ -40,8 +42,9 @@ class Custom3DDataset(Dataset):
     Args:
         data_root (str): Path of dataset root.
         ann_file (str): Path of annotation file.
-        pipeline (list[dict], optional): Pipeline used for data processing.
-            Defaults to None.
+        pipeline (list[dict] | dict, optional): Pipeline used for data
+            processing, or the config dict of its :obj:`Compose`, e.g. to
+            cache its deterministic prefix. Defaults to None.
         classes (tuple[str], optional): Classes used in the dataset.
             Defaults to None.
         modality (dict, optional): Modality to specify the sensor data used
@@ -96,7 +99,7 @@ class Custom3DDataset(Dataset):
 
         # process pipeline
         if pipeline is not None:
-            self.pipeline = Compose(pipeline)
+            self.pipeline = build_pipeline(pipeline)
 
         # set group flag for the samplers
         if not self.test_mode:
@@ -109,10 +112,10 @@ class Custom3DDataset(Dataset):
             ann_file (str): Path of the annotation file.
 
         Returns:
-            list[dict]: List of annotations.
+            list[dict] | :obj:`InfoStore`: List of annotations. Info stores
+                are decoded lazily, see :class:`InfoStore`.
         """
-        # loading data from a file-like object needs file format
-        return mmcv.load(ann_file, file_format='pkl')
+        return load_infos(ann_file)
 
     def get_data_info(self, index):
         """Get data info according to the given index.
@@ -350,6 +353,37 @@ class Custom3DDataset(Dataset):
 
         return ret_dict
 
+    def build_evaluator(self, iou_thr=(0.25, 0.5), logger=None, **kwargs):
+        """Build a streaming evaluator of the indoor protocol.
+
+        The evaluator can be passed to :func:`mmdet3d.apis.single_gpu_test`
+        to evaluate the results while they are produced. The other arguments
+        of :meth:`evaluate` are ignored.
+
+        Args:
+            iou_thr (list[float]): AP IoU thresholds. Defaults to (0.25, 0.5).
+            logger (logging.Logger | str, optional): Logger used for printing
+                related information during evaluation. Defaults to None.
+
+        Returns:
+            :obj:`IndoorEvaluator`: Streaming evaluator.
+
+        Raises:
+            NotImplementedError: If the dataset overrides :meth:`evaluate`
+                with another protocol.
+        """
+        from mmdet3d.core.evaluation import IndoorEvaluator
+        check_streaming_evaluation(self)
+        gt_annos = [info['annos'] for info in self.data_infos]
+        label2cat = {i: cat_id for i, cat_id in enumerate(self.CLASSES)}
+        return IndoorEvaluator(
+            gt_annos,
+            iou_thr,
+            label2cat,
+            self.box_type_3d,
+            self.box_mode_3d,
+            logger=logger)
+
     def _build_default_pipeline(self):
         """Build the default pipeline for this dataset."""
         raise NotImplementedError('_build_default_pipeline is not implemented '
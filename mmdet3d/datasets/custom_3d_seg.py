@@ -9,8 +9,10 @@ from torch.utils.data import Dataset
 
 from mmseg.datasets import DATASETS as SEG_DATASETS
 from .builder import DATASETS
-from .pipelines import Compose
-from .utils import extract_result_dict, get_loading_pipeline
+from .info_store import load_infos
+from .pipelines import Compose, build_pipeline
+from .utils import (check_streaming_evaluation, extract_result_dict,
+                    get_loading_pipeline)
 
 
 @DATASETS.register_module()
@@ -23,8 +25,9 @@ class Custom3DSegDataset(Dataset):
     Args:
         data_root (str): Path of dataset root.
         ann_file (str): Path of annotation file.
-        pipeline (list[dict], optional): Pipeline used for data processing.
-            Defaults to None.
+        pipeline (list[dict] | dict, optional): Pipeline used for data
+            processing, or the config dict of its :obj:`Compose`, e.g. to
+            cache its deterministic prefix. Defaults to None.
         classes (tuple[str], optional): Classes used in the dataset.
             Defaults to None.
         palette (list[list[int]], optional): The palette of segmentation map.
@@ -84,7 +87,7 @@ class Custom3DSegDataset(Dataset):
             self.data_infos = self.load_annotations(self.ann_file)
 
         if pipeline is not None:
-            self.pipeline = Compose(pipeline)
+            self.pipeline = build_pipeline(pipeline)
 
         self.ignore_index = len(self.CLASSES) if \
             ignore_index is None else ignore_index
@@ -104,10 +107,10 @@ class Custom3DSegDataset(Dataset):
             ann_file (str): Path of the annotation file.
 
         Returns:
-            list[dict]: List of annotations.
+            list[dict] | :obj:`InfoStore`: List of annotations. Info stores
+                are decoded lazily, see :class:`InfoStore`.
         """
-        # loading data from a file-like object needs file format
-        return mmcv.load(ann_file, file_format='pkl')
+        return load_infos(ann_file)
 
     def get_data_info(self, index):
         """Get data info according to the given index.
@@ -333,7 +336,6 @@ class Custom3DSegDataset(Dataset):
         Returns:
             dict: Evaluation results.
         """
-        from mmdet3d.core.evaluation import seg_eval
         assert isinstance(
             results, list), f'Expect results to be list, got {type(results)}.'
         assert len(results) > 0, 'Expect length of results > 0.'
@@ -342,21 +344,14 @@ class Custom3DSegDataset(Dataset):
             results[0], dict
         ), f'Expect elements in results to be dict, got {type(results[0])}.'
 
-        load_pipeline = self._get_pipeline(pipeline)
-        pred_sem_masks = [result['semantic_mask'] for result in results]
-        gt_sem_masks = [
-            self._extract_data(
-                i, load_pipeline, 'pts_semantic_mask', load_annos=True)
-            for i in range(len(self.data_infos))
-        ]
-        ret_dict = seg_eval(
-            gt_sem_masks,
-            pred_sem_masks,
-            self.label2cat,
-            self.ignore_index,
-            logger=logger)
+        # the ground truth of each scene is loaded and released in turn
+        evaluator = self._build_evaluator(logger=logger, pipeline=pipeline)
+        for sample_idx, result in enumerate(results):
+            evaluator.update(sample_idx, result)
+        ret_dict = evaluator.compute()
 
         if show:
+            pred_sem_masks = [result['semantic_mask'] for result in results]
             self.show(pred_sem_masks, out_dir, pipeline=pipeline)
 
         return ret_dict
@@ -370,6 +365,38 @@ class Custom3DSegDataset(Dataset):
         pool = np.where(self.flag == self.flag[idx])[0]
         return np.random.choice(pool)
 
+    def build_evaluator(self, logger=None, pipeline=None, **kwargs):
+        """Build a streaming evaluator of the semantic segmentation protocol.
+
+        The evaluator can be passed to :func:`mmdet3d.apis.single_gpu_test`
+        to evaluate the results while they are produced. The ground truth
+        mask of each scene is loaded when its prediction arrives. The other
+        arguments of :meth:`evaluate` are ignored.
+
+        Args:
+            logger (logging.Logger | str, optional): Logger used for printing
+                related information during evaluation. Defaults to None.
+            pipeline (list[dict], optional): raw data loading for evaluation.
+                Default: None.
+
+        Returns:
+            :obj:`SegEvaluator`: Streaming evaluator.
+        """
+        check_streaming_evaluation(self)
+        return self._build_evaluator(logger=logger, pipeline=pipeline)
+
+    def _build_evaluator(self, logger=None, pipeline=None):
+        """Build the evaluator of the semantic segmentation protocol used by
+        :meth:`evaluate` and :meth:`build_evaluator`."""
+        from mmdet3d.core.evaluation import SegEvaluator
+        load_pipeline = self._get_pipeline(pipeline)
+        return SegEvaluator(
+            self.label2cat,
+            self.ignore_index,
+            lambda i: self._extract_data(
+                i, load_pipeline, 'pts_semantic_mask', load_annos=True),
+            logger=logger)
+
     def _build_default_pipeline(self):
         """Build the default pipeline for this dataset."""
         raise NotImplementedError('_build_default_pipeline is not implemented '
@@ -0,0 +1,437 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import json
+import os.path as osp
+import pickle
+import struct
+
+import mmcv
+import numpy as np
+
+MAGIC = b'MM3DINFO'
+VERSION = 1
+# all columns start at a multiple of the alignment in the file
+ALIGNMENT = 64
+_MISSING = object()
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+
+class _ColumnWriter(object):
+    """Collect the columns of an info store before writing them."""
+
+    def __init__(self):
+        self.columns = dict()
+
+    def add(self, array):
+        name = str(len(self.columns))
+        self.columns[name] = np.ascontiguousarray(array)
+        return name
+
+
+def _offsets(lengths):
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _is_array_column(values):
+    first = values[0]
+    if not (isinstance(first, np.ndarray) and first.ndim > 0
+            and first.dtype.kind in 'biufcUS'):
+        return False
+    for value in values:
+        if not isinstance(value, np.ndarray) or value.ndim != first.ndim \
+                or value.shape[1:] != first.shape[1:]:
+            return False
+        if value.dtype.kind in 'US':
+            # strings of different lengths are padded to the longest one
+            if value.dtype.kind != first.dtype.kind or \
+                    value.dtype.byteorder != first.dtype.byteorder:
+                return False
+        elif value.dtype != first.dtype:
+            return False
+    return True
+
+
+def _is_scalar_column(values):
+    value_type = type(values[0])
+    if not (value_type in (bool, int, float)
+            or issubclass(value_type, (np.bool_, np.number))):
+        return False
+    if not all(type(value) is value_type for value in values):
+        return False
+    # python integers have to fit in int64
+    return value_type is not int or all(INT64_MIN <= value <= INT64_MAX
+                                        for value in values)
+
+
+def _list_item_type(values):
+    item_type = None
+    for value in values:
+        if type(value) is not list:
+            return None
+        for item in value:
+            if item_type is None and type(item) in (bool, int, float):
+                item_type = type(item)
+            if type(item) is not item_type:
+                return None
+            if item_type is int and not INT64_MIN <= item <= INT64_MAX:
+                return None
+    return item_type or float
+
+
+def _encode(values, writer):
+    """Encode a list of values of the same field into columns.
+
+    Args:
+        values (list): Values of the field in all records.
+        writer (:obj:`_ColumnWriter`): Writer collecting the columns.
+
+    Returns:
+        dict: Schema of the field.
+    """
+    if len(values) == 0:
+        return dict(
+            kind='pickle',
+            data=writer.add(np.zeros(0, np.uint8)),
+            offsets=writer.add(np.zeros(1, np.int64)))
+
+    if all(type(value) is dict for value in values) and all(
+            isinstance(key, str) for value in values for key in value):
+        keys = list(dict.fromkeys(key for value in values for key in value))
+        fields = dict()
+        for key in keys:
+            field_values = [value.get(key, _MISSING) for value in values]
+            present = np.array(
+                [value is not _MISSING for value in field_values])
+            field = _encode(
+                [value for value in field_values if value is not _MISSING],
+                writer)
+            if not present.all():
+                field['present'] = writer.add(present)
+                field['rank'] = writer.add(np.cumsum(present) - 1)
+            fields[key] = field
+        return dict(kind='dict', fields=fields)
+
+    if _is_array_column(values):
+        dtype = values[0].dtype
+        node = dict(kind='array', shape=list(values[0].shape[1:]))
+        if dtype.kind in 'US':
+            itemsizes = np.array([value.dtype.itemsize for value in values])
+            dtype = max((value.dtype for value in values),
+                        key=lambda dtype: dtype.itemsize)
+            if not (itemsizes == dtype.itemsize).all():
+                node['itemsize'] = writer.add(itemsizes)
+        node['data'] = writer.add(
+            np.concatenate([value.astype(dtype) for value in values]))
+        node['offsets'] = writer.add(
+            _offsets([value.shape[0] for value in values]))
+        return node
+
+    if _is_scalar_column(values):
+        value_type = type(values[0])
+        return dict(
+            kind='scalar',
+            python=value_type in (bool, int, float),
+            data=writer.add(np.array(values, dtype=value_type)))
+
+    if all(type(value) is str for value in values):
+        data = [value.encode('utf-8') for value in values]
+        return dict(
+            kind='str',
+            data=writer.add(np.frombuffer(b''.join(data), dtype=np.uint8)),
+            offsets=writer.add(_offsets([len(value) for value in data])))
+
+    item_type = _list_item_type(values)
+    if item_type is not None:
+        return dict(
+            kind='list',
+            data=writer.add(
+                np.array([item for value in values for item in value],
+                         dtype=item_type)),
+            offsets=writer.add(_offsets([len(value) for value in values])))
+
+    if all(type(value) is list for value in values) and all(
+            type(item) is dict for value in values for item in value):
+        items = [item for value in values for item in value]
+        if len(items) > 0:
+            return dict(
+                kind='records',
+                items=_encode(items, writer),
+                offsets=writer.add(_offsets([len(value) for value in values])))
+
+    # fall back to pickling the values one by one
+    data = [pickle.dumps(value, protocol=4) for value in values]
+    return dict(
+        kind='pickle',
+        data=writer.add(np.frombuffer(b''.join(data), dtype=np.uint8)),
+        offsets=writer.add(_offsets([len(value) for value in data])))
+
+
+def dump_info_store(data, file):
+    """Write infos to a memory-mapped info store.
+
+    Each field of the infos is stored as a flat column, e.g. the boxes of
+    all the samples are concatenated in one array and indexed by offsets,
+    so that :class:`InfoStore` decodes a record without unpickling the
+    whole file. Fields whose values are not arrays, numbers, strings or
+    lists of them are pickled one by one.
+
+    Args:
+        data (list[dict] | dict): Infos in the format of the ``.pkl`` files,
+            i.e. a list of infos or a dict with the infos under ``infos``
+            and other items such as ``metadata``.
+        file (str): Path of the output file.
+    """
+    if isinstance(data, dict):
+        infos = data['infos']
+        extra = {key: value for key, value in data.items() if key != 'infos'}
+    else:
+        infos = data
+        extra = None
+
+    writer = _ColumnWriter()
+    schema = _encode(list(infos), writer)
+    extra_name = writer.add(
+        np.frombuffer(pickle.dumps(extra, protocol=4), dtype=np.uint8))
+
+    columns = dict()
+    offset = 0
+    for name, array in writer.columns.items():
+        columns[name] = [offset, array.dtype.str, list(array.shape)]
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps(
+        dict(
+            version=VERSION,
+            length=len(infos),
+            schema=schema,
+            columns=columns,
+            extra=extra_name)).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    mmcv.mkdir_or_exist(osp.dirname(osp.abspath(file)))
+    with open(file, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in writer.columns.items():
+            f.seek(data_start + columns[name][0])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+
+
+def is_info_store(file):
+    """Check whether a file is an info store.
+
+    Args:
+        file (str | file-like object): Path or opened file.
+
+    Returns:
+        bool: Whether the file starts with the magic of info stores.
+    """
+    if isinstance(file, str):
+        with open(file, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    if not (hasattr(file, 'seek') and hasattr(file, 'tell')):
+        return False
+    position = file.tell()
+    magic = file.read(len(MAGIC))
+    file.seek(position)
+    return magic == MAGIC
+
+
+def _build_decoder(node, columns):
+    """Build the function decoding the ``i``-th value of a field."""
+    kind = node['kind']
+    if kind == 'dict':
+        fields = []
+        for key, field in node['fields'].items():
+            decode = _build_decoder(field, columns)
+            if 'present' in field:
+                fields.append((key, decode, columns[field['present']],
+                               columns[field['rank']]))
+            else:
+                fields.append((key, decode, None, None))
+
+        def decode(i):
+            value = dict()
+            for key, decode_field, present, rank in fields:
+                if present is None:
+                    value[key] = decode_field(i)
+                elif present[i]:
+                    value[key] = decode_field(rank[i])
+            return value
+
+        return decode
+
+    if kind == 'records':
+        offsets = columns[node['offsets']]
+        decode_item = _build_decoder(node['items'], columns)
+        return lambda i: [
+            decode_item(j) for j in range(offsets[i], offsets[i + 1])
+        ]
+
+    data = columns[node['data']]
+    if kind == 'scalar':
+        if node['python']:
+            return lambda i: data[i].item()
+        return lambda i: data[i]
+
+    offsets = columns[node['offsets']]
+    if kind == 'array':
+        if 'itemsize' in node:
+            # restore the original length of the strings
+            itemsizes = columns[node['itemsize']]
+            char_size = 4 if data.dtype.kind == 'U' else 1
+            prefix = data.dtype.str[:2]
+            return lambda i: data[offsets[i]:offsets[i + 1]].astype(
+                f'{prefix}{itemsizes[i] // char_size}')
+        return lambda i: data[offsets[i]:offsets[i + 1]].copy()
+    if kind == 'str':
+        return lambda i: data[offsets[i]:offsets[i + 1]].tobytes().decode(
+            'utf-8')
+    if kind == 'list':
+        return lambda i: data[offsets[i]:offsets[i + 1]].tolist()
+    assert kind == 'pickle', f'unknown kind {kind}'
+    return lambda i: pickle.loads(data[offsets[i]:offsets[i + 1]].tobytes())
+
+
+class InfoStore(object):
+    """Infos stored in a memory-mapped file.
+
+    The store behaves like the list of infos loaded from a ``.pkl`` file, but
+    each info is decoded from the memory-mapped columns only when it is
+    indexed. The columns are shared by all the dataloader workers as clean
+    pages of the page cache instead of being copied into every worker by
+    reference counting. The returned infos are copies, so they can be
+    modified freely. Use :func:`dump_info_store` or
+    ``tools/misc/convert_infos.py`` to convert the ``.pkl`` infos.
+
+    Args:
+        file (str): Path of the info store, which has to be on local disk.
+        indices (np.ndarray, optional): Indices of the records in the file
+            viewed by the store. Defaults to None, i.e. all records.
+    """
+
+    def __init__(self, file, indices=None):
+        self.file = file
+        self._open()
+        if indices is None:
+            indices = np.arange(self._length)
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    def _open(self):
+        with open(self.file, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            assert magic == MAGIC, f'{self.file} is not an info store'
+            header_len, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_len).decode('utf-8'))
+        assert header['version'] == VERSION, \
+            f'unsupported info store version {header["version"]}'
+        data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGNMENT) * \
+            ALIGNMENT
+        buffer = np.memmap(self.file, dtype=np.uint8, mode='r')
+        columns = dict()
+        for name, (offset, dtype, shape) in header['columns'].items():
+            dtype = np.dtype(dtype)
+            start = data_start + offset
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            columns[name] = np.frombuffer(
+                buffer,
+                dtype=dtype,
+                count=nbytes // dtype.itemsize,
+                offset=start).reshape(shape)
+        self._length = header['length']
+        self._schema = header['schema']
+        self._columns = columns
+        self._extra = pickle.loads(columns[header['extra']].tobytes())
+        self._decode = _build_decoder(self._schema, columns)
+
+    def __getstate__(self):
+        # the memory map is opened again instead of being pickled, e.g. when
+        # dataloader workers are spawned
+        return dict(file=self.file, indices=self.indices)
+
+    def __setstate__(self, state):
+        self.file = state['file']
+        self.indices = state['indices']
+        self._open()
+
+    @property
+    def extra(self):
+        """dict | None: Items stored besides the infos, e.g. ``metadata``."""
+        return self._extra
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self.subset(self.indices[idx], absolute=True)
+        return self._decode(self.indices[idx])
+
+    def __iter__(self):
+        for idx in self.indices:
+            yield self._decode(idx)
+
+    def subset(self, indices, absolute=False):
+        """Get a store viewing a subset of the records without decoding them.
+
+        Args:
+            indices (list[int] | np.ndarray): Indices of the records.
+            absolute (bool, optional): Whether the indices are the ones in
+                the file instead of the ones in this store.
+                Defaults to False.
+
+        Returns:
+            :obj:`InfoStore`: Store sharing the memory map with this one.
+        """
+        store = InfoStore.__new__(InfoStore)
+        store.file = self.file
+        store._length = self._length
+        store._schema = self._schema
+        store._columns = self._columns
+        store._extra = self._extra
+        store._decode = self._decode
+        indices = np.asarray(indices, dtype=np.int64)
+        store.indices = indices if absolute else self.indices[indices]
+        return store
+
+    def get_field(self, key):
+        """Get a top-level field of all the records, e.g. ``timestamp``.
+
+        Scalar fields are read from their column directly.
+
+        Args:
+            key (str): Key of the field.
+
+        Returns:
+            np.ndarray | list: Values of the field.
+        """
+        node = self._schema['fields'][key]
+        if node['kind'] == 'scalar' and 'present' not in node:
+            return np.asarray(self._columns[node['data']][self.indices])
+        decode = _build_decoder(node, self._columns)
+        return [decode(idx) for idx in self.indices]
+
+
+def load_infos(file):
+    """Load infos from a ``.pkl`` file or an info store.
+
+    The format is detected from the content of the file.
+
+    Args:
+        file (str | file-like object): Path or opened file. Info stores have
+            to be local files.
+
+    Returns:
+        list[dict] | dict | :obj:`InfoStore`: The loaded infos. An info store
+            written from a dict is returned as a dict with the store under
+            ``infos``, like the ``.pkl`` file it is converted from.
+    """
+    if not is_info_store(file):
+        # loading data from a file-like object needs file format
+        return mmcv.load(file, file_format='pkl')
+    store = InfoStore(file if isinstance(file, str) else file.name)
+    if store.extra is None:
+        return store
+    return dict(infos=store, **store.extra)
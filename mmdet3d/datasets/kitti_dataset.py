@@ -2,6 +2,7 @@
 import copy
 import os
 import tempfile
+from functools import partial
 from os import path as osp
 
 import mmcv
@@ -15,6 +16,7 @@ from ..core.bbox import (Box3DMode, CameraInstance3DBoxes, Coord3DMode,
 from .builder import DATASETS
 from .custom_3d import Custom3DDataset
 from .pipelines import Compose
+from .utils import check_streaming_evaluation
 
 
 @DATASETS.register_module()
@@ -391,6 +393,46 @@ class KittiDataset(Custom3DDataset):
             self.show(results, out_dir, show=show, pipeline=pipeline)
         return ap_dict
 
+    def build_evaluator(self,
+                        metric=None,
+                        logger=None,
+                        num_workers=0,
+                        **kwargs):
+        """Build a streaming evaluator of the KITTI protocol.
+
+        The evaluator can be passed to :func:`mmdet3d.apis.single_gpu_test`
+        to convert each result to KITTI format as soon as it is produced.
+        The other arguments of :meth:`evaluate` are ignored.
+
+        Args:
+            metric (str | list[str], optional): Metrics to be evaluated.
+                Default: None.
+            logger (logging.Logger | str, optional): Logger used for printing
+                related information during evaluation. Default: None.
+            num_workers (int, optional): Number of threads used by
+                :func:`kitti_eval`. Default: 0.
+
+        Returns:
+            :obj:`KittiEvaluator`: Streaming evaluator.
+        """
+        from mmdet3d.core.evaluation import KittiEvaluator
+        check_streaming_evaluation(self)
+        gt_annos = [info['annos'] for info in self.data_infos]
+        # the types of the results that are not in a dict of named results
+        if metric == 'img_bbox':
+            eval_types = ['bbox']
+        else:
+            eval_types = ['bbox', 'bev', '3d']
+        return KittiEvaluator(
+            gt_annos,
+            partial(self._result2kitti_anno, class_names=self.CLASSES),
+            self.CLASSES,
+            eval_types=eval_types,
+            result2anno_2d=partial(
+                self._result2kitti2d_anno, class_names=self.CLASSES),
+            num_workers=num_workers,
+            logger=logger)
+
     def bbox2result_kitti(self,
                           net_outputs,
                           class_names,
@@ -418,62 +460,9 @@ class KittiDataset(Custom3DDataset):
         print('\nConverting prediction to KITTI format')
         for idx, pred_dicts in enumerate(
                 mmcv.track_iter_progress(net_outputs)):
-            annos = []
-            info = self.data_infos[idx]
-            sample_idx = info['image']['image_idx']
-            image_shape = info['image']['image_shape'][:2]
-            box_dict = self.convert_valid_bboxes(pred_dicts, info)
-            anno = {
-                'name': [],
-                'truncated': [],
-                'occluded': [],
-                'alpha': [],
-                'bbox': [],
-                'dimensions': [],
-                'location': [],
-                'rotation_y': [],
-                'score': []
-            }
-            if len(box_dict['bbox']) > 0:
-                box_2d_preds = box_dict['bbox']
-                box_preds = box_dict['box3d_camera']
-                scores = box_dict['scores']
-                box_preds_lidar = box_dict['box3d_lidar']
-                label_preds = box_dict['label_preds']
-
-                for box, box_lidar, bbox, score, label in zip(
-                        box_preds, box_preds_lidar, box_2d_preds, scores,
-                        label_preds):
-                    bbox[2:] = np.minimum(bbox[2:], image_shape[::-1])
-                    bbox[:2] = np.maximum(bbox[:2], [0, 0])
-                    anno['name'].append(class_names[int(label)])
-                    anno['truncated'].append(0.0)
-                    anno['occluded'].append(0)
-                    anno['alpha'].append(
-                        -np.arctan2(-box_lidar[1], box_lidar[0]) + box[6])
-                    anno['bbox'].append(bbox)
-                    anno['dimensions'].append(box[3:6])
-                    anno['location'].append(box[:3])
-                    anno['rotation_y'].append(box[6])
-                    anno['score'].append(score)
-
-                anno = {k: np.stack(v) for k, v in anno.items()}
-                annos.append(anno)
-            else:
-                anno = {
-                    'name': np.array([]),
-                    'truncated': np.array([]),
-                    'occluded': np.array([]),
-                    'alpha': np.array([]),
-                    'bbox': np.zeros([0, 4]),
-                    'dimensions': np.zeros([0, 3]),
-                    'location': np.zeros([0, 3]),
-                    'rotation_y': np.array([]),
-                    'score': np.array([]),
-                }
-                annos.append(anno)
-
+            anno = self._result2kitti_anno(idx, pred_dicts, class_names)
             if submission_prefix is not None:
+                sample_idx = self.data_infos[idx]['image']['image_idx']
                 curr_file = f'{submission_prefix}/{sample_idx:06d}.txt'
                 with open(curr_file, 'w') as f:
                     bbox = anno['bbox']
@@ -493,10 +482,7 @@ class KittiDataset(Custom3DDataset):
                                 anno['score'][idx]),
                             file=f)
 
-            annos[-1]['sample_idx'] = np.array(
-                [sample_idx] * len(annos[-1]['score']), dtype=np.int64)
-
-            det_annos += annos
+            det_annos.append(anno)
 
         if pklfile_prefix is not None:
             if not pklfile_prefix.endswith(('.pkl', '.pickle')):
@@ -506,6 +492,73 @@ class KittiDataset(Custom3DDataset):
 
         return det_annos
 
+    def _result2kitti_anno(self, idx, pred_dicts, class_names):
+        """Convert the 3D detection result of one sample to kitti format.
+
+        Args:
+            idx (int): Index of the sample in the dataset.
+            pred_dicts (dict): 3D detection result of the sample.
+            class_names (list[String]): A list of class names.
+
+        Returns:
+            dict: Annotation of the sample in kitti format.
+        """
+        info = self.data_infos[idx]
+        sample_idx = info['image']['image_idx']
+        image_shape = info['image']['image_shape'][:2]
+        box_dict = self.convert_valid_bboxes(pred_dicts, info)
+        anno = {
+            'name': [],
+            'truncated': [],
+            'occluded': [],
+            'alpha': [],
+            'bbox': [],
+            'dimensions': [],
+            'location': [],
+            'rotation_y': [],
+            'score': []
+        }
+        if len(box_dict['bbox']) > 0:
+            box_2d_preds = box_dict['bbox']
+            box_preds = box_dict['box3d_camera']
+            scores = box_dict['scores']
+            box_preds_lidar = box_dict['box3d_lidar']
+            label_preds = box_dict['label_preds']
+
+            for box, box_lidar, bbox, score, label in zip(
+                    box_preds, box_preds_lidar, box_2d_preds, scores,
+                    label_preds):
+                bbox[2:] = np.minimum(bbox[2:], image_shape[::-1])
+                bbox[:2] = np.maximum(bbox[:2], [0, 0])
+                anno['name'].append(class_names[int(label)])
+                anno['truncated'].append(0.0)
+                anno['occluded'].append(0)
+                anno['alpha'].append(-np.arctan2(-box_lidar[1], box_lidar[0]) +
+                                     box[6])
+                anno['bbox'].append(bbox)
+                anno['dimensions'].append(box[3:6])
+                anno['location'].append(box[:3])
+                anno['rotation_y'].append(box[6])
+                anno['score'].append(score)
+
+            anno = {k: np.stack(v) for k, v in anno.items()}
+        else:
+            anno = {
+                'name': np.array([]),
+                'truncated': np.array([]),
+                'occluded': np.array([]),
+                'alpha': np.array([]),
+                'bbox': np.zeros([0, 4]),
+                'dimensions': np.zeros([0, 3]),
+                'location': np.zeros([0, 3]),
+                'rotation_y': np.array([]),
+                'score': np.array([]),
+            }
+
+        anno['sample_idx'] = np.array(
+            [sample_idx] * len(anno['score']), dtype=np.int64)
+        return anno
+
     def bbox2result_kitti2d(self,
                             net_outputs,
                             class_names,
@@ -528,60 +581,10 @@ class KittiDataset(Custom3DDataset):
             'invalid list length of network outputs'
         det_annos = []
         print('\nConverting prediction to KITTI format')
-        for i, bboxes_per_sample in enumerate(
+        for idx, bboxes_per_sample in enumerate(
                 mmcv.track_iter_progress(net_outputs)):
-            annos = []
-            anno = dict(
-                name=[],
-                truncated=[],
-                occluded=[],
-                alpha=[],
-                bbox=[],
-                dimensions=[],
-                location=[],
-                rotation_y=[],
-                score=[])
-            sample_idx = self.data_infos[i]['image']['image_idx']
-
-            num_example = 0
-            for label in range(len(bboxes_per_sample)):
-                bbox = bboxes_per_sample[label]
-                for i in range(bbox.shape[0]):
-                    anno['name'].append(class_names[int(label)])
-                    anno['truncated'].append(0.0)
-                    anno['occluded'].append(0)
-                    anno['alpha'].append(0.0)
-                    anno['bbox'].append(bbox[i, :4])
-                    # set dimensions (height, width, length) to zero
-                    anno['dimensions'].append(
-                        np.zeros(shape=[3], dtype=np.float32))
-                    # set the 3D translation to (-1000, -1000, -1000)
-                    anno['location'].append(
-                        np.ones(shape=[3], dtype=np.float32) * (-1000.0))
-                    anno['rotation_y'].append(0.0)
-                    anno['score'].append(bbox[i, 4])
-                    num_example += 1
-
-            if num_example == 0:
-                annos.append(
-                    dict(
-                        name=np.array([]),
-                        truncated=np.array([]),
-                        occluded=np.array([]),
-                        alpha=np.array([]),
-                        bbox=np.zeros([0, 4]),
-                        dimensions=np.zeros([0, 3]),
-                        location=np.zeros([0, 3]),
-                        rotation_y=np.array([]),
-                        score=np.array([]),
-                    ))
-            else:
-                anno = {k: np.stack(v) for k, v in anno.items()}
-                annos.append(anno)
-
-            annos[-1]['sample_idx'] = np.array(
-                [sample_idx] * num_example, dtype=np.int64)
-            det_annos += annos
+            det_annos.append(
+                self._result2kitti2d_anno(idx, bboxes_per_sample, class_names))
 
         if pklfile_prefix is not None:
             # save file in pkl format
@@ -618,6 +621,68 @@ class KittiDataset(Custom3DDataset):
 
         return det_annos
 
+    def _result2kitti2d_anno(self, idx, bboxes_per_sample, class_names):
+        """Convert the 2D detection result of one sample to kitti format.
+
+        Args:
+            idx (int): Index of the sample in the dataset.
+            bboxes_per_sample (list[np.ndarray]): Boxes and scores of each
+                class in shape (N, 5) for the sample.
+            class_names (list[String]): A list of class names.
+
+        Returns:
+            dict: Annotation of the sample in kitti format.
+        """
+        anno = dict(
+            name=[],
+            truncated=[],
+            occluded=[],
+            alpha=[],
+            bbox=[],
+            dimensions=[],
+            location=[],
+            rotation_y=[],
+            score=[])
+        sample_idx = self.data_infos[idx]['image']['image_idx']
+
+        num_example = 0
+        for label in range(len(bboxes_per_sample)):
+            bbox = bboxes_per_sample[label]
+            for i in range(bbox.shape[0]):
+                anno['name'].append(class_names[int(label)])
+                anno['truncated'].append(0.0)
+                anno['occluded'].append(0)
+                anno['alpha'].append(0.0)
+                anno['bbox'].append(bbox[i, :4])
+                # set dimensions (height, width, length) to zero
+                anno['dimensions'].append(
+                    np.zeros(shape=[3], dtype=np.float32))
+                # set the 3D translation to (-1000, -1000, -1000)
+                anno['location'].append(
+                    np.ones(shape=[3], dtype=np.float32) * (-1000.0))
+                anno['rotation_y'].append(0.0)
+                anno['score'].append(bbox[i, 4])
+                num_example += 1
+
+        if num_example == 0:
+            anno = dict(
+                name=np.array([]),
+                truncated=np.array([]),
+                occluded=np.array([]),
+                alpha=np.array([]),
+                bbox=np.zeros([0, 4]),
+                dimensions=np.zeros([0, 3]),
+                location=np.zeros([0, 3]),
+                rotation_y=np.array([]),
+                score=np.array([]),
+            )
+        else:
+            anno = {k: np.stack(v) for k, v in anno.items()}
+
+        anno['sample_idx'] = np.array(
+            [sample_idx] * num_example, dtype=np.int64)
+        return anno
+
     def convert_valid_bboxes(self, box_dict, info):
         """Convert the predicted boxes into valid ones.
 
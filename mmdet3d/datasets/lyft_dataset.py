@@ -15,6 +15,7 @@ from ..core import show_result
 from ..core.bbox import Box3DMode, Coord3DMode, LiDARInstance3DBoxes
 from .builder import DATASETS
 from .custom_3d import Custom3DDataset
+from .info_store import InfoStore, load_infos
 from .pipelines import Compose
 
 
@@ -116,12 +117,19 @@ class LyftDataset(Custom3DDataset):
             ann_file (str): Path of the annotation file.
 
         Returns:
-            list[dict]: List of annotations sorted by timestamps.
+            list[dict] | :obj:`InfoStore`: List of annotations sorted by
+                timestamps.
         """
-        # loading data from a file-like object needs file format
-        data = mmcv.load(ann_file, file_format='pkl')
-        data_infos = list(sorted(data['infos'], key=lambda e: e['timestamp']))
-        data_infos = data_infos[::self.load_interval]
+        data = load_infos(ann_file)
+        if isinstance(data['infos'], InfoStore):
+            # sort the records without decoding them
+            order = np.argsort(
+                data['infos'].get_field('timestamp'), kind='stable')
+            data_infos = data['infos'].subset(order[::self.load_interval])
+        else:
+            data_infos = list(
+                sorted(data['infos'], key=lambda e: e['timestamp']))
+            data_infos = data_infos[::self.load_interval]
         self.metadata = data['metadata']
         self.version = self.metadata['version']
         return data_infos
@@ -1,4 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import json
 import tempfile
 from os import path as osp
 
@@ -11,6 +12,7 @@ from ..core import show_result
 from ..core.bbox import Box3DMode, Coord3DMode, LiDARInstance3DBoxes
 from .builder import DATASETS
 from .custom_3d import Custom3DDataset
+from .info_store import InfoStore, load_infos
 from .pipelines import Compose
 
 
@@ -182,11 +184,19 @@ class NuScenesDataset(Custom3DDataset):
             ann_file (str): Path of the annotation file.
 
         Returns:
-            list[dict]: List of annotations sorted by timestamps.
+            list[dict] | :obj:`InfoStore`: List of annotations sorted by
+                timestamps.
         """
-        data = mmcv.load(ann_file, file_format='pkl')
-        data_infos = list(sorted(data['infos'], key=lambda e: e['timestamp']))
-        data_infos = data_infos[::self.load_interval]
+        data = load_infos(ann_file)
+        if isinstance(data['infos'], InfoStore):
+            # sort the records without decoding them
+            order = np.argsort(
+                data['infos'].get_field('timestamp'), kind='stable')
+            data_infos = data['infos'].subset(order[::self.load_interval])
+        else:
+            data_infos = list(
+                sorted(data['infos'], key=lambda e: e['timestamp']))
+            data_infos = data_infos[::self.load_interval]
         self.metadata = data['metadata']
         self.version = self.metadata['version']
         return data_infos
@@ -310,61 +320,47 @@ class NuScenesDataset(Custom3DDataset):
         Returns:
             str: Path of the output json file.
         """
-        nusc_annos = {}
         mapped_class_names = self.CLASSES
-
-        print('Start to convert detection format...')
-        for sample_id, det in enumerate(mmcv.track_iter_progress(results)):
-            annos = []
-            boxes = output_to_nusc_box(det)
-            sample_token = self.data_infos[sample_id]['token']
-            boxes = lidar_nusc_box_to_global(self.data_infos[sample_id], boxes,
-                                             mapped_class_names,
-                                             self.eval_detection_configs,
-                                             self.eval_version)
-            for i, box in enumerate(boxes):
-                name = mapped_class_names[box.label]
-                if np.sqrt(box.velocity[0]**2 + box.velocity[1]**2) > 0.2:
-                    if name in [
-                            'car',
-                            'construction_vehicle',
-                            'bus',
-                            'truck',
-                            'trailer',
-                    ]:
-                        attr = 'vehicle.moving'
-                    elif name in ['bicycle', 'motorcycle']:
-                        attr = 'cycle.with_rider'
-                    else:
-                        attr = NuScenesDataset.DefaultAttribute[name]
-                else:
-                    if name in ['pedestrian']:
-                        attr = 'pedestrian.standing'
-                    elif name in ['bus']:
-                        attr = 'vehicle.stopped'
-                    else:
-                        attr = NuScenesDataset.DefaultAttribute[name]
-
-                nusc_anno = dict(
-                    sample_token=sample_token,
-                    translation=box.center.tolist(),
-                    size=box.wlh.tolist(),
-                    rotation=box.orientation.elements.tolist(),
-                    velocity=box.velocity[:2].tolist(),
-                    detection_name=name,
-                    detection_score=box.score,
-                    attribute_name=attr)
-                annos.append(nusc_anno)
-            nusc_annos[sample_token] = annos
-        nusc_submissions = {
-            'meta': self.modality,
-            'results': nusc_annos,
-        }
-
         mmcv.mkdir_or_exist(jsonfile_prefix)
         res_path = osp.join(jsonfile_prefix, 'results_nusc.json')
+
+        print('Start to convert detection format...')
+        # the submission is written sample by sample so that the annotations
+        # of the whole split are never held in memory at once
+        with open(res_path, 'w') as f:
+            f.write('{"meta": ' + json.dumps(self.modality) + ', "results": {')
+            for sample_id, det in enumerate(mmcv.track_iter_progress(results)):
+                sample_token = self.data_infos[sample_id]['token']
+                boxes = output_to_nusc_arrays(det)
+                boxes = lidar_nusc_arrays_to_global(
+                    self.data_infos[sample_id], boxes, mapped_class_names,
+                    self.eval_detection_configs, self.eval_version)
+                attrs = get_nusc_attributes(boxes['label'], boxes['velocity'],
+                                            mapped_class_names)
+                box_fields = zip(boxes['center'].tolist(),
+                                 boxes['wlh'].tolist(),
+                                 boxes['orientation'].tolist(),
+                                 boxes['velocity'][:, :2].tolist(),
+                                 boxes['label'].tolist(),
+                                 boxes['score'].tolist(), attrs.tolist())
+                annos = []
+                for (translation, size, rotation, velocity, label, score,
+                     attr) in box_fields:
+                    annos.append(
+                        dict(
+                            sample_token=sample_token,
+                            translation=translation,
+                            size=size,
+                            rotation=rotation,
+                            velocity=velocity,
+                            detection_name=mapped_class_names[label],
+                            detection_score=score,
+                            attribute_name=attr))
+                if sample_id > 0:
+                    f.write(', ')
+                f.write(json.dumps(sample_token) + ': ' + json.dumps(annos))
+            f.write('}}')
         print('Results writes to', res_path)
-        mmcv.dump(nusc_submissions, res_path)
         return res_path
 
     def _evaluate_single(self,
@@ -652,3 +648,145 @@ def lidar_nusc_box_to_global(info,
         box.translate(np.array(info['ego2global_translation']))
         box_list.append(box)
     return box_list
+
+
+def output_to_nusc_arrays(detection):
+    """Convert the output to the arrays of boxes in the nuScenes box format.
+
+    It is the batched counterpart of :func:`output_to_nusc_box`.
+
+    Args:
+        detection (dict): Detection results.
+
+            - boxes_3d (:obj:`BaseInstance3DBoxes`): Detection bbox.
+            - scores_3d (torch.Tensor): Detection scores.
+            - labels_3d (torch.Tensor): Predicted box labels.
+
+    Returns:
+        dict[str, np.ndarray]: Boxes in the nuScenes box format.
+
+            - center (np.ndarray): Gravity centers with the shape of (N, 3).
+            - wlh (np.ndarray): Sizes with the shape of (N, 3).
+            - orientation (np.ndarray): Quaternions (w, x, y, z) with the
+                shape of (N, 4).
+            - velocity (np.ndarray): Velocities with the shape of (N, 3).
+            - label (np.ndarray): Labels with the shape of (N, ).
+            - score (np.ndarray): Scores with the shape of (N, ).
+    """
+    box3d = detection['boxes_3d']
+    box_yaw = box3d.yaw.numpy().astype(np.float64)
+    num_boxes = len(box3d)
+
+    # our LiDAR coordinate system -> nuScenes box coordinate system
+    nus_box_dims = box3d.dims.numpy()[:, [1, 0, 2]].astype(np.float64)
+    # rotations around the z axis
+    orientation = np.zeros((num_boxes, 4))
+    orientation[:, 0] = np.cos(box_yaw / 2)
+    orientation[:, 3] = np.sin(box_yaw / 2)
+    velocity = np.zeros((num_boxes, 3))
+    velocity[:, :2] = box3d.tensor[:, 7:9].numpy()
+    return dict(
+        center=box3d.gravity_center.numpy().astype(np.float64),
+        wlh=nus_box_dims,
+        orientation=orientation,
+        velocity=velocity,
+        label=detection['labels_3d'].numpy(),
+        score=detection['scores_3d'].numpy())
+
+
+def _rotate_nusc_arrays(boxes, quaternion):
+    """Rotate the arrays of boxes in place, as ``NuScenesBox.rotate`` does for
+    a single box.
+
+    Args:
+        boxes (dict[str, np.ndarray]): Boxes in the nuScenes box format.
+        quaternion (:obj:`pyquaternion.Quaternion`): Rotation to apply.
+    """
+    rot_mat = quaternion.rotation_matrix
+    w, x, y, z = quaternion.elements
+    # left multiplication by the quaternion in matrix form
+    q_mat = np.array([[w, -x, -y, -z], [x, w, -z, y], [y, z, w, -x],
+                      [z, -y, x, w]])
+    boxes['center'] = boxes['center'] @ rot_mat.T
+    boxes['orientation'] = boxes['orientation'] @ q_mat.T
+    boxes['velocity'] = boxes['velocity'] @ rot_mat.T
+
+
+def lidar_nusc_arrays_to_global(info,
+                                boxes,
+                                classes,
+                                eval_configs,
+                                eval_version='detection_cvpr_2019'):
+    """Convert the arrays of boxes from LiDAR to global coordinate.
+
+    It is the batched counterpart of :func:`lidar_nusc_box_to_global`.
+
+    Args:
+        info (dict): Info for a specific sample data, including the
+            calibration information.
+        boxes (dict[str, np.ndarray]): Boxes in the nuScenes box format,
+            see :func:`output_to_nusc_arrays`.
+        classes (list[str]): Mapped classes in the evaluation.
+        eval_configs (object): Evaluation configuration object.
+        eval_version (str, optional): Evaluation version.
+            Default: 'detection_cvpr_2019'
+
+    Returns:
+        dict[str, np.ndarray]: Boxes in the global coordinate, with those
+            out of the detection range of their classes removed.
+    """
+    boxes = dict(boxes)
+    # Move box to ego vehicle coord system
+    _rotate_nusc_arrays(boxes,
+                        pyquaternion.Quaternion(info['lidar2ego_rotation']))
+    boxes['center'] = boxes['center'] + np.array(info['lidar2ego_translation'])
+    # filter det in ego.
+    cls_range_map = eval_configs.class_range
+    det_range = np.array([cls_range_map[name] for name in classes])
+    radius = np.linalg.norm(boxes['center'][:, :2], 2, axis=1)
+    keep = radius <= det_range[boxes['label']]
+    boxes = {key: value[keep] for key, value in boxes.items()}
+    # Move box to global coord system
+    _rotate_nusc_arrays(boxes,
+                        pyquaternion.Quaternion(info['ego2global_rotation']))
+    boxes['center'] = boxes['center'] + np.array(
+        info['ego2global_translation'])
+    return boxes
+
+
+def get_nusc_attributes(labels, velocity, classes):
+    """Assign the attribute of boxes according to their labels and speeds.
+
+    Args:
+        labels (np.ndarray): Labels of boxes with the shape of (N, ).
+        velocity (np.ndarray): Velocities of boxes with the shape of (N, 3).
+        classes (list[str]): Mapped classes in the evaluation.
+
+    Returns:
+        np.ndarray: Attribute names with the shape of (N, ).
+    """
+    moving_attrs = []
+    static_attrs = []
+    for name in classes:
+        if name in [
+                'car',
+                'construction_vehicle',
+                'bus',
+                'truck',
+                'trailer',
+        ]:
+            moving_attrs.append('vehicle.moving')
+        elif name in ['bicycle', 'motorcycle']:
+            moving_attrs.append('cycle.with_rider')
+        else:
+            moving_attrs.append(NuScenesDataset.DefaultAttribute[name])
+        if name in ['pedestrian']:
+            static_attrs.append('pedestrian.standing')
+        elif name in ['bus']:
+            static_attrs.append('vehicle.stopped')
+        else:
+            static_attrs.append(NuScenesDataset.DefaultAttribute[name])
+    speed = np.sqrt(velocity[:, 0]**2 + velocity[:, 1]**2)
+    return np.where(speed > 0.2,
+                    np.array(moving_attrs)[labels],
+                    np.array(static_attrs)[labels])
@@ -1,10 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import collections
+import hashlib
 
 from mmcv.utils import build_from_cfg
 
 from mmdet.datasets.builder import PIPELINES as MMDET_PIPELINES
 from ..builder import PIPELINES
+from .prefix_cache import PrefixCache
 
 
 @PIPELINES.register_module()
@@ -14,16 +16,34 @@ class Compose:
     pipeline. So the class is rewritten to be able to use pipelines from both
     mmdet3d and mmdet.
 
+    When ``cache_cfg`` is given, the results of the leading transforms that
+    have a true ``deterministic`` attribute, e.g. the loading transforms, are
+    cached per sample by a :obj:`PrefixCache`, keyed by the 'sample_idx' of
+    the input dict. The following transforms run on a copy of the cached
+    results. The pipeline of a dataset is cached with a config like:
+
+    .. code-block::
+
+        pipeline = dict(
+            type='Compose',
+            transforms=train_pipeline,
+            cache_cfg=dict(max_bytes=4 * 1024**3, cache_dir='/dev/shm/kitti'))
+
     Args:
         transforms (Sequence[dict | callable]): Sequence of transform object or
             config dict to be composed.
+        cache_cfg (dict, optional): Config dict of the :obj:`PrefixCache`.
+            Defaults to None, which disables caching.
     """
 
-    def __init__(self, transforms):
+    def __init__(self, transforms, cache_cfg=None):
         assert isinstance(transforms, collections.abc.Sequence)
         self.transforms = []
+        # used to tell apart the cached results of different prefixes
+        fingerprints = []
         for transform in transforms:
             if isinstance(transform, dict):
+                fingerprints.append(repr(sorted(transform.items())))
                 _, key = PIPELINES.split_scope_key(transform['type'])
                 if key in PIPELINES._module_dict.keys():
                     transform = build_from_cfg(transform, PIPELINES)
@@ -31,10 +51,24 @@ class Compose:
                     transform = build_from_cfg(transform, MMDET_PIPELINES)
                 self.transforms.append(transform)
             elif callable(transform):
+                fingerprints.append(type(transform).__name__)
                 self.transforms.append(transform)
             else:
                 raise TypeError('transform must be callable or a dict')
 
+        self.cache = PrefixCache(**cache_cfg) if cache_cfg else None
+        self.prefix_len = 0
+        if self.cache is not None:
+            self.prefix_len = self.cache.prefix_len
+            if self.prefix_len is None:
+                self.prefix_len = 0
+                while self.prefix_len < len(self.transforms) and getattr(
+                        self.transforms[self.prefix_len], 'deterministic',
+                        False):
+                    self.prefix_len += 1
+        self._prefix_fingerprint = hashlib.sha1(''.join(
+            fingerprints[:self.prefix_len]).encode()).hexdigest()
+
     def __call__(self, data):
         """Call function to apply transforms sequentially.
 
@@ -44,8 +78,21 @@ class Compose:
         Returns:
            dict: Transformed data.
         """
+        transforms = self.transforms
+        if self.prefix_len > 0 and data.get('sample_idx') is not None:
+            key = f'{self._prefix_fingerprint}/{data["sample_idx"]}'
+            cached = self.cache.get(key)
+            if cached is None:
+                for t in transforms[:self.prefix_len]:
+                    data = t(data)
+                    if data is None:
+                        return None
+                self.cache.put(key, data)
+            else:
+                data = cached
+            transforms = transforms[self.prefix_len:]
 
-        for t in self.transforms:
+        for t in transforms:
             data = t(data)
             if data is None:
                 return None
@@ -58,3 +105,18 @@ class Compose:
             format_string += f'    {t}'
         format_string += '\n)'
         return format_string
+
+
+def build_pipeline(pipeline):
+    """Build the pipeline of a dataset.
+
+    Args:
+        pipeline (list[dict] | dict): Sequence of transforms, or the config
+            dict of a :obj:`Compose`.
+
+    Returns:
+        :obj:`Compose`: The built pipeline.
+    """
+    if isinstance(pipeline, dict):
+        return build_from_cfg(pipeline, PIPELINES)
+    return Compose(pipeline)
@@ -125,6 +125,40 @@ def box_collision_test(boxes, qboxes, clockwise=True):
     return ret
 
 
+@numba.njit
+def sequential_collision_free(coll_mat, num_fixed, group_ends):
+    """Greedily select the boxes that do not collide with the kept ones.
+
+    The first ``num_fixed`` boxes are always kept. The other boxes are added
+    group by group: when a group is added, its boxes are checked in order
+    and a box is dropped if it collides with a kept box of the previous
+    groups or with a box of its own group that has not been dropped.
+
+    Args:
+        coll_mat (np.ndarray): Collision matrix of all the boxes with the
+            shape of (N, N). Its diagonal should be False.
+        num_fixed (int): Number of boxes that are always kept.
+        group_ends (np.ndarray): End indices of the groups in the boxes.
+
+    Returns:
+        np.ndarray: Whether each of the non-fixed boxes is kept, with the
+            shape of (N - num_fixed, ).
+    """
+    num_boxes = coll_mat.shape[0]
+    active = np.zeros(num_boxes, dtype=np.bool_)
+    active[:num_fixed] = True
+    start = num_fixed
+    for end in group_ends:
+        active[start:end] = True
+        for i in range(start, end):
+            for j in range(num_boxes):
+                if active[j] and coll_mat[i, j]:
+                    active[i] = False
+                    break
+        start = end
+    return active[num_fixed:]
+
+
 @numba.njit
 def noise_per_box(boxes, valid_mask, loc_noises, rot_noises):
     """Add noise to every box (only on the horizontal plane).
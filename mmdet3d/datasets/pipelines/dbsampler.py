@@ -9,6 +9,7 @@ import numpy as np
 from mmdet3d.core.bbox import box_np_ops
 from mmdet3d.datasets.pipelines import data_augment_utils
 from ..builder import OBJECTSAMPLERS, PIPELINES
+from .loading import LoadPointsFromFile
 
 
 class BatchSampler:
@@ -91,6 +92,14 @@ class DataBaseSampler(object):
         classes (list[str], optional): List of classes. Default: None.
         points_loader(dict, optional): Config of points loader. Default:
             dict(type='LoadPointsFromFile', load_dim=4, use_dim=[0,1,2,3])
+
+    Note:
+        The points of the objects are either stored in one file per object,
+        or packed in one large file as written by
+        ``create_groundtruth_database(..., packed=True)``. In the latter case
+        each info has the key ``offset``, i.e., the index of its first point
+        in the packed file, and the objects are sliced out of the
+        memory-mapped file without opening a file per object.
     """
 
     def __init__(self,
@@ -116,6 +125,8 @@ class DataBaseSampler(object):
         self.label2cat = {i: name for i, name in enumerate(classes)}
         self.points_loader = mmcv.build_from_cfg(points_loader, PIPELINES)
         self.file_client = mmcv.FileClient(**file_client_args)
+        # {path: memory-mapped points} of the packed databases
+        self._packed_points = dict()
 
         # load data base infos
         if hasattr(self.file_client, 'get_local_path'):
@@ -161,6 +172,12 @@ class DataBaseSampler(object):
             self.sampler_dict[k] = BatchSampler(v, k, shuffle=True)
         # TODO: No group_sampling currently
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the memory maps would be pickled as copies of the whole files
+        state['_packed_points'] = dict()
+        return state
+
     @staticmethod
     def filter_by_difficulty(db_infos, removed_difficulty):
         """Filter ground truths by difficulties.
@@ -205,6 +222,10 @@ class DataBaseSampler(object):
     def sample_all(self, gt_bboxes, gt_labels, img=None, ground_plane=None):
         """Sampling all categories of bboxes.
 
+        The candidates of all the classes are drawn at once and checked for
+        collisions in one pass, with the same result as sampling the classes
+        one after another with :meth:`sample_class_v2`.
+
         Args:
             gt_bboxes (np.ndarray): Ground truth bounding boxes.
             gt_labels (np.ndarray): Ground truth labels of boxes.
@@ -219,72 +240,39 @@ class DataBaseSampler(object):
                 - points (np.ndarray): sampled points
                 - group_ids (np.ndarray): ids of sampled ground truths
         """
-        sampled_num_dict = {}
-        sample_num_per_class = []
+        gt_labels = np.asarray(gt_labels)
+        candidates = []
+        group_sizes = []
         for class_name, max_sample_num in zip(self.sample_classes,
                                               self.sample_max_nums):
             class_label = self.cat2label[class_name]
-            # sampled_num = int(max_sample_num -
-            #                   np.sum([n == class_name for n in gt_names]))
             sampled_num = int(max_sample_num -
-                              np.sum([n == class_label for n in gt_labels]))
+                              np.sum(gt_labels == class_label))
             sampled_num = np.round(self.rate * sampled_num).astype(np.int64)
-            sampled_num_dict[class_name] = sampled_num
-            sample_num_per_class.append(sampled_num)
+            if sampled_num > 0:
+                sampled_cls = self.sampler_dict[class_name].sample(sampled_num)
+                candidates += sampled_cls
+                group_sizes.append(len(sampled_cls))
 
         sampled = []
-        sampled_gt_bboxes = []
-        avoid_coll_boxes = gt_bboxes
-
-        for class_name, sampled_num in zip(self.sample_classes,
-                                           sample_num_per_class):
-            if sampled_num > 0:
-                sampled_cls = self.sample_class_v2(class_name, sampled_num,
-                                                   avoid_coll_boxes)
-
-                sampled += sampled_cls
-                if len(sampled_cls) > 0:
-                    if len(sampled_cls) == 1:
-                        sampled_gt_box = sampled_cls[0]['box3d_lidar'][
-                            np.newaxis, ...]
-                    else:
-                        sampled_gt_box = np.stack(
-                            [s['box3d_lidar'] for s in sampled_cls], axis=0)
-
-                    sampled_gt_bboxes += [sampled_gt_box]
-                    avoid_coll_boxes = np.concatenate(
-                        [avoid_coll_boxes, sampled_gt_box], axis=0)
+        if len(candidates) > 0:
+            valid = self._collision_free_mask(
+                gt_bboxes, np.stack([s['box3d_lidar'] for s in candidates]),
+                group_sizes)
+            sampled = [s for s, v in zip(candidates, valid) if v]
 
         ret = None
         if len(sampled) > 0:
-            sampled_gt_bboxes = np.concatenate(sampled_gt_bboxes, axis=0)
-            # center = sampled_gt_bboxes[:, 0:3]
-
-            # num_sampled = len(sampled)
-            s_points_list = []
-            count = 0
-            for info in sampled:
-                file_path = os.path.join(
-                    self.data_root,
-                    info['path']) if self.data_root else info['path']
-                results = dict(pts_filename=file_path)
-                s_points = self.points_loader(results)['points']
-                s_points.translate(info['box3d_lidar'][:3])
-
-                count += 1
-
-                s_points_list.append(s_points)
-
+            sampled_gt_bboxes = np.stack([s['box3d_lidar'] for s in sampled])
             gt_labels = np.array([self.cat2label[s['name']] for s in sampled],
                                  dtype=np.long)
 
+            dz = None
             if ground_plane is not None:
                 xyz = sampled_gt_bboxes[:, :3]
                 dz = (ground_plane[:3][None, :] *
                       xyz).sum(-1) + ground_plane[3]
                 sampled_gt_bboxes[:, 2] -= dz
-                for i, s_points in enumerate(s_points_list):
-                    s_points.tensor[:, 2].sub_(dz[i])
 
             ret = {
                 'gt_labels_3d':
@@ -292,7 +280,7 @@ class DataBaseSampler(object):
                 'gt_bboxes_3d':
                 sampled_gt_bboxes,
                 'points':
-                s_points_list[0].cat(s_points_list),
+                self._load_sampled_points(sampled, dz),
                 'group_ids':
                 np.arange(gt_bboxes.shape[0],
                           gt_bboxes.shape[0] + len(sampled))
@@ -300,6 +288,126 @@ class DataBaseSampler(object):
 
         return ret
 
+    def _load_sampled_points(self, sampled, dz=None):
+        """Load the points of the sampled objects and move them to their
+        boxes.
+
+        With the default :obj:`LoadPointsFromFile` loader, the raw points of
+        all the objects are gathered into one preallocated array and wrapped
+        once. Other loaders are called once per object.
+
+        Args:
+            sampled (list[dict]): Infos of the sampled objects.
+            dz (np.ndarray, optional): Offsets of the objects along the z
+                axis to put them on the ground plane. Defaults to None.
+
+        Returns:
+            :obj:`BasePoints`: Points of all the sampled objects.
+        """
+        loader = self.points_loader
+        if not isinstance(loader, LoadPointsFromFile) or loader.shift_height:
+            s_points_list = []
+            for i, info in enumerate(sampled):
+                s_points = self._load_object_points(info)
+                s_points.translate(info['box3d_lidar'][:3])
+                if dz is not None:
+                    s_points.tensor[:, 2].sub_(dz[i])
+                s_points_list.append(s_points)
+            return s_points_list[0].cat(s_points_list)
+
+        raw_points = [self._load_raw_points(info) for info in sampled]
+        num_points = [len(points) for points in raw_points]
+        offsets = np.cumsum([0] + num_points)
+        s_points = np.empty((offsets[-1], loader.load_dim), dtype=np.float32)
+        for i, points in enumerate(raw_points):
+            s_points[offsets[i]:offsets[i + 1]] = points
+        # coordinates always come first in the loaded dimensions
+        s_points[:, :3] += np.repeat(
+            np.stack([info['box3d_lidar'][:3] for info in sampled]),
+            num_points,
+            axis=0).astype(np.float32)
+        if dz is not None:
+            s_points[:, 2] -= np.repeat(dz, num_points).astype(np.float32)
+        return loader.format_points(s_points)
+
+    def _load_raw_points(self, info):
+        """Load the points of a sampled object with all the loaded dimensions.
+
+        Args:
+            info (dict): Info of the object in the database.
+
+        Returns:
+            np.ndarray: Points of the object with the shape of
+                (N, load_dim). It may be a read-only view.
+        """
+        file_path = os.path.join(
+            self.data_root, info['path']) if self.data_root else info['path']
+        if 'offset' not in info:
+            points = self.points_loader._load_points(file_path)
+            return points.reshape(-1, self.points_loader.load_dim)
+
+        packed_points = self._packed_points.get(file_path)
+        if packed_points is None:
+            packed_points = np.memmap(file_path, dtype=np.float32, mode='r')
+            packed_points = packed_points.reshape(-1,
+                                                  self.points_loader.load_dim)
+            self._packed_points[file_path] = packed_points
+        start = info['offset']
+        # slicing the memory map does not copy
+        return packed_points[start:start + info['num_points_in_gt']]
+
+    def _load_object_points(self, info):
+        """Load the points of a sampled object.
+
+        Args:
+            info (dict): Info of the object in the database.
+
+        Returns:
+            :obj:`BasePoints`: Points of the object.
+        """
+        if 'offset' not in info:
+            file_path = os.path.join(
+                self.data_root,
+                info['path']) if self.data_root else info['path']
+            results = dict(pts_filename=file_path)
+            return self.points_loader(results)['points']
+        # the used dimensions are copied out of the memory map by the loader
+        return self.points_loader.format_points(self._load_raw_points(info))
+
+    @staticmethod
+    def _collision_free_mask(gt_bboxes, sampled_bboxes, group_sizes):
+        """Select the sampled boxes that do not collide with other boxes.
+
+        The groups of sampled boxes are added to the scene one after
+        another. A sampled box is rejected if its BEV overlaps a ground
+        truth, a kept box of the previous groups or a box of its own group
+        that has not been rejected yet.
+
+        Args:
+            gt_bboxes (np.ndarray): Ground truth boxes with the shape of
+                (M, 7).
+            sampled_bboxes (np.ndarray): Sampled boxes of all the groups
+                with the shape of (N, 7).
+            group_sizes (list[int]): Number of boxes in each group.
+
+        Returns:
+            np.ndarray: Whether each sampled box is kept, with the shape of
+                (N, ).
+        """
+        num_gt = gt_bboxes.shape[0]
+        boxes = np.concatenate([gt_bboxes, sampled_bboxes], axis=0)
+        boxes_bv = box_np_ops.center_to_corner_box2d(boxes[:, 0:2],
+                                                     boxes[:, 3:5], boxes[:,
+                                                                          6])
+        # the standup boxes are compared first in the collision test, so
+        # the polygons are only intersected for nearby boxes
+        coll_mat = data_augment_utils.box_collision_test(boxes_bv, boxes_bv)
+        diag = np.arange(boxes.shape[0])
+        coll_mat[diag, diag] = False
+        return data_augment_utils.sequential_collision_free(
+            coll_mat, num_gt,
+            np.cumsum(group_sizes) + num_gt)
+
     def sample_class_v2(self, name, num, gt_bboxes):
         """Sampling specific categories of bounding boxes.
 
@@ -313,28 +421,6 @@ class DataBaseSampler(object):
         """
         sampled = self.sampler_dict[name].sample(num)
         sampled = copy.deepcopy(sampled)
-        num_gt = gt_bboxes.shape[0]
-        num_sampled = len(sampled)
-        gt_bboxes_bv = box_np_ops.center_to_corner_box2d(
-            gt_bboxes[:, 0:2], gt_bboxes[:, 3:5], gt_bboxes[:, 6])
-
         sp_boxes = np.stack([i['box3d_lidar'] for i in sampled], axis=0)
-        boxes = np.concatenate([gt_bboxes, sp_boxes], axis=0).copy()
-
-        sp_boxes_new = boxes[gt_bboxes.shape[0]:]
-        sp_boxes_bv = box_np_ops.center_to_corner_box2d(
-            sp_boxes_new[:, 0:2], sp_boxes_new[:, 3:5], sp_boxes_new[:, 6])
-
-        total_bv = np.concatenate([gt_bboxes_bv, sp_boxes_bv], axis=0)
-        coll_mat = data_augment_utils.box_collision_test(total_bv, total_bv)
-        diag = np.arange(total_bv.shape[0])
-        coll_mat[diag, diag] = False
-
-        valid_samples = []
-        for i in range(num_gt, num_gt + num_sampled):
-            if coll_mat[i].any():
-                coll_mat[i] = False
-                coll_mat[:, i] = False
-            else:
-                valid_samples.append(sampled[i - num_gt])
-        return valid_samples
+        valid = self._collision_free_mask(gt_bboxes, sp_boxes, [len(sampled)])
+        return [s for s, v in zip(sampled, valid) if v]
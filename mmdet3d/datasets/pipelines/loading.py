@@ -1,10 +1,15 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import os
+from concurrent import futures as futures
+
 import mmcv
+import numba
 import numpy as np
 
 from mmdet3d.core.points import BasePoints, get_points_type
 from mmdet.datasets.pipelines import LoadAnnotations, LoadImageFromFile
 from ..builder import PIPELINES
+from .points_cache import PointsCache
 
 
 @PIPELINES.register_module()
@@ -20,6 +25,8 @@ class LoadMultiViewImageFromFiles(object):
             Defaults to 'unchanged'.
     """
 
+    deterministic = True
+
     def __init__(self, to_float32=False, color_type='unchanged'):
         self.to_float32 = to_float32
         self.color_type = color_type
@@ -82,6 +89,8 @@ class LoadImageFromFileMono3D(LoadImageFromFile):
             :class:`LoadImageFromFile`.
     """
 
+    deterministic = True
+
     def __call__(self, results):
         """Call functions to load image and get image meta information.
 
@@ -96,6 +105,40 @@ class LoadImageFromFileMono3D(LoadImageFromFile):
         return results
 
 
+@numba.jit(nopython=True, nogil=True)
+def transform_sweeps(points, offsets, rotation, translation, time_lag):
+    """Transform the sweeps to the LiDAR coordinate in place.
+
+    The result is the same as applying ``points[:, :3] @ rotation.T`` and
+    adding the translation to each sweep separately, in one pass over the
+    points.
+
+    Args:
+        points (np.ndarray): Points of all the sweeps with the shape of
+            (N, C), C >= 5. The 5th column is set to the time lag.
+        offsets (np.ndarray): Sweep i takes the rows from offsets[i] to
+            offsets[i + 1].
+        rotation (np.ndarray): Rotations from the sensors to the LiDAR with
+            the shape of (S, 3, 3).
+        translation (np.ndarray): Translations from the sensors to the LiDAR
+            with the shape of (S, 3).
+        time_lag (np.ndarray): Time lags of the sweeps with the shape of
+            (S, ).
+    """
+    for sweep_idx in range(len(offsets) - 1):
+        rot = rotation[sweep_idx]
+        for i in range(offsets[sweep_idx], offsets[sweep_idx + 1]):
+            x = np.float64(points[i, 0])
+            y = np.float64(points[i, 1])
+            z = np.float64(points[i, 2])
+            for k in range(3):
+                # round to float32 after each step as numpy does
+                rotated = np.float32(rot[k, 0] * x + rot[k, 1] * y +
+                                     rot[k, 2] * z)
+                points[i, k] = np.float64(rotated) + translation[sweep_idx, k]
+            points[i, 4] = time_lag[sweep_idx]
+
+
 @PIPELINES.register_module()
 class LoadPointsFromMultiSweeps(object):
     """Load points from multiple sweeps.
@@ -119,6 +162,14 @@ class LoadPointsFromMultiSweeps(object):
         test_mode (bool, optional): If `test_mode=True`, it will not
             randomly sample sweeps but select the nearest N frames.
             Defaults to False.
+        num_threads (int, optional): If positive, the sweeps are read
+            concurrently by a thread pool of this size, copied with the
+            keyframe into one preallocated array and transformed to the LiDAR
+            coordinate by :func:`transform_sweeps` in one pass.
+            Defaults to 0.
+        cache_cfg (dict, optional): Config dict of the :obj:`PointsCache`
+            that keeps the decoded points across epochs. Defaults to None,
+            which disables caching.
     """
 
     def __init__(self,
@@ -128,7 +179,9 @@ class LoadPointsFromMultiSweeps(object):
                  file_client_args=dict(backend='disk'),
                  pad_empty_sweeps=False,
                  remove_close=False,
-                 test_mode=False):
+                 test_mode=False,
+                 num_threads=0,
+                 cache_cfg=None):
         self.load_dim = load_dim
         self.sweeps_num = sweeps_num
         self.use_dim = use_dim
@@ -137,10 +190,41 @@ class LoadPointsFromMultiSweeps(object):
         self.pad_empty_sweeps = pad_empty_sweeps
         self.remove_close = remove_close
         self.test_mode = test_mode
+        self.num_threads = num_threads
+        self.cache_cfg = cache_cfg
+        self.cache = PointsCache(**cache_cfg) if cache_cfg else None
+        # the thread pool is created in the process using it, e.g. in each
+        # dataloader worker
+        self._pool = None
+        self._pool_pid = None
+
+    @property
+    def deterministic(self):
+        """bool: Whether the same sweeps are loaded on every call."""
+        return self.test_mode
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        state['_pool_pid'] = None
+        return state
 
     def _load_points(self, pts_filename):
         """Private function to load point clouds data.
 
+        Args:
+            pts_filename (str): Filename of point clouds data.
+
+        Returns:
+            np.ndarray: An array containing point clouds data.
+        """
+        if self.cache is not None:
+            return self.cache.get(pts_filename, self._read_points)
+        return self._read_points(pts_filename)
+
+    def _read_points(self, pts_filename):
+        """Private function to read and decode point clouds data.
+
         Args:
             pts_filename (str): Filename of point clouds data.
 
@@ -182,6 +266,61 @@ class LoadPointsFromMultiSweeps(object):
         not_close = np.logical_not(np.logical_and(x_filt, y_filt))
         return points[not_close]
 
+    def _load_sweeps_batched(self, points, sweeps, ts):
+        """Load sweeps concurrently and merge them with the keyframe.
+
+        Args:
+            points (:obj:`BasePoints`): Points of the keyframe.
+            sweeps (list[dict]): Infos of the selected sweeps.
+            ts (float): Timestamp of the keyframe.
+
+        Returns:
+            :obj:`BasePoints`: Multi-sweep points with ``use_dim`` applied.
+        """
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = futures.ThreadPoolExecutor(self.num_threads)
+            self._pool_pid = os.getpid()
+        if self.file_client is None:
+            self.file_client = mmcv.FileClient(**self.file_client_args)
+        sweep_points = self._pool.map(self._load_points,
+                                      [sweep['data_path'] for sweep in sweeps])
+        sweep_points = [
+            points_sweep.reshape(-1, self.load_dim)
+            for points_sweep in sweep_points
+        ]
+        if self.remove_close:
+            sweep_points = [
+                self._remove_close(points_sweep)
+                for points_sweep in sweep_points
+            ]
+        keyframe_points = points.tensor.numpy()
+        assert keyframe_points.shape[1] == self.load_dim, \
+            'the keyframe should have the same dimension as the sweeps'
+
+        # copy all the frames to one array, frame i takes the rows from
+        # offsets[i] to offsets[i + 1]
+        offsets = np.cumsum(
+            [0, len(keyframe_points)] +
+            [len(points_sweep) for points_sweep in sweep_points])
+        multi_sweep_points = np.empty((offsets[-1], self.load_dim),
+                                      dtype=np.float32)
+        multi_sweep_points[:offsets[1]] = keyframe_points
+        for i, points_sweep in enumerate(sweep_points, 1):
+            multi_sweep_points[offsets[i]:offsets[i + 1]] = points_sweep
+
+        rotation = np.stack(
+            [sweep['sensor2lidar_rotation'] for sweep in sweeps])
+        translation = np.stack(
+            [sweep['sensor2lidar_translation'] for sweep in sweeps])
+        time_lag = np.array(
+            [ts - sweep['timestamp'] / 1e6 for sweep in sweeps])
+        transform_sweeps(multi_sweep_points, offsets[1:],
+                         rotation.astype(np.float64),
+                         translation.astype(np.float64), time_lag)
+
+        points = points.new_point(multi_sweep_points)
+        return points[:, self.use_dim]
+
     def __call__(self, results):
         """Call function to load multi-sweep point clouds from files.
 
@@ -214,6 +353,10 @@ class LoadPointsFromMultiSweeps(object):
             else:
                 choices = np.random.choice(
                     len(results['sweeps']), self.sweeps_num, replace=False)
+            if self.num_threads > 0 and len(choices) > 0:
+                results['points'] = self._load_sweeps_batched(
+                    points, [results['sweeps'][idx] for idx in choices], ts)
+                return results
             for idx in choices:
                 sweep = results['sweeps'][idx]
                 points_sweep = self._load_points(sweep['data_path'])
@@ -251,6 +394,8 @@ class PointSegClassMapping(object):
             segmentation mask. Defaults to 40.
     """
 
+    deterministic = True
+
     def __init__(self, valid_cat_ids, max_cat_id=40):
         assert max_cat_id >= np.max(valid_cat_ids), \
             'max_cat_id should be greater than maximum id in valid_cat_ids'
@@ -301,6 +446,8 @@ class NormalizePointsColor(object):
         color_mean (list[float]): Mean color of the point cloud.
     """
 
+    deterministic = True
+
     def __init__(self, color_mean):
         self.color_mean = color_mean
 
@@ -359,15 +506,21 @@ class LoadPointsFromFile(object):
             refer to
             https://github.com/open-mmlab/mmcv/blob/master/mmcv/fileio/file_client.py
             for more details. Defaults to dict(backend='disk').
+        cache_cfg (dict, optional): Config dict of the :obj:`PointsCache`
+            that keeps the decoded points across epochs. Defaults to None,
+            which disables caching.
     """
 
+    deterministic = True
+
     def __init__(self,
                  coord_type,
                  load_dim=6,
                  use_dim=[0, 1, 2],
                  shift_height=False,
                  use_color=False,
-                 file_client_args=dict(backend='disk')):
+                 file_client_args=dict(backend='disk'),
+                 cache_cfg=None):
         self.shift_height = shift_height
         self.use_color = use_color
         if isinstance(use_dim, int):
@@ -381,10 +534,25 @@ class LoadPointsFromFile(object):
         self.use_dim = use_dim
         self.file_client_args = file_client_args.copy()
         self.file_client = None
+        self.cache_cfg = cache_cfg
+        self.cache = PointsCache(**cache_cfg) if cache_cfg else None
 
     def _load_points(self, pts_filename):
         """Private function to load point clouds data.
 
+        Args:
+            pts_filename (str): Filename of point clouds data.
+
+        Returns:
+            np.ndarray: An array containing point clouds data.
+        """
+        if self.cache is not None:
+            return self.cache.get(pts_filename, self._read_points)
+        return self._read_points(pts_filename)
+
+    def _read_points(self, pts_filename):
+        """Private function to read and decode point clouds data.
+
         Args:
             pts_filename (str): Filename of point clouds data.
 
@@ -405,20 +573,16 @@ class LoadPointsFromFile(object):
 
         return points
 
-    def __call__(self, results):
-        """Call function to load points data from file.
+    def format_points(self, points):
+        """Select the used dimensions of the loaded points and wrap them.
 
         Args:
-            results (dict): Result dict containing point clouds data.
+            points (np.ndarray): Loaded points with ``load_dim`` values per
+                point. It is not modified.
 
         Returns:
-            dict: The result dict containing the point clouds data.
-                Added key and value are described below.
-
-                - points (:obj:`BasePoints`): Point clouds data.
+            :obj:`BasePoints`: Point clouds data.
         """
-        pts_filename = results['pts_filename']
-        points = self._load_points(pts_filename)
         points = points.reshape(-1, self.load_dim)
         points = points[:, self.use_dim]
         attribute_dims = None
@@ -443,9 +607,24 @@ class LoadPointsFromFile(object):
                 ]))
 
         points_class = get_points_type(self.coord_type)
-        points = points_class(
+        return points_class(
             points, points_dim=points.shape[-1], attribute_dims=attribute_dims)
-        results['points'] = points
+
+    def __call__(self, results):
+        """Call function to load points data from file.
+
+        Args:
+            results (dict): Result dict containing point clouds data.
+
+        Returns:
+            dict: The result dict containing the point clouds data.
+                Added key and value are described below.
+
+                - points (:obj:`BasePoints`): Point clouds data.
+        """
+        pts_filename = results['pts_filename']
+        points = self._load_points(pts_filename)
+        results['points'] = self.format_points(points)
 
         return results
 
@@ -464,6 +643,8 @@ class LoadPointsFromFile(object):
 class LoadPointsFromDict(LoadPointsFromFile):
     """Load Points From Dict."""
 
+    deterministic = False
+
     def __call__(self, results):
         assert 'points' in results
         return results
@@ -506,6 +687,8 @@ class LoadAnnotations3D(LoadAnnotations):
             for more details.
     """
 
+    deterministic = True
+
     def __init__(self,
                  with_bbox_3d=True,
                  with_label_3d=True,
@@ -0,0 +1,243 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from os import path as osp
+
+import numpy as np
+from mmcv.utils import print_log
+
+
+class _SharedTier(object):
+    """Cache tier stored as ``.npy`` files in a shared directory.
+
+    The files are memory-mapped when read, so when the directory is on a
+    memory-backed file system (e.g. ``/dev/shm``), all the processes of a node
+    share one copy of each point cloud. The total size is bounded by
+    ``max_bytes``: the least recently used files (by modification time,
+    which is refreshed on every hit) are removed when it is exceeded.
+    """
+
+    suffix = '.npy'
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock_file = osp.join(cache_dir, '.lock')
+        self._usage_file = osp.join(cache_dir, '.usage')
+
+    def _path(self, key):
+        return osp.join(self.cache_dir,
+                        hashlib.sha1(key.encode()).hexdigest() + self.suffix)
+
+    @contextmanager
+    def _locked(self):
+        import fcntl
+        with open(self._lock_file, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _read_usage(self):
+        try:
+            with open(self._usage_file) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return sum(size for _, size, _ in self._entries())
+
+    def _write_usage(self, usage):
+        with open(self._usage_file, 'w') as f:
+            f.write(str(usage))
+
+    def _load(self, path):
+        return np.load(path, mmap_mode='r')
+
+    def _dump(self, f, points):
+        np.save(f, points)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            points = self._load(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return points
+
+    def put(self, key, points):
+        path = self._path(key)
+        if osp.exists(path):
+            return
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            self._dump(f, points)
+        nbytes = osp.getsize(tmp_path)
+        if nbytes > self.max_bytes:
+            os.remove(tmp_path)
+            return
+        with self._locked():
+            usage = self._read_usage()
+            if usage + nbytes > self.max_bytes:
+                # evict down to 90% of the budget so that the directory is
+                # not scanned again on every insertion
+                usage = 0
+                target = 0.9 * self.max_bytes - nbytes
+                for _, size, old_path in sorted(self._entries(), reverse=True):
+                    if usage + size <= target:
+                        usage += size
+                    else:
+                        try:
+                            # the processes that have mapped the file keep it
+                            # until they release it
+                            os.remove(old_path)
+                        except OSError:
+                            pass
+            os.replace(tmp_path, path)
+            self._write_usage(usage + nbytes)
+
+
+class PointsCache(object):
+    """LRU cache of decoded point clouds.
+
+    Decoded point clouds are kept in memory across epochs, keyed by their
+    file paths, so that files used several times (e.g. a nuScenes sweep is
+    shared by up to 10 consecutive keyframes) are decoded only once per
+    process. An optional shared tier additionally stores them in a directory
+    that is shared by all the dataloader workers of a node, see
+    :class:`_SharedTier`.
+
+    The cached arrays are read-only and are shared by all their users, so
+    callers must copy them before modifying them in place. The entries are
+    not pickled, each process fills its own in-process tier.
+
+    Args:
+        max_bytes (int, optional): Byte budget of the in-process tier. The
+            least recently used arrays are evicted when it is exceeded.
+            Defaults to 2 GiB.
+        shared_dir (str, optional): Directory of the shared tier, e.g. a
+            subdirectory of ``/dev/shm``. It is not removed after use.
+            Defaults to None, which disables the shared tier.
+        shared_max_bytes (int, optional): Byte budget of the shared tier.
+            Defaults to 8 GiB.
+        log_interval (int, optional): Log the hit rate and the bytes saved
+            every ``log_interval`` lookups. Set it to 0 to disable logging.
+            Defaults to 10000.
+    """
+
+    def __init__(self,
+                 max_bytes=2 * 1024**3,
+                 shared_dir=None,
+                 shared_max_bytes=8 * 1024**3,
+                 log_interval=10000):
+        self.max_bytes = max_bytes
+        self.shared_dir = shared_dir
+        self.shared_max_bytes = shared_max_bytes
+        self.log_interval = log_interval
+        self._reset()
+
+    def _reset(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = None
+        if self.shared_dir is not None:
+            self._shared = _SharedTier(self.shared_dir, self.shared_max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ['_entries', '_lock', '_shared']:
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def hit_rate(self):
+        """float: Ratio of the lookups served by either tier."""
+        lookups = self.hits + self.shared_hits + self.misses
+        return (self.hits + self.shared_hits) / max(lookups, 1)
+
+    def get(self, key, loader):
+        """Get the points of a file, decoding it on a miss.
+
+        Args:
+            key (str): Path of the file.
+            loader (callable): Function that takes the path and returns the
+                decoded points as a numpy array.
+
+        Returns:
+            np.ndarray: The read-only decoded points.
+        """
+        with self._lock:
+            points = self._entries.get(key)
+            if points is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_saved += points.nbytes
+        if points is None and self._shared is not None:
+            points = self._shared.get(key)
+            if points is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    self.bytes_saved += points.nbytes
+        if points is None:
+            points = loader(key)
+            points.flags.writeable = False
+            if self._shared is not None:
+                self._shared.put(key, points)
+            with self._lock:
+                self.misses += 1
+                self._put(key, points)
+        self._log()
+        return points
+
+    def _put(self, key, points):
+        if points.nbytes > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = points
+        self.nbytes += points.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def _log(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        if self.log_interval <= 0 or lookups % self.log_interval != 0:
+            return
+        from mmdet3d.utils import get_root_logger
+        print_log(
+            f'{self.__class__.__name__} (pid {os.getpid()}): '
+            f'hit rate {self.hit_rate:.2%} over {lookups} lookups '
+            f'({self.shared_hits} from the shared tier), '
+            f'{self.bytes_saved / 1024**2:.1f} MB of decoding saved, '
+            f'{len(self._entries)} entries using '
+            f'{self.nbytes / 1024**2:.1f} MB',
+            logger=get_root_logger())
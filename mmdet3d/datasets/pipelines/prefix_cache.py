@@ -0,0 +1,139 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import pickle
+import threading
+from collections import OrderedDict
+
+from .points_cache import _SharedTier
+
+
+class _PickleTier(_SharedTier):
+    """Cache tier storing pickled results as files in a directory."""
+
+    suffix = '.pkl'
+
+    def _load(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def _dump(self, f, data):
+        f.write(data)
+
+
+class PrefixCache(object):
+    """LRU cache of the results of the deterministic prefix of a pipeline.
+
+    The leading transforms of a pipeline that give the same results on every
+    call (e.g. loading the points, the sweeps and the annotations) are only
+    run on the first access to a sample, see :class:`Compose`. Their results
+    are kept pickled, so that every hit returns a fresh copy that the random
+    augmentations can modify in place, and so that the size of the entries
+    is known exactly.
+
+    The entries are kept in memory in each process and, optionally, in a
+    directory shared by all the dataloader workers, which also survives the
+    workers being restarted at every epoch. The entries are not pickled with
+    the pipeline, each process fills its own in-memory tier.
+
+    Args:
+        max_bytes (int, optional): Byte budget of the in-memory tier. The
+            least recently used entries are evicted when it is exceeded.
+            Defaults to 2 GiB.
+        cache_dir (str, optional): Directory of the on-disk tier. It should
+            only be shared by pipelines with the same prefix and the same
+            dataset, and is not removed after use. Defaults to None, which
+            disables the on-disk tier.
+        disk_max_bytes (int, optional): Byte budget of the on-disk tier.
+            Defaults to 32 GiB.
+        prefix_len (int, optional): Number of the leading transforms whose
+            results are cached. Defaults to None, which caches the longest
+            prefix of transforms marked as deterministic.
+    """
+
+    def __init__(self,
+                 max_bytes=2 * 1024**3,
+                 cache_dir=None,
+                 disk_max_bytes=32 * 1024**3,
+                 prefix_len=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.prefix_len = prefix_len
+        self._reset()
+
+    def _reset(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if self.cache_dir is not None:
+            self._disk = _PickleTier(self.cache_dir, self.disk_max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ['_entries', '_lock', '_disk']:
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def hit_rate(self):
+        """float: Ratio of the lookups served by either tier."""
+        return self.hits / max(self.hits + self.misses, 1)
+
+    def get(self, key):
+        """Get a copy of the cached results of a sample.
+
+        Args:
+            key (str): Key of the sample.
+
+        Returns:
+            dict | None: The results, or None on a miss.
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+        if data is None and self._disk is not None:
+            data = self._disk.get(key)
+            if data is not None:
+                with self._lock:
+                    self._put(key, data)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(data)
+
+    def put(self, key, results):
+        """Cache the results of a sample.
+
+        Args:
+            key (str): Key of the sample.
+            results (dict): The results, they are copied.
+        """
+        data = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._disk is not None:
+            self._disk.put(key, data)
+        with self._lock:
+            self._put(key, data)
+
+    def _put(self, key, data):
+        if len(data) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = data
+        self.nbytes += len(data)
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= len(evicted)
@@ -4,6 +4,7 @@ import warnings
 
 import cv2
 import numpy as np
+import torch
 from mmcv import is_tuple_of
 from mmcv.utils import build_from_cfg
 
@@ -857,6 +858,142 @@ class ObjectNameFilter(object):
         return repr_str
 
 
+@PIPELINES.register_module()
+class FusedGlobalTransform3D(object):
+    """Apply the global augmentations and filters of the points in one pass.
+
+    The outdoor pipelines chain :obj:`RandomFlip3D`,
+    :obj:`GlobalRotScaleTrans`, :obj:`PointsRangeFilter`,
+    :obj:`ObjectRangeFilter` and :obj:`PointShuffle`, each of which rewrites
+    all the points. This transform wraps them and runs them with the same
+    random draws, but the flips, rotation, scaling and translation are
+    applied to a probe made of the origin and the unit vectors of the point
+    dimensions, from which the composed affine transformation is read. The
+    points are then transformed by a single matrix multiplication, and the
+    range filter and the shuffle are merged into a single indexing of the
+    points and of the point masks. The boxes and the recorded results, e.g.
+    'pcd_rotation', 'pcd_scale_factor' and the flip flags, are produced by
+    the wrapped transforms as usual.
+
+    An example configuration is as followed:
+
+    .. code-block::
+
+        dict(
+            type='FusedGlobalTransform3D',
+            transforms=[
+                dict(type='RandomFlip3D', flip_ratio_bev_horizontal=0.5),
+                dict(
+                    type='GlobalRotScaleTrans',
+                    rot_range=[-0.78539816, 0.78539816],
+                    scale_ratio_range=[0.95, 1.05]),
+                dict(type='PointsRangeFilter', point_cloud_range=pc_range),
+                dict(type='ObjectRangeFilter', point_cloud_range=pc_range),
+                dict(type='PointShuffle')
+            ])
+
+    Args:
+        transforms (list[dict]): Configs of the transforms, in the order
+            they are applied. :obj:`RandomFlip3D` and
+            :obj:`GlobalRotScaleTrans` must come before
+            :obj:`PointsRangeFilter` and :obj:`PointShuffle`. The other
+            transforms, e.g. :obj:`ObjectRangeFilter`, must not change the
+            points.
+    """
+
+    def __init__(self, transforms):
+        self.transforms = []
+        point_transform = None
+        for transform in transforms:
+            if isinstance(transform, dict):
+                transform = build_from_cfg(transform, PIPELINES)
+            if isinstance(transform, (PointsRangeFilter, PointShuffle)):
+                point_transform = transform
+            elif isinstance(transform, (RandomFlip3D, GlobalRotScaleTrans)):
+                assert point_transform is None, \
+                    f'{type(transform).__name__} should be applied before ' \
+                    f'{type(point_transform).__name__}'
+            else:
+                assert isinstance(transform,
+                                  (ObjectRangeFilter, ObjectNameFilter)), \
+                    f'unsupported transform {type(transform).__name__}'
+            self.transforms.append(transform)
+
+    def __call__(self, input_dict):
+        """Call function to transform, filter and shuffle the points and to
+        apply the wrapped transforms to the other results.
+
+        Args:
+            input_dict (dict): Result dict from loading pipeline.
+
+        Returns:
+            dict: Results after the transforms, 'points', 'pts_instance_mask'
+                and 'pts_semantic_mask' keys and the keys of the wrapped
+                transforms are updated in the result dict.
+        """
+        points = input_dict['points']
+        points_dim = points.points_dim
+        probe = points.tensor.new_zeros((points_dim + 1, points_dim))
+        probe[1:] = torch.eye(points_dim)
+        input_dict['points'] = points.new_point(probe)
+
+        point_transforms = []
+        for transform in self.transforms:
+            if isinstance(transform, (PointsRangeFilter, PointShuffle)):
+                # they only depend on the final coordinates of the points
+                point_transforms.append(transform)
+            else:
+                input_dict = transform(input_dict)
+
+        probe = input_dict['points'].tensor
+        trans = probe[0]
+        rot_mat = probe[1:] - trans
+        # usually only the coordinates are changed, the dimensions after the
+        # last changed one are left as they are
+        changed = rot_mat != torch.eye(points_dim)
+        changed = (changed.any(0) | changed.any(1) | (trans != 0)).nonzero()
+        if len(changed) > 0:
+            dims = int(changed.max()) + 1
+            coords = points.tensor[:, :dims] @ rot_mat[:dims, :dims]
+            coords += trans[:dims]
+            points.tensor[:, :dims] = coords
+
+        # indices of the kept points in their new order
+        idx = None
+        for transform in point_transforms:
+            if isinstance(transform, PointsRangeFilter):
+                kept_points = points if idx is None else points[idx]
+                points_mask = kept_points.in_range_3d(transform.pcd_range)
+                idx = points_mask.nonzero().view(-1) if idx is None \
+                    else idx[points_mask]
+            else:
+                num_points = len(points) if idx is None else len(idx)
+                shuffle_idx = torch.randperm(num_points, device=points.device)
+                idx = shuffle_idx if idx is None else idx[shuffle_idx]
+
+        if idx is not None:
+            points = points[idx]
+            idx = idx.numpy()
+            pts_instance_mask = input_dict.get('pts_instance_mask', None)
+            pts_semantic_mask = input_dict.get('pts_semantic_mask', None)
+
+            if pts_instance_mask is not None:
+                input_dict['pts_instance_mask'] = pts_instance_mask[idx]
+
+            if pts_semantic_mask is not None:
+                input_dict['pts_semantic_mask'] = pts_semantic_mask[idx]
+        input_dict['points'] = points
+        return input_dict
+
+    def __repr__(self):
+        """str: Return a string that describes the module."""
+        repr_str = self.__class__.__name__ + '('
+        for transform in self.transforms:
+            repr_str += f'\n    {transform}'
+        repr_str += '\n)'
+        return repr_str
+
+
 @PIPELINES.register_module()
 class PointSample(object):
     """Point sample.
@@ -278,3 +278,19 @@ class SUNRGBDDataset(Custom3DDataset):
                     logger=logger)
                 eval_results['mAP_' + str(iou_thr_2d_single)] = mean_ap
             return eval_results
+
+    def build_evaluator(self, iou_thr=(0.25, 0.5), logger=None, **kwargs):
+        """Build a streaming evaluator of the 3D detection results.
+
+        The 3D results are evaluated in the indoor protocol of
+        :meth:`evaluate`, the 2D results are not supported.
+
+        Args:
+            iou_thr (list[float]): AP IoU thresholds. Defaults to (0.25, 0.5).
+            logger (logging.Logger | str, optional): Logger used for printing
+                related information during evaluation. Defaults to None.
+
+        Returns:
+            :obj:`IndoorEvaluator`: Streaming evaluator.
+        """
+        return super().build_evaluator(iou_thr=iou_thr, logger=logger)
@@ -138,3 +138,27 @@ def extract_result_dict(results, key):
     if isinstance(data, mmcv.parallel.DataContainer):
         data = data._data
     return data
+
+
+def check_streaming_evaluation(dataset):
+    """Check that a dataset supports streaming evaluation.
+
+    The evaluator returned by ``build_evaluator`` follows the ``evaluate``
+    method of the class that defines ``build_evaluator``, so the datasets
+    that override ``evaluate`` without ``build_evaluator`` use another
+    protocol and are not supported.
+
+    Args:
+        dataset (:obj:`torch.utils.data.Dataset`): The dataset to check.
+
+    Raises:
+        NotImplementedError: If the dataset does not support streaming
+            evaluation.
+    """
+
+    def defining_class(name):
+        return next(cls for cls in type(dataset).__mro__ if name in vars(cls))
+
+    if defining_class('evaluate') is not defining_class('build_evaluator'):
+        raise NotImplementedError('Streaming evaluation is not supported by '
+                                  f'{type(dataset).__name__}')
@@ -6,8 +6,8 @@ from mmcv.cnn import ConvModule, build_conv_layer
 from mmcv.runner import BaseModule, force_fp32
 from torch import nn
 
-from mmdet3d.core import (circle_nms, draw_heatmap_gaussian, gaussian_radius,
-                          xywhr2xyxyr)
+from mmdet3d.core import (batched_circle_nms, draw_heatmap_gaussian_batch,
+                          gaussian_radius, xywhr2xyxyr)
 from mmdet3d.core.post_processing import nms_bev
 from mmdet3d.models import builder
 from mmdet3d.models.utils import clip_sigmoid
@@ -386,16 +386,12 @@ class CenterHead(BaseModule):
     def get_targets(self, gt_bboxes_3d, gt_labels_3d):
         """Generate targets.
 
-        How each output is transformed:
-
-            Each nested list is transposed so that all same-index elements in
-            each sub-list (1, ..., N) become the new sub-lists.
-                [ [a0, a1, a2, ... ], [b0, b1, b2, ... ], ... ]
-                ==> [ [a0, b0, ... ], [a1, b1, ... ], [a2, b2, ... ] ]
-
-            The new transposed nested list is converted into a list of N
-            tensors generated by concatenating tensors in the new sub-lists.
-                [ tensor0, tensor1, tensor2, ... ]
+        The targets of all the samples of the batch are generated together:
+        the radii, centers, indexes and regression targets of all the objects
+        of a task are computed as tensors, and all their gaussians are drawn
+        on the heatmaps at once by :func:`draw_heatmap_gaussian_batch`. The
+        targets are the same as those of :meth:`get_targets_single` stacked
+        along the batch dimension.
 
         Args:
             gt_bboxes_3d (list[:obj:`LiDARInstance3DBoxes`]): Ground
@@ -414,20 +410,105 @@ class CenterHead(BaseModule):
                     - list[torch.Tensor]: Masks indicating which
                         boxes are valid.
         """
-        heatmaps, anno_boxes, inds, masks = multi_apply(
-            self.get_targets_single, gt_bboxes_3d, gt_labels_3d)
-        # Transpose heatmaps
-        heatmaps = list(map(list, zip(*heatmaps)))
-        heatmaps = [torch.stack(hms_) for hms_ in heatmaps]
-        # Transpose anno_boxes
-        anno_boxes = list(map(list, zip(*anno_boxes)))
-        anno_boxes = [torch.stack(anno_boxes_) for anno_boxes_ in anno_boxes]
-        # Transpose inds
-        inds = list(map(list, zip(*inds)))
-        inds = [torch.stack(inds_) for inds_ in inds]
-        # Transpose inds
-        masks = list(map(list, zip(*masks)))
-        masks = [torch.stack(masks_) for masks_ in masks]
+        device = gt_labels_3d[0].device
+        batch_size = len(gt_labels_3d)
+        gt_bboxes = torch.cat([
+            torch.cat((bboxes.gravity_center, bboxes.tensor[:, 3:]), dim=1)
+            for bboxes in gt_bboxes_3d
+        ]).to(device)
+        gt_labels = torch.cat(gt_labels_3d)
+        sample_inds = torch.arange(
+            batch_size, device=device).repeat_interleave(
+                torch.tensor([len(labels) for labels in gt_labels_3d],
+                             device=device))
+        max_objs = self.train_cfg['max_objs'] * self.train_cfg['dense_reg']
+        out_size_factor = self.train_cfg['out_size_factor']
+        grid_size = torch.tensor(self.train_cfg['grid_size'])
+        pc_range = torch.tensor(self.train_cfg['point_cloud_range'])
+        voxel_size = torch.tensor(self.train_cfg['voxel_size'])
+
+        feature_map_size = grid_size[:2] // out_size_factor
+        map_w, map_h = int(feature_map_size[0]), int(feature_map_size[1])
+
+        heatmaps, anno_boxes, inds, masks = [], [], [], []
+        flag = 0
+        for class_names in self.class_names:
+            num_cls = len(class_names)
+            heatmap = gt_bboxes.new_zeros((batch_size, num_cls, map_h, map_w))
+            anno_box = gt_bboxes.new_zeros((batch_size, max_objs, 10),
+                                           dtype=torch.float32)
+            ind = gt_labels.new_zeros((batch_size, max_objs),
+                                      dtype=torch.int64)
+            mask = gt_bboxes.new_zeros((batch_size, max_objs),
+                                       dtype=torch.uint8)
+
+            # order the objects of the task by sample, then by class, then by
+            # their order in the sample, and find their slot in the targets
+            task_inds = ((gt_labels >= flag) &
+                         (gt_labels < flag + num_cls)).nonzero().view(-1)
+            task_cls = gt_labels[task_inds] - flag
+            task_samples = sample_inds[task_inds]
+            num_task_objs = task_inds.shape[0]
+            order = torch.argsort((task_samples * num_cls + task_cls) *
+                                  num_task_objs +
+                                  torch.arange(num_task_objs, device=device))
+            task_inds = task_inds[order]
+            task_cls = task_cls[order]
+            task_samples = task_samples[order]
+            counts = torch.bincount(task_samples, minlength=batch_size)
+            starts = counts.cumsum(0) - counts
+            slots = torch.arange(
+                num_task_objs, device=device) - starts[task_samples]
+            flag += num_cls
+
+            task_boxes = gt_bboxes[task_inds]
+            width = task_boxes[:, 3] / voxel_size[0] / out_size_factor
+            length = task_boxes[:, 4] / voxel_size[1] / out_size_factor
+            # be really careful for the coordinate system of
+            # your box annotation.
+            coor_x = (task_boxes[:, 0] -
+                      pc_range[0]) / voxel_size[0] / out_size_factor
+            coor_y = (task_boxes[:, 1] -
+                      pc_range[1]) / voxel_size[1] / out_size_factor
+            center = torch.stack([coor_x, coor_y], dim=1).float()
+            center_int = center.to(torch.int32)
+
+            x, y = center_int[:, 0], center_int[:, 1]
+            valid = (slots < max_objs) & (width > 0) & (length > 0)
+            # throw out not in range objects to avoid out of array
+            # area when creating the heatmap
+            valid &= (x >= 0) & (x < map_w) & (y >= 0) & (y < map_h)
+            (task_boxes, width, length, center, center_int, x, y, task_cls,
+             task_samples, slots) = [
+                 t[valid]
+                 for t in (task_boxes, width, length, center, center_int, x, y,
+                           task_cls, task_samples, slots)
+             ]
+
+            radius = gaussian_radius(
+                (length, width),
+                min_overlap=self.train_cfg['gaussian_overlap'])
+            radius = radius.long().clamp(min=self.train_cfg['min_radius'])
+            draw_heatmap_gaussian_batch(
+                heatmap.view(-1, map_h, map_w),
+                task_samples * num_cls + task_cls, center_int, radius)
+
+            ind[task_samples, slots] = (y * map_w + x).long()
+            mask[task_samples, slots] = 1
+            # TODO: support other outdoor dataset
+            box_dim = task_boxes[:, 3:6]
+            if self.norm_bbox:
+                box_dim = box_dim.log()
+            rot = task_boxes[:, 6:7]
+            anno_box[task_samples, slots] = torch.cat(
+                (center - center_int, task_boxes[:, 2:3], box_dim,
+                 torch.sin(rot), torch.cos(rot), task_boxes[:, 7:9]),
+                dim=1)
+
+            heatmaps.append(heatmap)
+            anno_boxes.append(anno_box)
+            inds.append(ind)
+            masks.append(mask)
         return heatmaps, anno_boxes, inds, masks
 
     def get_targets_single(self, gt_bboxes_3d, gt_labels_3d):
@@ -448,125 +529,9 @@ class CenterHead(BaseModule):
                 - list[torch.Tensor]: Masks indicating which boxes
                     are valid.
         """
-        device = gt_labels_3d.device
-        gt_bboxes_3d = torch.cat(
-            (gt_bboxes_3d.gravity_center, gt_bboxes_3d.tensor[:, 3:]),
-            dim=1).to(device)
-        max_objs = self.train_cfg['max_objs'] * self.train_cfg['dense_reg']
-        grid_size = torch.tensor(self.train_cfg['grid_size'])
-        pc_range = torch.tensor(self.train_cfg['point_cloud_range'])
-        voxel_size = torch.tensor(self.train_cfg['voxel_size'])
-
-        feature_map_size = grid_size[:2] // self.train_cfg['out_size_factor']
-
-        # reorganize the gt_dict by tasks
-        task_masks = []
-        flag = 0
-        for class_name in self.class_names:
-            task_masks.append([
-                torch.where(gt_labels_3d == class_name.index(i) + flag)
-                for i in class_name
-            ])
-            flag += len(class_name)
-
-        task_boxes = []
-        task_classes = []
-        flag2 = 0
-        for idx, mask in enumerate(task_masks):
-            task_box = []
-            task_class = []
-            for m in mask:
-                task_box.append(gt_bboxes_3d[m])
-                # 0 is background for each task, so we need to add 1 here.
-                task_class.append(gt_labels_3d[m] + 1 - flag2)
-            task_boxes.append(torch.cat(task_box, axis=0).to(device))
-            task_classes.append(torch.cat(task_class).long().to(device))
-            flag2 += len(mask)
-        draw_gaussian = draw_heatmap_gaussian
-        heatmaps, anno_boxes, inds, masks = [], [], [], []
-
-        for idx, task_head in enumerate(self.task_heads):
-            heatmap = gt_bboxes_3d.new_zeros(
-                (len(self.class_names[idx]), feature_map_size[1],
-                 feature_map_size[0]))
-
-            anno_box = gt_bboxes_3d.new_zeros((max_objs, 10),
-                                              dtype=torch.float32)
-
-            ind = gt_labels_3d.new_zeros((max_objs), dtype=torch.int64)
-            mask = gt_bboxes_3d.new_zeros((max_objs), dtype=torch.uint8)
-
-            num_objs = min(task_boxes[idx].shape[0], max_objs)
-
-            for k in range(num_objs):
-                cls_id = task_classes[idx][k] - 1
-
-                width = task_boxes[idx][k][3]
-                length = task_boxes[idx][k][4]
-                width = width / voxel_size[0] / self.train_cfg[
-                    'out_size_factor']
-                length = length / voxel_size[1] / self.train_cfg[
-                    'out_size_factor']
-
-                if width > 0 and length > 0:
-                    radius = gaussian_radius(
-                        (length, width),
-                        min_overlap=self.train_cfg['gaussian_overlap'])
-                    radius = max(self.train_cfg['min_radius'], int(radius))
-
-                    # be really careful for the coordinate system of
-                    # your box annotation.
-                    x, y, z = task_boxes[idx][k][0], task_boxes[idx][k][
-                        1], task_boxes[idx][k][2]
-
-                    coor_x = (
-                        x - pc_range[0]
-                    ) / voxel_size[0] / self.train_cfg['out_size_factor']
-                    coor_y = (
-                        y - pc_range[1]
-                    ) / voxel_size[1] / self.train_cfg['out_size_factor']
-
-                    center = torch.tensor([coor_x, coor_y],
-                                          dtype=torch.float32,
-                                          device=device)
-                    center_int = center.to(torch.int32)
-
-                    # throw out not in range objects to avoid out of array
-                    # area when creating the heatmap
-                    if not (0 <= center_int[0] < feature_map_size[0]
-                            and 0 <= center_int[1] < feature_map_size[1]):
-                        continue
-
-                    draw_gaussian(heatmap[cls_id], center_int, radius)
-
-                    new_idx = k
-                    x, y = center_int[0], center_int[1]
-
-                    assert (y * feature_map_size[0] + x <
-                            feature_map_size[0] * feature_map_size[1])
-
-                    ind[new_idx] = y * feature_map_size[0] + x
-                    mask[new_idx] = 1
-                    # TODO: support other outdoor dataset
-                    vx, vy = task_boxes[idx][k][7:]
-                    rot = task_boxes[idx][k][6]
-                    box_dim = task_boxes[idx][k][3:6]
-                    if self.norm_bbox:
-                        box_dim = box_dim.log()
-                    anno_box[new_idx] = torch.cat([
-                        center - torch.tensor([x, y], device=device),
-                        z.unsqueeze(0), box_dim,
-                        torch.sin(rot).unsqueeze(0),
-                        torch.cos(rot).unsqueeze(0),
-                        vx.unsqueeze(0),
-                        vy.unsqueeze(0)
-                    ])
-
-            heatmaps.append(heatmap)
-            anno_boxes.append(anno_box)
-            masks.append(mask)
-            inds.append(ind)
-        return heatmaps, anno_boxes, inds, masks
+        targets = self.get_targets([gt_bboxes_3d], [gt_labels_3d])
+        return tuple([target[0] for target in task_targets]
+                     for task_targets in targets)
 
     @force_fp32(apply_to=('preds_dicts'))
     def loss(self, gt_bboxes_3d, gt_labels_3d, preds_dicts, **kwargs):
@@ -631,7 +596,6 @@ class CenterHead(BaseModule):
         rets = []
         for task_id, preds_dict in enumerate(preds_dicts):
             num_class_with_bg = self.num_classes[task_id]
-            batch_size = preds_dict[0]['heatmap'].shape[0]
             batch_heatmap = preds_dict[0]['heatmap'].sigmoid()
 
             batch_reg = preds_dict[0]['reg']
@@ -663,32 +627,14 @@ class CenterHead(BaseModule):
             batch_cls_preds = [box['scores'] for box in temp]
             batch_cls_labels = [box['labels'] for box in temp]
             if self.test_cfg['nms_type'] == 'circle':
-                ret_task = []
-                for i in range(batch_size):
-                    boxes3d = temp[i]['bboxes']
-                    scores = temp[i]['scores']
-                    labels = temp[i]['labels']
-                    centers = boxes3d[:, [0, 1]]
-                    boxes = torch.cat([centers, scores.view(-1, 1)], dim=1)
-                    keep = torch.tensor(
-                        circle_nms(
-                            boxes.detach().cpu().numpy(),
-                            self.test_cfg['min_radius'][task_id],
-                            post_max_size=self.test_cfg['post_max_size']),
-                        dtype=torch.long,
-                        device=boxes.device)
-
-                    boxes3d = boxes3d[keep]
-                    scores = scores[keep]
-                    labels = labels[keep]
-                    ret = dict(bboxes=boxes3d, scores=scores, labels=labels)
-                    ret_task.append(ret)
-                rets.append(ret_task)
+                rets.append(temp)
             else:
                 rets.append(
                     self.get_task_detections(num_class_with_bg,
                                              batch_cls_preds, batch_reg_preds,
                                              batch_cls_labels, img_metas))
+        if self.test_cfg['nms_type'] == 'circle':
+            rets = self.get_circle_detections(rets)
 
         # Merge branches results
         num_samples = len(rets[0])
@@ -712,6 +658,55 @@ class CenterHead(BaseModule):
             ret_list.append([bboxes, scores, labels])
         return ret_list
 
+    def get_circle_detections(self, task_dets):
+        """Circle nms for all the tasks and samples at once.
+
+        Args:
+            task_dets (list[list[dict[str: torch.Tensor]]]): Decoded
+                detections of each task and each sample, with the keys
+                'bboxes', 'scores' and 'labels'.
+
+        Returns:
+            list[list[dict[str: torch.Tensor]]]: Detections of each task and
+                each sample after nms, with the same keys.
+        """
+        dets = [det for sample_dets in task_dets for det in sample_dets]
+        device = dets[0]['scores'].device
+        num_dets = torch.tensor([det['scores'].shape[0] for det in dets],
+                                device=device)
+        groups = torch.arange(
+            len(dets), device=device).repeat_interleave(num_dets)
+        min_radius = [
+            self.test_cfg['min_radius'][task_id]
+            for task_id, sample_dets in enumerate(task_dets)
+            for _ in sample_dets
+        ]
+        thresh = torch.tensor(
+            min_radius, dtype=torch.float64,
+            device=device).repeat_interleave(num_dets)
+        bboxes = torch.cat([det['bboxes'] for det in dets])
+        scores = torch.cat([det['scores'] for det in dets])
+        labels = torch.cat([det['labels'] for det in dets])
+        keep = batched_circle_nms(
+            bboxes[:, :2].detach(),
+            scores.detach(),
+            thresh,
+            groups=groups,
+            post_max_size=self.test_cfg['post_max_size'])
+        num_keep = torch.bincount(groups[keep], minlength=len(dets)).tolist()
+
+        kept_dets = [
+            dict(bboxes=det_bboxes, scores=det_scores, labels=det_labels)
+            for det_bboxes, det_scores, det_labels in zip(
+                bboxes[keep].split(num_keep), scores[keep].split(num_keep),
+                labels[keep].split(num_keep))
+        ]
+        rets = []
+        for sample_dets in task_dets:
+            rets.append(kept_dets[:len(sample_dets)])
+            kept_dets = kept_dets[len(sample_dets):]
+        return rets
+
     def get_task_detections(self, num_class_with_bg, batch_cls_preds,
                             batch_reg_preds, batch_cls_labels, img_metas):
         """Rotate nms for each task.
@@ -2,9 +2,17 @@
 import numpy as np
 import torch
 
-from mmdet3d.core import limit_period
+from mmdet3d.core import TensorCache, limit_period
 from mmdet.core import images_to_levels, multi_apply
 
+# anchors of the classes, kept so that the assigners get the same tensors in
+# every iteration and their nearest BEV boxes are cached
+_class_anchors_cache = TensorCache()
+
+
+def _class_anchors(anchors, class_id, box_code_size):
+    return anchors[..., class_id, :, :].reshape(-1, box_code_size)
+
 
 class AnchorTrainMixin(object):
     """Mixin class for target assigning of dense heads."""
@@ -58,7 +66,10 @@ class AnchorTrainMixin(object):
             ]
             # concat all level anchors and flags to a single tensor
             for i in range(num_imgs):
-                anchor_list[i] = torch.cat(anchor_list[i])
+                if len(anchor_list[i]) == 1:
+                    anchor_list[i] = anchor_list[i][0]
+                else:
+                    anchor_list[i] = torch.cat(anchor_list[i])
 
         # compute targets for each image
         if gt_bboxes_ignore_list is None:
@@ -133,8 +144,8 @@ class AnchorTrainMixin(object):
              total_pos_inds, total_neg_inds) = [], [], [], [], [], [], [], []
             current_anchor_num = 0
             for i, assigner in enumerate(self.bbox_assigner):
-                current_anchors = anchors[..., i, :, :].reshape(
-                    -1, self.box_code_size)
+                current_anchors = _class_anchors_cache.get(
+                    anchors, _class_anchors, i, self.box_code_size)
                 current_anchor_num += current_anchors.size(0)
                 if self.assign_per_class:
                     gt_per_cls = (gt_labels == i)
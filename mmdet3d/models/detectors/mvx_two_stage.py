@@ -11,6 +11,7 @@ from torch.nn import functional as F
 
 from mmdet3d.core import (Box3DMode, Coord3DMode, bbox3d2result,
                           merge_aug_bboxes_3d, show_result)
+from mmdet3d.ops import batch_voxelize
 from mmdet.core import multi_apply
 from .. import builder
 from ..builder import DETECTORS
@@ -220,6 +221,12 @@ class MVXTwoStageDetector(Base3DDetector):
             tuple[torch.Tensor]: Concatenated points, number of points
                 per voxel, and coordinates.
         """
+        if not points[0].is_cuda:
+            # voxelize all the samples at once on CPU, the CUDA kernel of the
+            # voxel layer is used on GPU
+            voxels, coors_batch, num_points = batch_voxelize(
+                points, self.pts_voxel_layer)
+            return voxels, num_points, coors_batch
         voxels, coors, num_points = [], [], []
         for res in points:
             res_voxels, res_coors, res_num_points = self.pts_voxel_layer(res)
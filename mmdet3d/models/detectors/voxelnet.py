@@ -5,6 +5,7 @@ from mmcv.runner import force_fp32
 from torch.nn import functional as F
 
 from mmdet3d.core import bbox3d2result, merge_aug_bboxes_3d
+from mmdet3d.ops import batch_voxelize
 from .. import builder
 from ..builder import DETECTORS
 from .single_stage import SingleStage3DDetector
@@ -52,6 +53,12 @@ class VoxelNet(SingleStage3DDetector):
     @force_fp32()
     def voxelize(self, points):
         """Apply hard voxelization to points."""
+        if not points[0].is_cuda:
+            # voxelize all the samples at once on CPU, the CUDA kernel of the
+            # voxel layer is used on GPU
+            voxels, coors_batch, num_points = batch_voxelize(
+                points, self.voxel_layer)
+            return voxels, num_points, coors_batch
         voxels, coors, num_points = [], [], []
         for res in points:
             res_voxels, res_coors, res_num_points = self.voxel_layer(res)
@@ -15,21 +15,38 @@ class PointPillarsScatter(nn.Module):
     Args:
         in_channels (int): Channels of input features.
         output_shape (list[int]): Required output shape of features.
+        reuse_canvas (bool, optional): Whether to keep the output canvas and
+            reuse its memory in the next call with the same batch size,
+            dtype and device, instead of allocating a new one. The output of
+            a call is then overwritten by the next call, so it must not be
+            kept across iterations. Defaults to False.
+        sparse_output (bool, optional): Whether to output a hybrid sparse
+            COO tensor of shape (B, ny, nx, C), whose sparse dimensions are
+            the sample and the BEV position of each pillar and whose dense
+            dimension holds its features, instead of the dense pseudo image
+            of shape (B, C, ny, nx). It avoids allocating the dense canvas
+            for very large BEV grids, the following module must accept the
+            sparse tensor. Defaults to False.
     """
 
-    def __init__(self, in_channels, output_shape):
+    def __init__(self,
+                 in_channels,
+                 output_shape,
+                 reuse_canvas=False,
+                 sparse_output=False):
         super().__init__()
         self.output_shape = output_shape
         self.ny = output_shape[0]
         self.nx = output_shape[1]
         self.in_channels = in_channels
+        self.reuse_canvas = reuse_canvas
+        self.sparse_output = sparse_output
         self.fp16_enabled = False
+        self._canvas = None
 
     @auto_fp16(apply_to=('voxel_features', ))
     def forward(self, voxel_features, coors, batch_size=None):
         """Foraward function to scatter features."""
-        # TODO: rewrite the function in a batch manner
-        # no need to deal with different batch cases
         if batch_size is not None:
             return self.forward_batch(voxel_features, coors, batch_size)
         else:
@@ -43,21 +60,8 @@ class PointPillarsScatter(nn.Module):
             coors (torch.Tensor): Coordinates of each voxel.
                 The first column indicates the sample ID.
         """
-        # Create the canvas for this sample
-        canvas = torch.zeros(
-            self.in_channels,
-            self.nx * self.ny,
-            dtype=voxel_features.dtype,
-            device=voxel_features.device)
-
-        indices = coors[:, 2] * self.nx + coors[:, 3]
-        indices = indices.long()
-        voxels = voxel_features.t()
-        # Now scatter the blob back to the canvas.
-        canvas[:, indices] = voxels
-        # Undo the column stacking to final 4-dim tensor
-        canvas = canvas.view(1, self.in_channels, self.ny, self.nx)
-        return canvas
+        return self.scatter(voxel_features,
+                            coors[:, 0].new_zeros(coors.shape[0]), coors, 1)
 
     def forward_batch(self, voxel_features, coors, batch_size):
         """Scatter features of single sample.
@@ -68,35 +72,43 @@ class PointPillarsScatter(nn.Module):
                 The first column indicates the sample ID.
             batch_size (int): Number of samples in the current batch.
         """
-        # batch_canvas will be the final output.
-        batch_canvas = []
-        for batch_itt in range(batch_size):
-            # Create the canvas for this sample
-            canvas = torch.zeros(
-                self.in_channels,
-                self.nx * self.ny,
-                dtype=voxel_features.dtype,
-                device=voxel_features.device)
-
-            # Only include non-empty pillars
-            batch_mask = coors[:, 0] == batch_itt
-            this_coors = coors[batch_mask, :]
-            indices = this_coors[:, 2] * self.nx + this_coors[:, 3]
-            indices = indices.type(torch.long)
-            voxels = voxel_features[batch_mask, :]
-            voxels = voxels.t()
-
-            # Now scatter the blob back to the canvas.
-            canvas[:, indices] = voxels
-
-            # Append to a list for later stacking.
-            batch_canvas.append(canvas)
-
-        # Stack to 3-dim tensor (batch-size, in_channels, nrows*ncols)
-        batch_canvas = torch.stack(batch_canvas, 0)
+        return self.scatter(voxel_features, coors[:, 0], coors, batch_size)
 
-        # Undo the column stacking to final 4-dim tensor
-        batch_canvas = batch_canvas.view(batch_size, self.in_channels, self.ny,
-                                         self.nx)
+    def scatter(self, voxel_features, batch_inds, coors, batch_size):
+        """Scatter the features of all the samples at once.
+
+        Args:
+            voxel_features (torch.Tensor): Voxel features in shape (N, C).
+            batch_inds (torch.Tensor): Sample ID of each voxel in shape (N, ).
+            coors (torch.Tensor): Coordinates of each voxel in shape (N, 4).
+            batch_size (int): Number of samples in the current batch.
 
-        return batch_canvas
+        Returns:
+            torch.Tensor: Pseudo image in shape (B, C, ny, nx), or the hybrid
+                sparse tensor in shape (B, ny, nx, C) if ``sparse_output``.
+        """
+        batch_inds = batch_inds.long()
+        if self.sparse_output:
+            indices = torch.stack(
+                (batch_inds, coors[:, 2].long(), coors[:, 3].long()))
+            return torch.sparse_coo_tensor(
+                indices, voxel_features,
+                (batch_size, self.ny, self.nx, self.in_channels))
+
+        shape = (batch_size, self.in_channels, self.ny * self.nx)
+        canvas = self._canvas
+        if (canvas is not None and canvas.shape == shape
+                and canvas.dtype == voxel_features.dtype
+                and canvas.device == voxel_features.device):
+            # a new view of the kept canvas, so that it is not attached to
+            # the graph of the previous call
+            canvas = canvas.detach().zero_()
+        else:
+            canvas = voxel_features.new_zeros(shape)
+            self._canvas = canvas.detach() if self.reuse_canvas else None
+
+        indices = coors[:, 2].long() * self.nx + coors[:, 3].long()
+        # Now scatter the blob of all the samples back to the canvas.
+        canvas[batch_inds, :, indices] = voxel_features
+        # Undo the column stacking to final 4-dim tensor
+        return canvas.view(batch_size, self.in_channels, self.ny, self.nx)
@@ -1,5 +1,4 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-import numpy as np
 import torch
 from torch import nn as nn
 from torch.nn import functional as F
@@ -192,7 +191,8 @@ class EncoderDecoder3D(Base3DSegmentor):
 
         Args:
             coords (torch.Tensor): Sampled 3D point coordinate of shape [S, 3].
-            patch_center (torch.Tensor): Center coordinate of the patch.
+            patch_center (torch.Tensor): Center coordinate of the patch, or
+                of the patch of each point of shape [S, 3].
             coord_max (torch.Tensor): Max coordinate of all 3D points.
             feats (torch.Tensor): Features of sampled points of shape [S, C].
             use_normalized_coord (bool, optional): Whether to use normalized
@@ -203,8 +203,7 @@ class EncoderDecoder3D(Base3DSegmentor):
         """
         # subtract patch center, the z dimension is not centered
         centered_coords = coords.clone()
-        centered_coords[:, 0] -= patch_center[0]
-        centered_coords[:, 1] -= patch_center[1]
+        centered_coords[:, :2] -= patch_center[..., :2]
 
         # normalized coordinates as extra features
         if use_normalized_coord:
@@ -226,6 +225,8 @@ class EncoderDecoder3D(Base3DSegmentor):
 
         First sample patches to cover all the input points.
         Then sample points in each patch to batch points of a certain number.
+        The points of all the patches are found and sampled at once, by
+        grouping the (patch, point) pairs by patch.
 
         Args:
             points (torch.Tensor): Input points of shape [N, 3+C].
@@ -250,7 +251,6 @@ class EncoderDecoder3D(Base3DSegmentor):
         # we assume the first three dims are points' 3D coordinates
         # and the rest dims are their per-point features
         coords = points[:, :3]
-        feats = points[:, 3:]
 
         coord_max = coords.max(0)[0]
         coord_min = coords.min(0)[0]
@@ -261,64 +261,142 @@ class EncoderDecoder3D(Base3DSegmentor):
         num_grid_y = int(
             torch.ceil((coord_max[1] - coord_min[1] - block_size) /
                        stride).item() + 1)
-
-        patch_points, patch_idxs = [], []
-        for idx_y in range(num_grid_y):
-            s_y = coord_min[1] + idx_y * stride
-            e_y = torch.min(s_y + block_size, coord_max[1])
-            s_y = e_y - block_size
-            for idx_x in range(num_grid_x):
-                s_x = coord_min[0] + idx_x * stride
-                e_x = torch.min(s_x + block_size, coord_max[0])
-                s_x = e_x - block_size
-
-                # extract points within this patch
-                cur_min = torch.tensor([s_x, s_y, coord_min[2]]).to(device)
-                cur_max = torch.tensor([e_x, e_y, coord_max[2]]).to(device)
-                cur_choice = ((coords >= cur_min - eps) &
-                              (coords <= cur_max + eps)).all(dim=1)
-
-                if not cur_choice.any():  # no points in this patch
-                    continue
-
-                # sample points in this patch to multiple batches
-                cur_center = cur_min + block_size / 2.0
-                point_idxs = torch.nonzero(cur_choice, as_tuple=True)[0]
-                num_batch = int(np.ceil(point_idxs.shape[0] / num_points))
-                point_size = int(num_batch * num_points)
-                replace = point_size > 2 * point_idxs.shape[0]
-                num_repeat = point_size - point_idxs.shape[0]
-                if replace:  # duplicate
-                    point_idxs_repeat = point_idxs[torch.randint(
-                        0, point_idxs.shape[0],
-                        size=(num_repeat, )).to(device)]
-                else:
-                    point_idxs_repeat = point_idxs[torch.randperm(
-                        point_idxs.shape[0])[:num_repeat]]
-
-                choices = torch.cat([point_idxs, point_idxs_repeat], dim=0)
-                choices = choices[torch.randperm(choices.shape[0])]
-
-                # construct model input
-                point_batches = self._input_generation(
-                    coords[choices],
-                    cur_center,
-                    coord_max,
-                    feats[choices],
-                    use_normalized_coord=use_normalized_coord)
-
-                patch_points.append(point_batches)
-                patch_idxs.append(choices)
-
-        patch_points = torch.cat(patch_points, dim=0)
-        patch_idxs = torch.cat(patch_idxs, dim=0)
+        # a scene smaller than a patch is covered by a single patch
+        num_grid_x = max(num_grid_x, 1)
+        num_grid_y = max(num_grid_y, 1)
+        starts_x, ends_x = self._patch_ranges(coord_min[0], coord_max[0],
+                                              num_grid_x, block_size, stride)
+        starts_y, ends_y = self._patch_ranges(coord_min[1], coord_max[1],
+                                              num_grid_y, block_size, stride)
+
+        # the patches are sorted along x and y, so the patches containing a
+        # point along an axis are a range, counted over the few patch edges
+        lo_x = (coords[:, 0:1] > ends_x + eps).sum(1)
+        hi_x = (coords[:, 0:1] >= starts_x - eps).sum(1)
+        lo_y = (coords[:, 1:2] > ends_y + eps).sum(1)
+        hi_y = (coords[:, 1:2] >= starts_y - eps).sum(1)
+        num_x = (hi_x - lo_x).clamp(min=0)
+        num_y = (hi_y - lo_y).clamp(min=0)
+        num_pairs = num_x * num_y
+
+        # a row of patches along x per point and patch along y
+        num_total = points.shape[0]
+        point_idxs = torch.arange(num_total, device=device)
+        row_point_idxs = point_idxs.repeat_interleave(num_y)
+        row_starts = (num_y.cumsum(0) - num_y)[row_point_idxs]
+        row_y = lo_y[row_point_idxs] + torch.arange(
+            row_point_idxs.shape[0], device=device) - row_starts
+        row_num_x = num_x[row_point_idxs]
+
+        # (patch, point) pairs grouped by patch, in the order of the points
+        # within a patch
+        pair_point_idxs = row_point_idxs.repeat_interleave(row_num_x)
+        pair_starts = (row_num_x.cumsum(0) -
+                       row_num_x).repeat_interleave(row_num_x)
+        pair_x = lo_x[pair_point_idxs] + torch.arange(
+            pair_point_idxs.shape[0], device=device) - pair_starts
+        pair_y = row_y.repeat_interleave(row_num_x)
+        pair_patches = pair_y * num_grid_x + pair_x
+        order = torch.argsort(pair_patches * num_total + pair_point_idxs)
+        pair_patches = pair_patches[order]
+        pair_point_idxs = pair_point_idxs[order]
+
+        # sample points in each patch to multiple batches, patches without
+        # points are skipped
+        num_patches = num_grid_x * num_grid_y
+        patch_sizes = torch.bincount(pair_patches, minlength=num_patches)
+        patch_starts = patch_sizes.cumsum(0) - patch_sizes
+        # the sizes rounded up to a multiple of num_points
+        point_sizes = patch_sizes + (-patch_sizes) % num_points
+        num_repeats = point_sizes - patch_sizes
+        replace = point_sizes > 2 * patch_sizes
+
+        # duplicate random points of the patches with few points
+        patch_inds = torch.arange(num_patches, device=device)
+        repeat_patches = patch_inds.repeat_interleave(num_repeats * replace)
+        repeat_sizes = patch_sizes[repeat_patches]
+        repeat_offsets = torch.rand(repeat_patches.shape[0], device=device)
+        repeat_offsets = torch.min((repeat_offsets * repeat_sizes).long(),
+                                   repeat_sizes - 1)
+        repeat_point_idxs = pair_point_idxs[patch_starts[repeat_patches] +
+                                            repeat_offsets]
+
+        # and distinct random points of the other patches
+        shuffle = self._shuffle_segments(pair_patches)
+        ranks = torch.arange(
+            pair_patches.shape[0], device=device) - patch_starts[pair_patches]
+        distinct = (ranks < num_repeats[pair_patches]) & \
+            ~replace[pair_patches]
+
+        choices = torch.cat([
+            pair_point_idxs, repeat_point_idxs,
+            pair_point_idxs[shuffle][distinct]
+        ])
+        choice_patches = torch.cat(
+            [pair_patches, repeat_patches, pair_patches[distinct]])
+        shuffle = self._shuffle_segments(choice_patches)
+        choices = choices[shuffle]
+        choice_patches = choice_patches[shuffle]
+
+        # construct model input
+        patch_centers = torch.stack([
+            starts_x.repeat(num_grid_y),
+            starts_y.repeat_interleave(num_grid_x),
+            coord_min[2].expand(num_patches)
+        ], 1) + block_size / 2.0
+        choice_points = points[choices]
+        patch_points = self._input_generation(
+            choice_points[:, :3],
+            patch_centers[choice_patches],
+            coord_max,
+            choice_points[:, 3:],
+            use_normalized_coord=use_normalized_coord)
+        patch_idxs = choices
 
         # make sure all points are sampled at least once
-        assert torch.unique(patch_idxs).shape[0] == points.shape[0], \
+        assert (num_pairs > 0).all(), \
             'some points are not sampled in sliding inference'
 
         return patch_points, patch_idxs
 
+    @staticmethod
+    def _patch_ranges(coord_min, coord_max, num_grid, block_size, stride):
+        """Ranges of the sliding patches along an axis.
+
+        Args:
+            coord_min (torch.Tensor): Min coordinate of all 3D points.
+            coord_max (torch.Tensor): Max coordinate of all 3D points.
+            num_grid (int): Number of patches.
+            block_size (float): Size of a patch.
+            stride (float): Stride between the patches.
+
+        Returns:
+            tuple[torch.Tensor]: Start and end of the patches, a patch
+                exceeding the max coordinate is moved back inside.
+        """
+        offsets = torch.arange(
+            num_grid, dtype=torch.float64, device=coord_min.device) * stride
+        ends = torch.min(coord_min + offsets.to(coord_min.dtype) + block_size,
+                         coord_max)
+        return ends - block_size, ends
+
+    @staticmethod
+    def _shuffle_segments(segment_ids):
+        """Shuffle the elements within each segment.
+
+        Args:
+            segment_ids (torch.Tensor): Segment of each element.
+
+        Returns:
+            torch.Tensor: Indices of the elements grouped by ascending
+                segment and in random order within each segment.
+        """
+        num_elems = segment_ids.shape[0]
+        perm = torch.randperm(num_elems, device=segment_ids.device)
+        keys = segment_ids[perm] * num_elems + torch.arange(
+            num_elems, device=segment_ids.device)
+        return perm[torch.argsort(keys)]
+
     def slide_inference(self, point, img_meta, rescale):
         """Inference by sliding-window with overlap.
 
@@ -3,25 +3,22 @@ from mmcv.ops import (RoIAlign, SigmoidFocalLoss, get_compiler_version,
                       get_compiling_cuda_version, nms, roi_align,
                       sigmoid_focal_loss)
 from mmcv.ops.assign_score_withk import assign_score_withk
-from mmcv.ops.ball_query import ball_query
-from mmcv.ops.furthest_point_sample import (furthest_point_sample,
-                                            furthest_point_sample_with_dist)
-from mmcv.ops.gather_points import gather_points
-from mmcv.ops.group_points import GroupAll, QueryAndGroup, grouping_operation
-from mmcv.ops.knn import knn
+from mmcv.ops.group_points import GroupAll, QueryAndGroup
 from mmcv.ops.points_in_boxes import (points_in_boxes_all, points_in_boxes_cpu,
                                       points_in_boxes_part)
 from mmcv.ops.points_sampler import PointsSampler as Points_Sampler
 from mmcv.ops.roiaware_pool3d import RoIAwarePool3d
 from mmcv.ops.roipoint_pool3d import RoIPointPool3d
 from mmcv.ops.scatter_points import DynamicScatter, dynamic_scatter
-from mmcv.ops.three_interpolate import three_interpolate
-from mmcv.ops.three_nn import three_nn
 from mmcv.ops.voxelize import Voxelization, voxelization
 
+from .batch_voxelize import batch_voxelization, batch_voxelize
 from .dgcnn_modules import DGCNNFAModule, DGCNNFPModule, DGCNNGFModule
 from .norm import NaiveSyncBatchNorm1d, NaiveSyncBatchNorm2d
 from .paconv import PAConv, PAConvCUDA
+from .point_ops import (ball_query, furthest_point_sample,
+                        furthest_point_sample_with_dist, gather_points,
+                        grouping_operation, knn, three_interpolate, three_nn)
 from .pointnet_modules import (PAConvCUDASAModule, PAConvCUDASAModuleMSG,
                                PAConvSAModule, PAConvSAModuleMSG,
                                PointFPModule, PointSAModule, PointSAModuleMSG,
@@ -44,5 +41,6 @@ __all__ = [
     'get_compiler_version', 'assign_score_withk', 'get_compiling_cuda_version',
     'Points_Sampler', 'build_sa_module', 'PAConv', 'PAConvCUDA',
     'PAConvSAModuleMSG', 'PAConvSAModule', 'PAConvCUDASAModule',
-    'PAConvCUDASAModuleMSG', 'RoIPointPool3d'
+    'PAConvCUDASAModuleMSG', 'RoIPointPool3d', 'batch_voxelization',
+    'batch_voxelize'
 ]
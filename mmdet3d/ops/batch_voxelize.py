@@ -0,0 +1,119 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+
+
+def batch_voxelization(points,
+                       batch_offsets,
+                       voxel_size,
+                       point_cloud_range,
+                       max_num_points=35,
+                       max_voxels=20000):
+    """Hard voxelization of the points of a whole batch at once.
+
+    The result is the same as voxelizing each sample with
+    :class:`mmcv.ops.Voxelization` and concatenating the results with the
+    sample index prepended to the coordinates, but all the samples are
+    processed together with a few tensor operations. The voxels of a sample
+    are ordered by their first point, the points of a voxel are kept in
+    their order, and the points beyond ``max_num_points`` in a voxel or in
+    new voxels beyond ``max_voxels`` in a sample are dropped.
+
+    Args:
+        points (torch.Tensor): Concatenated points of all the samples in
+            shape (N, C), the first 3 dimensions are (x, y, z).
+        batch_offsets (list[int] | torch.Tensor): Offset of the first point
+            of each sample in ``points``, followed by N, in shape (B + 1, ).
+        voxel_size (list[float]): Size of a voxel (x, y, z).
+        point_cloud_range (list[float]): Range of the points
+            (x_min, y_min, z_min, x_max, y_max, z_max).
+        max_num_points (int, optional): Max number of points per voxel.
+            Defaults to 35.
+        max_voxels (int, optional): Max number of voxels per sample.
+            Defaults to 20000.
+
+    Returns:
+        tuple[torch.Tensor]: Voxels in shape (M, max_num_points, C),
+            coordinates (batch_idx, z, y, x) of each voxel in shape (M, 4)
+            and number of points of each voxel in shape (M, ).
+    """
+    device = points.device
+    batch_offsets = torch.as_tensor(batch_offsets, device=device).long()
+    batch_size = batch_offsets.shape[0] - 1
+    voxel_size = torch.tensor(voxel_size, dtype=torch.float32, device=device)
+    pc_range = torch.tensor(
+        point_cloud_range, dtype=torch.float32, device=device)
+    grid_size = torch.round((pc_range[3:] - pc_range[:3]) / voxel_size).long()
+
+    # coordinates of the points inside the range
+    sample_sizes = batch_offsets[1:] - batch_offsets[:-1]
+    batch_inds = torch.arange(
+        batch_size, device=device).repeat_interleave(sample_sizes)
+    coors = torch.floor((points[:, :3] - pc_range[:3]) / voxel_size).long()
+    point_inds = ((coors >= 0) & (coors < grid_size)).all(1).nonzero().view(-1)
+    coors = coors[point_inds]
+    batch_inds = batch_inds[point_inds]
+    keys = ((batch_inds * grid_size[2] + coors[:, 2]) * grid_size[1] +
+            coors[:, 1]) * grid_size[0] + coors[:, 0]
+
+    # group the points by voxel, in their order within each voxel
+    num_valid = point_inds.shape[0]
+    order = torch.argsort(keys * num_valid +
+                          torch.arange(num_valid, device=device))
+    keys = keys[order]
+    point_inds = point_inds[order]
+    is_first = torch.ones_like(keys, dtype=torch.bool)
+    is_first[1:] = keys[1:] != keys[:-1]
+    first_inds = is_first.nonzero().view(-1)
+    voxel_inds = is_first.cumsum(0) - 1
+    positions = torch.arange(num_valid, device=device) - first_inds[voxel_inds]
+
+    # order the voxels by their first point and keep the first max_voxels
+    # voxels of each sample
+    voxel_order = torch.argsort(point_inds[first_inds])
+    voxel_batch_inds = batch_inds[order[first_inds[voxel_order]]]
+    voxels_per_sample = torch.bincount(voxel_batch_inds, minlength=batch_size)
+    sample_starts = voxels_per_sample.cumsum(0) - voxels_per_sample
+    voxel_ranks = torch.arange(voxel_order.shape[0], device=device)
+    kept = voxel_ranks - sample_starts[voxel_batch_inds] < max_voxels
+    voxel_order = voxel_order[kept]
+    num_voxels = voxel_order.shape[0]
+    out_inds = voxel_order.new_full((first_inds.shape[0], ), -1)
+    out_inds[voxel_order] = torch.arange(num_voxels, device=device)
+
+    point_out_inds = out_inds[voxel_inds]
+    point_mask = (point_out_inds >= 0) & (positions < max_num_points)
+    voxels = points.new_zeros((num_voxels, max_num_points, points.shape[1]))
+    voxels[point_out_inds[point_mask],
+           positions[point_mask]] = points[point_inds[point_mask]]
+    num_points = torch.bincount(
+        point_out_inds[point_mask], minlength=num_voxels).int()
+
+    # (batch_idx, z, y, x) of the first point of each voxel
+    first_point_inds = order[first_inds[voxel_order]]
+    voxel_coors = torch.cat(
+        (batch_inds[first_point_inds, None], coors[first_point_inds].flip(1)),
+        1).int()
+    return voxels, voxel_coors, num_points
+
+
+def batch_voxelize(points, voxel_layer):
+    """Hard voxelization of a batch with the settings of a voxel layer.
+
+    Args:
+        points (list[torch.Tensor]): Points of each sample.
+        voxel_layer (:obj:`mmcv.ops.Voxelization`): Voxel layer whose voxel
+            size, point cloud range, max number of points per voxel and max
+            number of voxels in its current mode are used.
+
+    Returns:
+        tuple[torch.Tensor]: Voxels in shape (M, max_num_points, C),
+            coordinates (batch_idx, z, y, x) of each voxel in shape (M, 4)
+            and number of points of each voxel in shape (M, ).
+    """
+    batch_offsets = [0]
+    for res in points:
+        batch_offsets.append(batch_offsets[-1] + res.shape[0])
+    max_voxels = voxel_layer.max_voxels[0 if voxel_layer.training else 1]
+    return batch_voxelization(
+        torch.cat(points), batch_offsets, voxel_layer.voxel_size,
+        voxel_layer.point_cloud_range, voxel_layer.max_num_points, max_voxels)
@@ -1,10 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import torch
 from mmcv.cnn import ConvModule
-from mmcv.ops.group_points import GroupAll, QueryAndGroup, grouping_operation
+from mmcv.ops.group_points import GroupAll, QueryAndGroup
 from torch import nn as nn
 from torch.nn import functional as F
 
+from ..point_ops import grouping_operation
+
 
 class BaseDGCNNGFModule(nn.Module):
     """Base module for point graph feature module used in DGCNN.
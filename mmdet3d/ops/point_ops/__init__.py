@@ -0,0 +1,13 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from .point_ops import (ball_query, furthest_point_sample,
+                        furthest_point_sample_with_dist, gather_points,
+                        grouping_operation, knn, register_point_ops,
+                        three_interpolate, three_nn)
+
+register_point_ops()
+
+__all__ = [
+    'ball_query', 'furthest_point_sample', 'furthest_point_sample_with_dist',
+    'gather_points', 'grouping_operation', 'knn', 'three_interpolate',
+    'three_nn'
+]
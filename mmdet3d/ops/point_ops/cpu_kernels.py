@@ -0,0 +1,191 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+#####################
+# CPU counterparts of the CUDA kernels of the point operators of mmcv.
+# They follow the selection rules of the CUDA kernels (thresholds, order of
+# the neighbours and values of the missing ones), the work is split over the
+# numba threads.
+#####################
+import math
+
+import numba
+import numpy as np
+
+
+@numba.njit(parallel=True, error_model='numpy')
+def furthest_point_sample_kernel(points, num_points):
+    """Furthest point sampling of points in shape (B, N, 3).
+
+    Points whose squared norm is at most 1e-3 (e.g. zero padding) are never
+    sampled, except for the first point which is always sampled.
+    """
+    batch_size, num_total = points.shape[0], points.shape[1]
+    idx = np.zeros((batch_size, num_points), dtype=np.int32)
+    for b in numba.prange(batch_size):
+        temp = np.full(num_total, 1e10, dtype=np.float32)
+        old = 0
+        for j in range(1, num_points):
+            x1 = points[b, old, 0]
+            y1 = points[b, old, 1]
+            z1 = points[b, old, 2]
+            best = np.float32(-1.0)
+            besti = 0
+            for k in range(num_total):
+                x2 = points[b, k, 0]
+                y2 = points[b, k, 1]
+                z2 = points[b, k, 2]
+                if x2 * x2 + y2 * y2 + z2 * z2 <= 1e-3:
+                    continue
+                d = (x2 - x1) * (x2 - x1) + (y2 - y1) * (y2 - y1) + \
+                    (z2 - z1) * (z2 - z1)
+                d2 = min(d, temp[k])
+                temp[k] = d2
+                if d2 > best:
+                    best = d2
+                    besti = k
+            old = besti
+            idx[b, j] = old
+    return idx
+
+
+@numba.njit(parallel=True, error_model='numpy')
+def furthest_point_sample_with_dist_kernel(points_dist, num_points):
+    """Furthest point sampling with a distance matrix in shape (B, N, N)."""
+    batch_size, num_total = points_dist.shape[0], points_dist.shape[1]
+    idx = np.zeros((batch_size, num_points), dtype=np.int32)
+    for b in numba.prange(batch_size):
+        temp = np.full(num_total, 1e10, dtype=np.float32)
+        old = 0
+        for j in range(1, num_points):
+            best = np.float32(-1.0)
+            besti = 0
+            for k in range(num_total):
+                d2 = min(points_dist[b, old, k], temp[k])
+                temp[k] = d2
+                if d2 > best:
+                    best = d2
+                    besti = k
+            old = besti
+            idx[b, j] = old
+    return idx
+
+
+@numba.njit(error_model='numpy')
+def _build_grid(xyz, cell_size):
+    """Sort points in shape (N, 3) by the cell of a regular grid.
+
+    The points of a cell keep their order, so that the neighbours of a cell
+    are visited by increasing index.
+    """
+    num_total = xyz.shape[0]
+    mins = np.empty(3, dtype=np.float64)
+    dims = np.ones(3, dtype=np.int64)
+    for i in range(3):
+        mins[i] = np.inf
+    for k in range(num_total):
+        for i in range(3):
+            mins[i] = min(mins[i], xyz[k, i])
+    cells = np.empty((num_total, 3), dtype=np.int64)
+    for k in range(num_total):
+        for i in range(3):
+            cells[k, i] = int(math.floor((xyz[k, i] - mins[i]) / cell_size))
+            dims[i] = max(dims[i], cells[k, i] + 1)
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    order = np.argsort(keys, kind='mergesort')
+    return mins, dims, keys[order], order
+
+
+@numba.njit(parallel=True, error_model='numpy')
+def ball_query_kernel(min_radius, max_radius, sample_num, xyz, center_xyz):
+    """Ball query of centers in shape (B, M, 3) among points in shape
+    (B, N, 3).
+
+    The first ``sample_num`` points (by index) within the radius range, or at
+    a distance of 0, are selected for each center, and the remaining slots
+    are filled with the first one. The indices of centers without neighbours
+    are 0.
+    """
+    batch_size, num_centers = center_xyz.shape[0], center_xyz.shape[1]
+    min_radius2 = min_radius * min_radius
+    max_radius2 = max_radius * max_radius
+    # a neighbour is at most one cell away along each axis
+    cell_size = max_radius if max_radius > 0 else 1.0
+    idx = np.zeros((batch_size, num_centers, sample_num), dtype=np.int32)
+    for b in range(batch_size):
+        if xyz.shape[1] == 0:
+            continue
+        mins, dims, sorted_keys, order = _build_grid(xyz[b], cell_size)
+        for m in numba.prange(num_centers):
+            x = center_xyz[b, m, 0]
+            y = center_xyz[b, m, 1]
+            z = center_xyz[b, m, 2]
+            cx = int(math.floor((x - mins[0]) / cell_size))
+            cy = int(math.floor((y - mins[1]) / cell_size))
+            cz = int(math.floor((z - mins[2]) / cell_size))
+            # smallest indices of the neighbours, in increasing order
+            selected = np.empty(sample_num, dtype=np.int32)
+            cnt = 0
+            for ix in range(max(cx - 1, 0), min(cx + 2, dims[0])):
+                for iy in range(max(cy - 1, 0), min(cy + 2, dims[1])):
+                    for iz in range(max(cz - 1, 0), min(cz + 2, dims[2])):
+                        key = (ix * dims[1] + iy) * dims[2] + iz
+                        start = np.searchsorted(sorted_keys, key)
+                        end = np.searchsorted(sorted_keys, key + 1)
+                        for i in range(start, end):
+                            k = order[i]
+                            if cnt == sample_num and k >= selected[cnt - 1]:
+                                # the points of a cell are sorted by index
+                                break
+                            dx = xyz[b, k, 0] - x
+                            dy = xyz[b, k, 1] - y
+                            dz = xyz[b, k, 2] - z
+                            d2 = dx * dx + dy * dy + dz * dz
+                            if d2 != 0 and (d2 < min_radius2
+                                            or d2 >= max_radius2):
+                                continue
+                            j = min(cnt, sample_num - 1)
+                            while j > 0 and selected[j - 1] > k:
+                                selected[j] = selected[j - 1]
+                                j -= 1
+                            selected[j] = k
+                            cnt = min(cnt + 1, sample_num)
+            if cnt > 0:
+                for j in range(sample_num):
+                    idx[b, m, j] = selected[j] if j < cnt else selected[0]
+    return idx
+
+
+@numba.njit(parallel=True, error_model='numpy')
+def nearest_neighbors_kernel(k, xyz, center_xyz, init_dist):
+    """Indices and squared distances of the ``k`` nearest points in shape
+    (B, N, 3) of centers in shape (B, M, 3), sorted by increasing distance.
+
+    Ties are broken by index. Missing neighbours have an index of 0 and a
+    distance of ``init_dist``.
+    """
+    batch_size, num_centers = center_xyz.shape[0], center_xyz.shape[1]
+    num_total = xyz.shape[1]
+    idx = np.zeros((batch_size, num_centers, k), dtype=np.int32)
+    dist2 = np.full((batch_size, num_centers, k), init_dist, dtype=np.float64)
+    for i in numba.prange(batch_size * num_centers):
+        b = i // num_centers
+        m = i % num_centers
+        x = center_xyz[b, m, 0]
+        y = center_xyz[b, m, 1]
+        z = center_xyz[b, m, 2]
+        best_idx = idx[b, m]
+        best_dist2 = dist2[b, m]
+        for n in range(num_total):
+            dx = xyz[b, n, 0] - x
+            dy = xyz[b, n, 1] - y
+            dz = xyz[b, n, 2] - z
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 >= best_dist2[k - 1]:
+                continue
+            j = k - 1
+            while j > 0 and best_dist2[j - 1] > d2:
+                best_dist2[j] = best_dist2[j - 1]
+                best_idx[j] = best_idx[j - 1]
+                j -= 1
+            best_dist2[j] = d2
+            best_idx[j] = n
+    return idx, dist2
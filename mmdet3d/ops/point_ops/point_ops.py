@@ -0,0 +1,206 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+from mmcv.ops.ball_query import ball_query as ball_query_cuda
+from mmcv.ops.furthest_point_sample import \
+    furthest_point_sample as furthest_point_sample_cuda
+from mmcv.ops.furthest_point_sample import \
+    furthest_point_sample_with_dist as furthest_point_sample_with_dist_cuda
+from mmcv.ops.gather_points import gather_points as gather_points_cuda
+from mmcv.ops.group_points import grouping_operation as grouping_operation_cuda
+from mmcv.ops.knn import knn as knn_cuda
+from mmcv.ops.three_interpolate import \
+    three_interpolate as three_interpolate_cuda
+from mmcv.ops.three_nn import three_nn as three_nn_cuda
+
+from . import cpu_kernels
+
+
+def _to_numpy(tensor):
+    return tensor.detach().float().contiguous().numpy()
+
+
+def furthest_point_sample(points_xyz, num_points):
+    """Furthest point sampling, run by the CPU kernels for CPU tensors and
+    by mmcv otherwise.
+
+    Args:
+        points_xyz (torch.Tensor): (B, N, 3) where N > num_points.
+        num_points (int): Number of points in the sampled set.
+
+    Returns:
+        torch.Tensor: (B, num_points) indices of the sampled points.
+    """
+    if points_xyz.is_cuda:
+        return furthest_point_sample_cuda(points_xyz, num_points)
+    idx = cpu_kernels.furthest_point_sample_kernel(
+        _to_numpy(points_xyz), num_points)
+    return torch.from_numpy(idx)
+
+
+def furthest_point_sample_with_dist(points_dist, num_points):
+    """Furthest point sampling with a distance matrix, run by the CPU
+    kernels for CPU tensors and by mmcv otherwise.
+
+    Args:
+        points_dist (torch.Tensor): (B, N, N) Distance between each point
+            pair.
+        num_points (int): Number of points in the sampled set.
+
+    Returns:
+        torch.Tensor: (B, num_points) indices of the sampled points.
+    """
+    if points_dist.is_cuda:
+        return furthest_point_sample_with_dist_cuda(points_dist, num_points)
+    idx = cpu_kernels.furthest_point_sample_with_dist_kernel(
+        _to_numpy(points_dist), num_points)
+    return torch.from_numpy(idx)
+
+
+def ball_query(min_radius, max_radius, sample_num, xyz, center_xyz):
+    """Ball query, run by the CPU kernels for CPU tensors and by mmcv
+    otherwise.
+
+    The neighbours are searched in a regular grid of cell size
+    ``max_radius`` on CPU.
+
+    Args:
+        min_radius (float): Minimum radius of the balls.
+        max_radius (float): Maximum radius of the balls.
+        sample_num (int): Maximum number of features in the balls.
+        xyz (torch.Tensor): (B, N, 3) xyz coordinates of the features.
+        center_xyz (torch.Tensor): (B, npoint, 3) centers of the ball query.
+
+    Returns:
+        torch.Tensor: (B, npoint, nsample) tensor with the indices of
+            the features that form the query balls.
+    """
+    if xyz.is_cuda:
+        return ball_query_cuda(min_radius, max_radius, sample_num, xyz,
+                               center_xyz)
+    idx = cpu_kernels.ball_query_kernel(
+        float(min_radius), float(max_radius), sample_num, _to_numpy(xyz),
+        _to_numpy(center_xyz))
+    return torch.from_numpy(idx)
+
+
+def knn(k, xyz, center_xyz=None, transposed=False):
+    """K nearest neighbours, run by the CPU kernels for CPU tensors and by
+    mmcv otherwise.
+
+    Args:
+        k (int): Number of nearest neighbors.
+        xyz (torch.Tensor): (B, N, 3) if transposed == False, else
+            (B, 3, N). xyz coordinates of the features.
+        center_xyz (torch.Tensor, optional): (B, npoint, 3) if transposed ==
+            False, else (B, 3, npoint). centers of the knn query.
+            Defaults to None.
+        transposed (bool, optional): whether the input tensors are
+            transposed. Defaults to False.
+
+    Returns:
+        torch.Tensor: (B, k, npoint) tensor with the indices of
+            the features that form k-nearest neighbours.
+    """
+    if xyz.is_cuda:
+        return knn_cuda(k, xyz, center_xyz, transposed)
+    if center_xyz is None:
+        center_xyz = xyz
+    if transposed:
+        xyz = xyz.transpose(2, 1)
+        center_xyz = center_xyz.transpose(2, 1)
+    idx, _ = cpu_kernels.nearest_neighbors_kernel(k, _to_numpy(xyz),
+                                                  _to_numpy(center_xyz), 1e10)
+    return torch.from_numpy(idx).transpose(2, 1).contiguous()
+
+
+def three_nn(target, source):
+    """Three nearest neighbours, run by the CPU kernels for CPU tensors and
+    by mmcv otherwise.
+
+    Args:
+        target (torch.Tensor): shape (B, N, 3), points to find knn.
+        source (torch.Tensor): shape (B, M, 3), points to find the
+            neighbours in.
+
+    Returns:
+        tuple[torch.Tensor]: shape (B, N, 3), L2 distance and indices of
+            the three nearest neighbours of each target point.
+    """
+    if target.is_cuda:
+        return three_nn_cuda(target, source)
+    idx, dist2 = cpu_kernels.nearest_neighbors_kernel(3, _to_numpy(source),
+                                                      _to_numpy(target), 1e40)
+    dist = torch.from_numpy(dist2).float().sqrt()
+    return dist, torch.from_numpy(idx)
+
+
+def gather_points(features, indices):
+    """Gather points with given indices, by mmcv for CUDA tensors and with
+    differentiable torch indexing otherwise.
+
+    Args:
+        features (torch.Tensor): (B, C, N) features to gather.
+        indices (torch.Tensor): (B, M) where M is the number of points.
+
+    Returns:
+        torch.Tensor: (B, C, M) where M is the number of points.
+    """
+    if features.is_cuda:
+        return gather_points_cuda(features, indices)
+    indices = indices.long().unsqueeze(1).expand(-1, features.shape[1], -1)
+    return features.gather(2, indices)
+
+
+def grouping_operation(features, indices):
+    """Group features with given indices, by mmcv for CUDA tensors and with
+    differentiable torch indexing otherwise.
+
+    Args:
+        features (torch.Tensor): (B, C, N) tensor of features to group.
+        indices (torch.Tensor): (B, npoint, nsample) the indices of
+            features to group with.
+
+    Returns:
+        torch.Tensor: (B, C, npoint, nsample) Grouped features.
+    """
+    if features.is_cuda:
+        return grouping_operation_cuda(features, indices)
+    batch_size, num_channels = features.shape[:2]
+    flat_indices = indices.long().reshape(batch_size, 1, -1)
+    flat_indices = flat_indices.expand(-1, num_channels, -1)
+    return features.gather(2, flat_indices).view(batch_size, num_channels,
+                                                 *indices.shape[1:])
+
+
+def three_interpolate(features, indices, weight):
+    """Weighted interpolation of three neighbours, by mmcv for CUDA tensors
+    and with differentiable torch indexing otherwise.
+
+    Args:
+        features (torch.Tensor): (B, C, M) Features descriptors to be
+            interpolated.
+        indices (torch.Tensor): (B, n, 3) indices of three nearest
+            neighbor features for the target features.
+        weight (torch.Tensor): (B, n, 3) weights of three nearest
+            neighbor features for the target features.
+
+    Returns:
+        torch.Tensor: (B, C, N) tensor of the interpolated features
+    """
+    if features.is_cuda:
+        return three_interpolate_cuda(features, indices, weight)
+    grouped_features = grouping_operation(features, indices)
+    return (grouped_features * weight.unsqueeze(1)).sum(dim=3)
+
+
+def register_point_ops():
+    """This func makes the modules of mmcv that use the point operators,
+    e.g. :class:`QueryAndGroup` and :class:`PointsSampler`, use the above
+    functions, so that they also run on CPU tensors."""
+    from mmcv.ops import group_points, points_sampler
+    group_points.ball_query = ball_query
+    group_points.knn = knn
+    group_points.grouping_operation = grouping_operation
+    points_sampler.furthest_point_sample = furthest_point_sample
+    points_sampler.furthest_point_sample_with_dist = \
+        furthest_point_sample_with_dist
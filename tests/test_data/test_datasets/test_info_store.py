@@ -0,0 +1,116 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import pickle
+import tempfile
+from os import path as osp
+
+import mmcv
+import numpy as np
+
+from mmdet3d.datasets import (InfoStore, KittiDataset, NuScenesDataset,
+                              dump_info_store, load_infos)
+
+
+def _assert_equal(expected, actual):
+    assert type(expected) is type(actual)
+    if isinstance(expected, dict):
+        assert expected.keys() == actual.keys()
+        for key in expected:
+            _assert_equal(expected[key], actual[key])
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual)
+        for expected_item, actual_item in zip(expected, actual):
+            _assert_equal(expected_item, actual_item)
+    elif isinstance(expected, np.ndarray):
+        assert expected.dtype == actual.dtype
+        assert np.array_equal(expected, actual)
+    else:
+        assert expected == actual
+
+
+def test_info_store():
+    tmp_dir = tempfile.TemporaryDirectory()
+    store_file = osp.join(tmp_dir.name, 'infos.mmap')
+    infos = [
+        dict(
+            idx=i,
+            timestamp=10 - i,
+            score=np.float32(0.5 * i),
+            names=np.array(['Car', 'Pedestrian'][:i]),
+            boxes=np.random.rand(i, 7),
+            flags=[True] * i,
+            sweeps=[
+                dict(path=f'{i}_{j}.bin', pose=np.eye(4)) for j in range(i)
+            ],
+            mixed=[i, 'a'],
+            misc=None) for i in range(3)
+    ]
+    infos[1]['optional'] = dict(value=1.0)
+    dump_info_store(infos, store_file)
+
+    store = load_infos(store_file)
+    assert isinstance(store, InfoStore)
+    assert len(store) == 3
+    for expected, actual in zip(infos, store):
+        expected = {key: expected[key] for key in actual}
+        _assert_equal(expected, actual)
+    assert 'optional' not in store[0] and 'optional' in store[1]
+
+    # decoded infos are copies
+    store[2]['boxes'][:] = 0
+    assert np.array_equal(store[2]['boxes'], infos[2]['boxes'])
+
+    # views and pickling
+    assert np.array_equal(store.get_field('timestamp'), [10, 9, 8])
+    subset = store.subset([2, 0])
+    assert [info['idx'] for info in subset] == [2, 0]
+    assert [info['idx'] for info in subset[::-1]] == [0, 2]
+    subset = pickle.loads(pickle.dumps(subset))
+    assert [info['idx'] for info in subset] == [2, 0]
+
+    # infos with metadata
+    dump_info_store(dict(infos=infos, metadata=dict(version='v')), store_file)
+    with open(store_file, 'rb') as f:
+        data = load_infos(f)
+    assert data['metadata'] == dict(version='v')
+    assert len(data['infos']) == 3
+    tmp_dir.cleanup()
+
+
+def test_datasets_with_info_store():
+    tmp_dir = tempfile.TemporaryDirectory()
+    kitti_store = osp.join(tmp_dir.name, 'kitti_infos_train.mmap')
+    dump_info_store(
+        mmcv.load('tests/data/kitti/kitti_infos_train.pkl'), kitti_store)
+    modality = dict(use_lidar=True, use_camera=False)
+    kitti_dataset = KittiDataset(
+        'tests/data/kitti',
+        'tests/data/kitti/kitti_infos_train.pkl',
+        'training',
+        modality=modality)
+    kitti_store_dataset = KittiDataset(
+        'tests/data/kitti', kitti_store, 'training', modality=modality)
+    assert isinstance(kitti_store_dataset.data_infos, InfoStore)
+    assert len(kitti_store_dataset) == len(kitti_dataset)
+    _assert_equal(kitti_dataset.data_infos[0],
+                  kitti_store_dataset.data_infos[0])
+    expected = kitti_dataset.get_ann_info(0)
+    actual = kitti_store_dataset.get_ann_info(0)
+    assert np.allclose(expected['gt_bboxes_3d'].tensor,
+                       actual['gt_bboxes_3d'].tensor)
+    assert np.array_equal(expected['gt_labels_3d'], actual['gt_labels_3d'])
+
+    nus_store = osp.join(tmp_dir.name, 'nus_info.mmap')
+    dump_info_store(mmcv.load('tests/data/nuscenes/nus_info.pkl'), nus_store)
+    nus_dataset = NuScenesDataset('tests/data/nuscenes/nus_info.pkl', None,
+                                  'tests/data/nuscenes')
+    nus_store_dataset = NuScenesDataset(nus_store, None, 'tests/data/nuscenes')
+    assert nus_store_dataset.version == nus_dataset.version
+    assert len(nus_store_dataset) == len(nus_dataset)
+    for i in range(len(nus_dataset)):
+        _assert_equal(nus_dataset.data_infos[i],
+                      nus_store_dataset.data_infos[i])
+        expected = nus_dataset.get_data_info(i)
+        actual = nus_store_dataset.get_data_info(i)
+        assert expected['sample_idx'] == actual['sample_idx']
+        _assert_equal(expected['sweeps'], actual['sweeps'])
+    tmp_dir.cleanup()
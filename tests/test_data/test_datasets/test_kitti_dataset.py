@@ -258,6 +258,55 @@ def test_evaluate():
                       3.0303030303030307)
 
 
+def test_stream_evaluate():
+    if not torch.cuda.is_available():
+        pytest.skip('test requires GPU and torch+cuda')
+    data_root, ann_file, classes, pts_prefix, \
+        pipeline, modality, split = _generate_kitti_dataset_config()
+    kitti_dataset = KittiDataset(data_root, ann_file, split, pts_prefix,
+                                 pipeline, classes, modality)
+    boxes_3d = LiDARInstance3DBoxes(
+        torch.tensor(
+            [[8.7314, -1.8559, -1.5997, 0.4800, 1.2000, 1.8900, 0.0100]]))
+    result = dict(
+        boxes_3d=boxes_3d,
+        labels_3d=torch.tensor([0]),
+        scores_3d=torch.tensor([0.5]))
+    bboxes = [
+        np.array([[712.4, 143.0, 810.7, 307.9, 0.5]]),
+        np.zeros((0, 5)),
+        np.zeros((0, 5))
+    ]
+
+    # 2D results are converted and evaluated as in `evaluate`
+    evaluator = kitti_dataset.build_evaluator(metric='img_bbox')
+    evaluator.update(0, bboxes)
+    expected = kitti_dataset.evaluate([bboxes], metric='img_bbox')
+    assert evaluator.compute() == expected
+
+    # the types are chosen by result name
+    evaluator = kitti_dataset.build_evaluator()
+    evaluator.update(0, dict(pts_bbox=result, img_bbox=bboxes))
+    ap_dict = evaluator.compute()
+    expected = kitti_dataset.evaluate([result])
+    for key in expected:
+        assert np.isclose(ap_dict[f'pts_bbox/{key}'], expected[key], atol=1e-4)
+    img_keys = [key for key in ap_dict if key.startswith('img_bbox/')]
+    assert len(img_keys) > 0
+    assert all('3D' not in key and 'BEV' not in key for key in img_keys)
+
+    # datasets that override `evaluate` are rejected before inference
+    class _Dataset(KittiDataset):
+
+        def evaluate(self, results, **kwargs):
+            return dict()
+
+    dataset = _Dataset(data_root, ann_file, split, pts_prefix, pipeline,
+                       classes, modality)
+    with pytest.raises(NotImplementedError):
+        dataset.build_evaluator()
+
+
 def test_show():
     from os import path as osp
 
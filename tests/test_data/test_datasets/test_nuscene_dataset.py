@@ -116,3 +116,57 @@ def test_show():
     mmcv.check_file_exist(gt_file_path)
     mmcv.check_file_exist(pred_file_path)
     tmp_dir.cleanup()
+
+
+def test_format_results():
+    import mmcv
+
+    from mmdet3d.core.bbox import LiDARInstance3DBoxes
+    from mmdet3d.datasets.nuscenes_dataset import (lidar_nusc_box_to_global,
+                                                   output_to_nusc_box)
+    nus_dataset = NuScenesDataset(
+        'tests/data/nuscenes/nus_info.pkl',
+        None,
+        'tests/data/nuscenes',
+        test_mode=True)
+    boxes_3d = LiDARInstance3DBoxes(
+        torch.tensor([[46.12, -4.65, -0.93, 0.53, 1.44, 1.75, 1.17, 0.5, 0.1],
+                      [33.32, 0.20, 0.31, 0.57, 1.23, 1.80, 1.57, 0.0, 0.1],
+                      [46.14, -4.64, -0.95, 0.52, 1.65, 1.75, 1.38, 0.1, 0.0],
+                      [33.26, 0.23, 0.34, 0.57, 1.34, 1.79, 1.54, 1.0, 1.0],
+                      [58.91, 16.63, -1.58, 1.57, 3.93, 1.49, 1.55, 0.0,
+                       0.0]]),
+        box_dim=9)
+    scores_3d = torch.tensor([0.1815, 0.1663, 0.5792, 0.2194, 0.2780])
+    labels_3d = torch.tensor([0, 7, 3, 5, 9])
+    result = dict(boxes_3d=boxes_3d, scores_3d=scores_3d, labels_3d=labels_3d)
+    results = [result, result]
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    result_files, _ = nus_dataset.format_results(results,
+                                                 tmp_dir.name + '/results')
+    submission = mmcv.load(result_files)
+    assert submission['meta'] == nus_dataset.modality
+    assert len(submission['results']) == 2
+
+    # compare with the per-box conversion
+    for sample_id in range(2):
+        info = nus_dataset.data_infos[sample_id]
+        annos = submission['results'][info['token']]
+        boxes = lidar_nusc_box_to_global(info, output_to_nusc_box(result),
+                                         nus_dataset.CLASSES,
+                                         nus_dataset.eval_detection_configs)
+        assert len(annos) == len(boxes)
+        for anno, box in zip(annos, boxes):
+            assert np.allclose(anno['translation'], box.center)
+            assert np.allclose(anno['size'], box.wlh)
+            assert np.allclose(anno['rotation'], box.orientation.elements)
+            assert np.allclose(anno['velocity'], box.velocity[:2])
+            assert anno['detection_name'] == nus_dataset.CLASSES[box.label]
+            assert np.isclose(anno['detection_score'], box.score)
+    # the barrier is out of its detection range
+    assert [anno['attribute_name'] for anno in annos] == [
+        'vehicle.moving', 'pedestrian.standing', 'vehicle.stopped',
+        'cycle.with_rider'
+    ]
+    tmp_dir.cleanup()
@@ -3,7 +3,7 @@ import mmcv
 import numpy as np
 
 from mmdet3d.datasets.pipelines.data_augment_utils import (
-    noise_per_object_v3_, points_transform_)
+    noise_per_object_v3_, points_transform_, sequential_collision_free)
 
 
 def test_noise_per_object_v3_():
@@ -70,3 +70,14 @@ def test_points_transform():
                       rot_transforms, valid_mask)
     assert points.shape == (5, 4)
     assert gt_boxes.shape == (5, 7)
+
+
+def test_sequential_collision_free():
+    # box 0 is fixed, group 1 holds boxes 1-3 and group 2 holds boxes 4-5
+    coll_mat = np.zeros((6, 6), dtype=bool)
+    for i, j in [(0, 1), (2, 3), (3, 4), (4, 5)]:
+        coll_mat[i, j] = coll_mat[j, i] = True
+    valid = sequential_collision_free(coll_mat, 1, np.array([4, 6]))
+    # box 2 collides with box 3 that is checked later, which is then kept
+    # and blocks box 4 of the next group
+    assert valid.tolist() == [False, False, True, False, True]
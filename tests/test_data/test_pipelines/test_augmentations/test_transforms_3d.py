@@ -1,4 +1,9 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import copy
+import pickle
+import tempfile
+from os import path as osp
+
 import mmcv
 import numpy as np
 import pytest
@@ -9,13 +14,14 @@ from mmdet3d.core import (Box3DMode, CameraInstance3DBoxes,
 from mmdet3d.core.bbox import Coord3DMode
 from mmdet3d.core.points import DepthPoints, LiDARPoints
 # yapf: disable
-from mmdet3d.datasets import (AffineResize, BackgroundPointsFilter,
-                              GlobalAlignment, GlobalRotScaleTrans,
-                              ObjectNameFilter, ObjectNoise, ObjectRangeFilter,
-                              ObjectSample, PointSample, PointShuffle,
-                              PointsRangeFilter, RandomDropPointsColor,
-                              RandomFlip3D, RandomJitterPoints,
-                              RandomShiftScale, VoxelBasedPointSampler)
+from mmdet3d.datasets import (PIPELINES, AffineResize, BackgroundPointsFilter,
+                              FusedGlobalTransform3D, GlobalAlignment,
+                              GlobalRotScaleTrans, ObjectNameFilter,
+                              ObjectNoise, ObjectRangeFilter, ObjectSample,
+                              PointSample, PointShuffle, PointsRangeFilter,
+                              RandomDropPointsColor, RandomFlip3D,
+                              RandomJitterPoints, RandomShiftScale,
+                              VoxelBasedPointSampler)
 
 
 def test_remove_points_in_boxes():
@@ -111,6 +117,57 @@ def test_object_sample():
     assert np.all(gt_labels_3d == [0])
 
 
+def test_object_sample_packed_database():
+    db_sampler = mmcv.ConfigDict({
+        'data_root': './tests/data/kitti/',
+        'info_path': './tests/data/kitti/kitti_dbinfos_train.pkl',
+        'rate': 1.0,
+        'prepare': {},
+        'classes': ['Pedestrian', 'Cyclist', 'Car'],
+        'sample_groups': {
+            'Pedestrian': 2
+        }
+    })
+    # pack the database with another object stored before the pedestrian
+    tmp_dir = tempfile.TemporaryDirectory()
+    db_infos = mmcv.load(db_sampler.info_path)
+    info = db_infos['Pedestrian'][0]
+    points = np.fromfile(
+        osp.join(db_sampler.data_root, info['path']), dtype=np.float32)
+    packed_points = np.concatenate([np.ones(40, dtype=np.float32), points])
+    packed_points.tofile(osp.join(tmp_dir.name, 'packed_points.bin'))
+    info.update(path='packed_points.bin', offset=10)
+    packed_db_sampler = copy.deepcopy(db_sampler)
+    packed_db_sampler.data_root = tmp_dir.name
+    packed_db_sampler.info_path = osp.join(tmp_dir.name, 'dbinfos.pkl')
+    mmcv.dump(db_infos, packed_db_sampler.info_path)
+
+    gt_bboxes_3d = LiDARInstance3DBoxes(
+        torch.tensor([[20.0, 20.0, -1.5, 1.0, 1.0, 1.5, 0.0]]))
+    input_dict = dict(
+        points=LiDARPoints(np.zeros((1, 4), dtype=np.float32), points_dim=4),
+        gt_bboxes_3d=gt_bboxes_3d,
+        gt_labels_3d=np.array([1]))
+    np.random.seed(0)
+    expected = ObjectSample(db_sampler)(copy.deepcopy(input_dict))
+    np.random.seed(0)
+    object_sample = ObjectSample(packed_db_sampler)
+    results = object_sample(copy.deepcopy(input_dict))
+    assert results['points'].tensor.shape == (378, 4)
+    assert torch.equal(results['points'].tensor, expected['points'].tensor)
+    assert torch.equal(results['gt_bboxes_3d'].tensor,
+                       expected['gt_bboxes_3d'].tensor)
+
+    # the packed file is not modified and the memory map is not pickled
+    assert np.array_equal(
+        np.fromfile(
+            osp.join(tmp_dir.name, 'packed_points.bin'), dtype=np.float32),
+        packed_points)
+    db_sampler = pickle.loads(pickle.dumps(object_sample.db_sampler))
+    assert len(db_sampler._packed_points) == 0
+    tmp_dir.cleanup()
+
+
 def test_object_noise():
     np.random.seed(0)
     object_noise = ObjectNoise()
@@ -541,6 +598,85 @@ def test_random_flip_3d():
     assert repr_str == expected_repr_str
 
 
+def test_fused_global_transform_3d():
+    point_cloud_range = [0, -40, -3, 70.4, 40, 1]
+    transforms = [
+        dict(
+            type='RandomFlip3D',
+            flip_ratio_bev_horizontal=0.5,
+            flip_ratio_bev_vertical=0.5),
+        dict(
+            type='GlobalRotScaleTrans',
+            rot_range=[-0.78539816, 0.78539816],
+            scale_ratio_range=[0.95, 1.05],
+            translation_std=[0.2, 0.2, 0.2]),
+        dict(type='PointsRangeFilter', point_cloud_range=point_cloud_range),
+        dict(type='ObjectRangeFilter', point_cloud_range=point_cloud_range),
+        dict(type='PointShuffle')
+    ]
+    fused_transform = FusedGlobalTransform3D(transforms)
+    chained_transforms = [
+        mmcv.utils.build_from_cfg(transform, PIPELINES)
+        for transform in transforms
+    ]
+
+    # the flips and rotations should be applied before the filters
+    with pytest.raises(AssertionError):
+        FusedGlobalTransform3D(transforms[2:3] + transforms[:1])
+    with pytest.raises(AssertionError):
+        FusedGlobalTransform3D([dict(type='PointSample', num_points=10)])
+
+    points = np.fromfile('tests/data/kitti/training/velodyne_reduced/'
+                         '000000.bin', np.float32).reshape(-1, 4)
+    bbox = np.array(
+        [[8.7314, -1.8559, -0.6547, 0.4800, 1.2000, 1.8900, 0.0100],
+         [28.7314, -18.559, 0.6547, 2.4800, 1.6000, 1.9200, 5.0100],
+         [-2.54, -1.8559, -0.6547, 0.4800, 1.2000, 1.8900, 0.0100],
+         [18.7314, -18.559, 20.6547, 6.4800, 8.6000, 3.9200, -1.0100]])
+    labels = np.array([0, 2, 1, 1], dtype=np.int64)
+    sem_mask = np.random.randint(0, 3, size=points.shape[0])
+
+    for seed in range(4):
+        results = []
+        for transform in [fused_transform, chained_transforms]:
+            input_dict = dict(
+                points=LiDARPoints(points.copy(), points_dim=4),
+                pts_semantic_mask=sem_mask.copy(),
+                gt_bboxes_3d=LiDARInstance3DBoxes(bbox.copy()),
+                gt_labels_3d=labels.copy(),
+                bbox3d_fields=['gt_bboxes_3d'],
+                img_fields=[],
+                box_type_3d=LiDARInstance3DBoxes)
+            np.random.seed(seed)
+            torch.manual_seed(seed)
+            if isinstance(transform, list):
+                for t in transform:
+                    input_dict = t(input_dict)
+            else:
+                input_dict = transform(input_dict)
+            results.append(input_dict)
+
+        fused_results, chained_results = results
+        assert torch.allclose(
+            fused_results['points'].tensor,
+            chained_results['points'].tensor,
+            atol=1e-4)
+        assert np.all(fused_results['pts_semantic_mask'] ==
+                      chained_results['pts_semantic_mask'])
+        assert torch.allclose(fused_results['gt_bboxes_3d'].tensor,
+                              chained_results['gt_bboxes_3d'].tensor)
+        assert np.all(
+            fused_results['gt_labels_3d'] == chained_results['gt_labels_3d'])
+        for key in [
+                'pcd_rotation', 'pcd_scale_factor', 'pcd_trans',
+                'pcd_horizontal_flip', 'pcd_vertical_flip'
+        ]:
+            assert np.allclose(fused_results[key], chained_results[key])
+
+    repr_str = repr(fused_transform)
+    assert repr_str.startswith('FusedGlobalTransform3D(\n    RandomFlip3D(')
+
+
 def test_random_jitter_points():
     # jitter_std should be a number or seq of numbers
     with pytest.raises(AssertionError):
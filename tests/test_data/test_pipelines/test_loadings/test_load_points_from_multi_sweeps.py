@@ -67,3 +67,40 @@ def test_load_points_from_multi_sweeps():
     input_results = dict(points=points, sweeps=[sweep] * 10, timestamp=1.0)
     results = load_points_from_multi_sweeps_3(input_results)
     assert results['points'].tensor.numpy().shape == (3259, 5)
+
+
+def test_load_points_from_multi_sweeps_threads():
+    np.random.seed(0)
+    points = np.random.random([100, 5]) * 2
+    sweeps = []
+    for i in range(3):
+        rotation, _ = np.linalg.qr(np.random.random([3, 3]))
+        sweeps.append(
+            dict(
+                data_path='tests/data/nuscenes/sweeps/LIDAR_TOP/'
+                'n008-2018-09-18-12-07-26-0400__LIDAR_TOP__'
+                '1537287083900561.pcd.bin',
+                sensor2lidar_rotation=rotation,
+                sensor2lidar_translation=np.random.random(3),
+                timestamp=i * 5e4))
+
+    for remove_close in [False, True]:
+        expected = LoadPointsFromMultiSweeps(
+            sweeps_num=9, use_dim=[0, 1, 2, 4],
+            remove_close=remove_close)(dict(
+                points=LiDARPoints(points, points_dim=5),
+                sweeps=sweeps,
+                timestamp=1.0))['points']
+        load_points_from_multi_sweeps = LoadPointsFromMultiSweeps(
+            sweeps_num=9,
+            use_dim=[0, 1, 2, 4],
+            remove_close=remove_close,
+            num_threads=2)
+        results = load_points_from_multi_sweeps(
+            dict(
+                points=LiDARPoints(points, points_dim=5),
+                sweeps=sweeps,
+                timestamp=1.0))
+        assert isinstance(results['points'], LiDARPoints)
+        assert np.array_equal(results['points'].tensor.numpy(),
+                              expected.tensor.numpy())
@@ -1,4 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import pickle
+import tempfile
 from os import path as osp
 
 import mmcv
@@ -8,12 +10,12 @@ import pytest
 from mmdet3d.core.bbox import DepthInstance3DBoxes
 from mmdet3d.core.points import DepthPoints, LiDARPoints
 # yapf: disable
-from mmdet3d.datasets.pipelines import (LoadAnnotations3D,
+from mmdet3d.datasets.pipelines import (Compose, LoadAnnotations3D,
                                         LoadImageFromFileMono3D,
                                         LoadPointsFromFile,
                                         LoadPointsFromMultiSweeps,
-                                        NormalizePointsColor,
-                                        PointSegClassMapping)
+                                        NormalizePointsColor, PointsCache,
+                                        PointSegClassMapping, PrefixCache)
 
 # yapf: enable
 
@@ -121,6 +123,114 @@ def test_load_points_from_outdoor_file():
         LoadPointsFromFile(coord_type='LIDAR', load_dim=4, use_dim=5)
 
 
+def test_points_cache():
+    data_path = 'tests/data/kitti/a.bin'
+    expected = np.fromfile(data_path, dtype=np.float32)
+    load_points_from_file = LoadPointsFromFile(
+        coord_type='LIDAR',
+        load_dim=4,
+        use_dim=4,
+        cache_cfg=dict(max_bytes=expected.nbytes))
+    cache = load_points_from_file.cache
+    for _ in range(3):
+        results = load_points_from_file(dict(pts_filename=data_path))
+        assert np.allclose(results['points'].tensor.numpy().sum(), 2637.479)
+    assert cache.misses == 1 and cache.hits == 2
+    assert cache.bytes_saved == 2 * expected.nbytes
+    assert np.isclose(cache.hit_rate, 2 / 3)
+
+    # LRU eviction under the byte budget
+    num_bytes = expected.nbytes // 2
+    cache = PointsCache(max_bytes=3 * num_bytes, log_interval=0)
+
+    def loader(key):
+        return np.zeros(num_bytes // 4, dtype=np.float32)
+
+    for key in ['a', 'b', 'c', 'a', 'd']:
+        points = cache.get(key, loader)
+        assert not points.flags.writeable
+    assert list(cache._entries) == ['c', 'a', 'd']
+    assert cache.nbytes == 3 * num_bytes
+    assert cache.misses == 4 and cache.hits == 1
+
+    # the entries are not pickled
+    cache = pickle.loads(pickle.dumps(cache))
+    assert len(cache) == 0 and cache.nbytes == 0
+
+    # the shared tier is filled by other processes
+    tmp_dir = tempfile.TemporaryDirectory()
+    cache_cfg = dict(shared_dir=osp.join(tmp_dir.name, 'points'))
+    load_points_from_file.cache = PointsCache(**cache_cfg)
+    load_points_from_file(dict(pts_filename=data_path))
+    other_load_points_from_file = LoadPointsFromFile(
+        coord_type='LIDAR', load_dim=4, use_dim=4, cache_cfg=cache_cfg)
+    results = other_load_points_from_file(dict(pts_filename=data_path))
+    assert np.allclose(results['points'].tensor.numpy().sum(), 2637.479)
+    assert other_load_points_from_file.cache.shared_hits == 1
+    assert other_load_points_from_file.cache.misses == 0
+    tmp_dir.cleanup()
+
+
+def test_prefix_cache():
+    data_path = 'tests/data/kitti/a.bin'
+
+    class CountingTransform(object):
+        deterministic = True
+
+        def __init__(self):
+            self.calls = 0
+
+        def __call__(self, results):
+            self.calls += 1
+            return results
+
+    def add_noise(results):
+        results['points'].tensor += 1
+        return results
+
+    counting_transform = CountingTransform()
+    transforms = [
+        dict(
+            type='LoadPointsFromFile',
+            coord_type='LIDAR',
+            load_dim=4,
+            use_dim=4), counting_transform, add_noise, counting_transform
+    ]
+    compose = Compose(transforms, cache_cfg=dict(max_bytes=2**20))
+    assert compose.prefix_len == 2
+    for _ in range(3):
+        results = compose(dict(pts_filename=data_path, sample_idx=0))
+        points = results['points'].tensor.numpy()
+        assert np.allclose(points.sum(), 2637.479 + points.size)
+    # the prefix only runs on the first call
+    assert counting_transform.calls == 4
+    assert compose.cache.misses == 1 and compose.cache.hits == 2
+
+    # no caching without a sample index
+    compose(dict(pts_filename=data_path))
+    assert counting_transform.calls == 6
+
+    # LRU eviction under the byte budget
+    cache = PrefixCache(max_bytes=3 * 1024)
+    for key in ['a', 'b', 'c', 'a', 'd']:
+        if cache.get(key) is None:
+            cache.put(key, dict(data=np.zeros(180, dtype=np.float32)))
+    assert list(cache._entries) == ['c', 'a', 'd']
+    assert cache.misses == 4 and cache.hits == 1
+
+    # the entries are not pickled, the on-disk tier is shared
+    tmp_dir = tempfile.TemporaryDirectory()
+    cache_cfg = dict(cache_dir=osp.join(tmp_dir.name, 'prefix'))
+    compose = Compose(transforms[:1], cache_cfg=cache_cfg)
+    compose(dict(pts_filename=data_path, sample_idx=0))
+    other_compose = pickle.loads(pickle.dumps(compose))
+    assert len(compose.cache) == 1 and len(other_compose.cache) == 0
+    results = other_compose(dict(pts_filename=data_path, sample_idx=0))
+    assert np.allclose(results['points'].tensor.numpy().sum(), 2637.479)
+    assert other_compose.cache.hits == 1
+    tmp_dir.cleanup()
+
+
 def test_load_annotations3D():
     # Test scannet LoadAnnotations3D
     scannet_info = mmcv.load('./tests/data/scannet/scannet_infos.pkl')[0]
@@ -3,7 +3,9 @@ import numpy as np
 import pytest
 import torch
 
-from mmdet3d.core.evaluation.indoor_eval import average_precision, indoor_eval
+from mmdet3d.core.evaluation import IndoorEvaluator
+from mmdet3d.core.evaluation.indoor_eval import (average_precision,
+                                                 eval_det_flat, indoor_eval)
 
 
 def test_indoor_eval():
@@ -181,8 +183,101 @@ def test_indoor_eval_less_classes():
     assert np.isclose(ret_value['mAR_0.25'], 0.666667)
 
 
+def test_indoor_evaluator():
+    if not torch.cuda.is_available():
+        pytest.skip()
+    from mmdet3d.core.bbox.structures import Box3DMode, DepthInstance3DBoxes
+    det_infos = [{
+        'labels_3d':
+        torch.tensor([0, 2, 2]),
+        'boxes_3d':
+        DepthInstance3DBoxes(
+            torch.tensor([[1., 1., 1., 1., 1., 1., 1.],
+                          [0., 0., 0., 1., 1., 1., 1.],
+                          [0.1, 0., 0., 1., 1., 1., 1.]])),
+        'scores_3d':
+        torch.tensor([.5, .7, .9])
+    }, {
+        'labels_3d':
+        torch.tensor([1, 0]),
+        'boxes_3d':
+        DepthInstance3DBoxes(
+            torch.tensor([[1., 1., 1., 1., 1., 1., 1.],
+                          [3., 3., 3., 1., 1., 1., 1.]])),
+        'scores_3d':
+        torch.tensor([.5, .6])
+    }]
+
+    label2cat = {0: 'cabinet', 1: 'bed', 2: 'chair'}
+    gt_annos = [{
+        'gt_num':
+        2,
+        'gt_boxes_upright_depth':
+        np.array([[0., 0., 0., 1., 1., 1., 1.], [1., 1., 1., 1., 1., 1., 1.]]),
+        'class':
+        np.array([2, 0])
+    }, {
+        'gt_num':
+        1,
+        'gt_boxes_upright_depth':
+        np.array([
+            [1., 1., 1., 1., 1., 1., 1.],
+        ]),
+        'class':
+        np.array([1])
+    }]
+
+    evaluator = IndoorEvaluator(
+        gt_annos, [0.25, 0.5],
+        label2cat,
+        box_type_3d=DepthInstance3DBoxes,
+        box_mode_3d=Box3DMode.DEPTH)
+    # the order of updates does not matter
+    for sample_idx in [1, 0]:
+        evaluator.update(sample_idx, det_infos[sample_idx])
+    ret_value = evaluator.compute()
+
+    expected = indoor_eval(
+        gt_annos,
+        det_infos, [0.25, 0.5],
+        label2cat,
+        box_type_3d=DepthInstance3DBoxes,
+        box_mode_3d=Box3DMode.DEPTH)
+    assert ret_value.keys() == expected.keys()
+    for key in expected:
+        assert np.isclose(ret_value[key], expected[key])
+
+
 def test_average_precision():
     ap = average_precision(
         np.array([[0.25, 0.5, 0.75], [0.25, 0.5, 0.75]]),
         np.array([[1., 1., 1.], [1., 1., 1.]]), '11points')
     assert abs(ap[0] - 0.06611571) < 0.001
+
+
+def test_eval_det_flat():
+    # class 0 has 3 ground truths, class 1 has 1
+    gt_labels = np.array([0, 0, 1, 0])
+    pred_labels = np.array([0, 1, 0, 0, 1, 0])
+    pred_scores = np.array([.9, .8, .7, .6, .5, .4])
+    iou_max = np.array([.6, .3, .4, .8, -np.inf, .2], dtype=np.float32)
+    gt_inds = np.array([0, 2, 0, 1, 0, 3])
+    ret_values = eval_det_flat(pred_labels, pred_scores, iou_max, gt_inds,
+                               gt_labels, [0, 1], [0.25, 0.5])
+
+    # class 0, the detection with score .7 matches an already matched gt
+    recall, precision, ap = ret_values[0][0]
+    assert np.allclose(recall, [1 / 3, 1 / 3, 2 / 3, 2 / 3])
+    assert np.allclose(precision, [1., .5, 2 / 3, .5])
+    assert np.allclose(ap, 5 / 9)
+    recall, precision, ap = ret_values[0][1]
+    assert np.allclose(recall, [1 / 3, 1 / 3, 2 / 3, 2 / 3])
+    assert np.allclose(precision, [1., .5, 2 / 3, .5])
+    # class 1, only the first detection is above 0.25
+    recall, precision, ap = ret_values[1][0]
+    assert np.allclose(recall, [1., 1.])
+    assert np.allclose(precision, [1., .5])
+    assert np.allclose(ap, 1.)
+    recall, precision, ap = ret_values[1][1]
+    assert np.allclose(recall, [0., 0.])
+    assert np.allclose(ap, 0.)
@@ -265,3 +265,59 @@ def test_eval_class():
     assert np.isclose(recall_sum, 16)
     assert np.isclose(precision_sum, 16)
     assert np.isclose(orientation_sum, 10.252829201850309)
+
+    # compute the statistics of the parts with a thread pool and share the
+    # prepared data between calls
+    prepared_parts = dict()
+    for _ in range(2):
+        ret_dict_parallel = eval_class([gt_anno], [dt_anno],
+                                       current_classes,
+                                       difficultys,
+                                       metric,
+                                       min_overlaps,
+                                       True,
+                                       1,
+                                       num_workers=2,
+                                       prepared_parts=prepared_parts)
+        assert len(prepared_parts) == len(current_classes) * len(difficultys)
+        for key in ['recall', 'precision', 'orientation']:
+            assert np.allclose(ret_dict_parallel[key], ret_dict[key])
+
+
+def test_rotate_iou_cpu_eval():
+    from mmdet3d.core.evaluation.kitti_utils.rotate_iou_cpu import \
+        rotate_iou_cpu_eval
+    boxes = np.array([[0., 0., 2., 2., 0.], [1., 1., 2., 2., 0.],
+                      [0., 0., 2., 2., np.pi / 4], [10., 10., 1., 1., 0.]])
+    query_boxes = np.array([[0., 1., 2., 2., 0.], [0., 0., 4., 1., 0.]])
+    expected_iou = np.array([[1 / 3, 1 / 3], [1 / 3, 1 / 7],
+                             [0.29626596, 0.41054344], [0., 0.]])
+    iou = rotate_iou_cpu_eval(boxes, query_boxes)
+    assert iou.shape == (4, 2)
+    assert iou.dtype == np.float32
+    assert np.allclose(iou, expected_iou, atol=1e-4)
+
+    # area_inter / area of the query box, as in the CUDA kernel
+    iou = rotate_iou_cpu_eval(boxes, query_boxes, 0)
+    assert np.allclose(iou[:2], [[0.5, 0.5], [0.5, 0.25]])
+    # raw intersection area
+    iou = rotate_iou_cpu_eval(boxes, query_boxes, 2)
+    assert np.allclose(iou[:2], [[2., 2.], [2., 1.]])
+
+    assert rotate_iou_cpu_eval(boxes[:0], query_boxes).shape == (0, 2)
+
+    if torch.cuda.is_available():
+        from mmdet3d.core.evaluation.kitti_utils.rotate_iou import \
+            rotate_iou_gpu_eval
+        rng = np.random.RandomState(0)
+        boxes = np.concatenate([
+            rng.uniform(0, 10, (100, 2)),
+            rng.uniform(1, 5, (100, 2)),
+            rng.uniform(-np.pi, np.pi, (100, 1))
+        ], 1)
+        query_boxes = boxes[::-1] + 0.1
+        for criterion in [-1, 0, 1, 2]:
+            assert np.allclose(
+                rotate_iou_cpu_eval(boxes, query_boxes, criterion),
+                rotate_iou_gpu_eval(boxes, query_boxes, criterion),
+                atol=1e-4)
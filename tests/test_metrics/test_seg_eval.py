@@ -3,6 +3,7 @@ import numpy as np
 import pytest
 import torch
 
+from mmdet3d.core.evaluation import SegEvaluator
 from mmdet3d.core.evaluation.seg_eval import seg_eval
 
 
@@ -37,3 +38,44 @@ def test_indoor_eval():
     assert np.isclose(ret_value['acc'], 0.7)
     assert np.isclose(ret_value['acc_cls'], 0.7)
     assert np.isclose(ret_value['miou'], 0.547619048)
+
+
+def test_seg_evaluator():
+    gt_labels = [
+        torch.Tensor([0, 0, 0, 255, 0, 0, 1, 1, 1, 255, 1, 1]),
+        torch.Tensor([2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 255])
+    ]
+    seg_preds = [
+        torch.Tensor([0, 0, 1, 0, 0, 2, 1, 3, 1, 2, 1, 0]),
+        torch.Tensor([2, 2, 2, 2, 1, 3, 0, 3, 3, 3, 3])
+    ]
+    label2cat = {
+        0: 'car',
+        1: 'bicycle',
+        2: 'motorcycle',
+        3: 'truck',
+    }
+
+    evaluator = SegEvaluator(
+        label2cat, ignore_index=255, gt_loader=lambda i: gt_labels[i])
+    for sample_idx, seg_pred in enumerate(seg_preds):
+        evaluator.update(sample_idx, dict(semantic_mask=seg_pred))
+    ret_value = evaluator.compute()
+
+    expected = seg_eval(gt_labels, seg_preds, label2cat, ignore_index=255)
+    assert ret_value.keys() == expected.keys()
+    for key in expected:
+        assert np.isclose(ret_value[key], expected[key])
+    assert np.isclose(ret_value['acc'], 0.7)
+    assert np.isclose(ret_value['miou'], 0.547619048)
+
+    # the statistics are left unchanged out of distributed testing
+    hist = evaluator.hist.copy()
+    evaluator.all_reduce()
+    assert np.array_equal(evaluator.hist, hist)
+
+    # the confusion matrices of the scenes are summed across processes
+    ret_value = seg_eval(
+        gt_labels, seg_preds, label2cat, ignore_index=255, num_workers=2)
+    for key in expected:
+        assert np.isclose(ret_value[key], expected[key])
@@ -0,0 +1,50 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+from mmcv.ops import Voxelization
+from torch.nn import functional as F
+
+from mmdet3d.ops import batch_voxelization, batch_voxelize
+
+
+def test_batch_voxelization():
+    torch.manual_seed(0)
+    points = []
+    for num_points in [2000, 0, 500, 3000]:
+        res = torch.rand([num_points, 4]) * 90 - torch.tensor([20, 45, 5, 0])
+        # a dense cluster to fill the voxels
+        res[:num_points // 3] = res[:1] + torch.rand([num_points // 3, 4])
+        points.append(res)
+
+    for max_num_points, max_voxels in [(5, 16000), (32, 300)]:
+        voxel_layer = Voxelization(
+            voxel_size=[0.4, 0.4, 1],
+            point_cloud_range=[0, -40, -3, 70.4, 40, 1],
+            max_num_points=max_num_points,
+            max_voxels=(max_voxels, max_voxels * 2))
+        for training in [True, False]:
+            voxel_layer.train(training)
+            voxels, coors, num_points = [], [], []
+            for i, res in enumerate(points):
+                res_voxels, res_coors, res_num_points = voxel_layer(res)
+                voxels.append(res_voxels)
+                coors.append(F.pad(res_coors, (1, 0), value=i))
+                num_points.append(res_num_points)
+
+            ret = batch_voxelize(points, voxel_layer)
+            assert torch.equal(ret[0], torch.cat(voxels))
+            assert torch.equal(ret[1], torch.cat(coors))
+            assert torch.equal(ret[2], torch.cat(num_points))
+
+    voxels, coors, num_points = batch_voxelization(
+        torch.tensor([[0.5, 0.5, 0.5], [0.6, 0.4, 0.1], [1.5, 0.5, 0.5],
+                      [0.2, 0.2, 0.2], [-1, 0, 0], [0.5, 0.5, 0.5]]),
+        [0, 4, 6], [1, 1, 1], [0, 0, 0, 2, 2, 2],
+        max_num_points=2,
+        max_voxels=2)
+    assert voxels.shape == (3, 2, 3)
+    assert torch.equal(
+        coors,
+        torch.tensor([[0, 0, 0, 0], [0, 0, 0, 1], [1, 0, 0, 0]]).int())
+    assert torch.equal(num_points, torch.tensor([2, 1, 1]).int())
+    assert torch.equal(voxels[0],
+                       torch.tensor([[0.5, 0.5, 0.5], [0.6, 0.4, 0.1]]))
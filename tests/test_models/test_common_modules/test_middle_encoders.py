@@ -47,3 +47,47 @@ def test_sparse_encoder_for_ssd():
 
     ret, _ = sparse_encoder(voxel_features, coors, 4, True)
     assert ret.shape == torch.Size([4, 256, 128, 128])
+
+
+def test_pillar_scatter():
+    pillar_scatter_cfg = dict(
+        type='PointPillarsScatter', in_channels=8, output_shape=[20, 30])
+    pillar_scatter = build_middle_encoder(pillar_scatter_cfg)
+
+    torch.manual_seed(0)
+    coors = []
+    for batch_idx, num_pillars in enumerate([50, 0, 80]):
+        flat_inds = torch.randperm(20 * 30)[:num_pillars]
+        coors.append(
+            torch.stack([
+                flat_inds.new_full((num_pillars, ), batch_idx),
+                flat_inds.new_zeros(num_pillars), flat_inds // 30,
+                flat_inds % 30
+            ], 1))
+    coors = torch.cat(coors).int()
+    voxel_features = torch.rand([coors.shape[0], 8])
+    expected = torch.zeros([3, 8, 20, 30])
+    for (batch_idx, _, y, x), feature in zip(coors.long(), voxel_features):
+        expected[batch_idx, :, y, x] = feature
+
+    ret = pillar_scatter(voxel_features, coors, 3)
+    assert torch.equal(ret, expected)
+    ret = pillar_scatter(voxel_features[:50], coors[:50])
+    assert torch.equal(ret, expected[:1])
+
+    # reuse the canvas across iterations
+    pillar_scatter_cfg.update(reuse_canvas=True)
+    pillar_scatter = build_middle_encoder(pillar_scatter_cfg)
+    for _ in range(2):
+        features = voxel_features.clone().requires_grad_()
+        ret = pillar_scatter(features, coors, 3)
+        assert torch.equal(ret, expected)
+        ret.sum().backward()
+        assert torch.equal(features.grad, torch.ones_like(features))
+
+    # hybrid sparse output
+    pillar_scatter_cfg.update(reuse_canvas=False, sparse_output=True)
+    pillar_scatter = build_middle_encoder(pillar_scatter_cfg)
+    ret = pillar_scatter(voxel_features, coors, 3)
+    assert ret.is_sparse and ret.shape == torch.Size([3, 20, 30, 8])
+    assert torch.equal(ret.to_dense().permute(0, 3, 1, 2), expected)
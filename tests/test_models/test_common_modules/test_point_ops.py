@@ -0,0 +1,109 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import pytest
+import torch
+
+from mmdet3d.ops import (ball_query, furthest_point_sample,
+                         furthest_point_sample_with_dist, gather_points,
+                         grouping_operation, knn, three_interpolate, three_nn)
+
+
+def _square_dist(xyz, center_xyz):
+    return ((center_xyz.unsqueeze(2) - xyz.unsqueeze(1))**2).sum(-1)
+
+
+def test_furthest_point_sample_cpu():
+    torch.manual_seed(0)
+    xyz = torch.rand(2, 256, 3) + 0.5
+    # zero padding is never sampled
+    xyz[:, 200:] = 0
+    idx = furthest_point_sample(xyz, 32)
+    assert idx.shape == (2, 32) and idx.dtype == torch.int32
+
+    for b in range(2):
+        expected = [0]
+        min_dist = torch.full((256, ), 1e10)
+        for _ in range(31):
+            dist = ((xyz[b] - xyz[b, expected[-1]])**2).sum(-1)
+            min_dist = torch.min(min_dist, dist)
+            min_dist[200:] = -1
+            expected.append(int(min_dist.argmax()))
+        assert idx[b].tolist() == expected
+
+    dist = _square_dist(xyz, xyz)
+    idx_with_dist = furthest_point_sample_with_dist(dist[:, :200, :200], 32)
+    assert torch.equal(idx_with_dist, idx)
+
+
+def test_ball_query_cpu():
+    torch.manual_seed(0)
+    xyz = torch.rand(2, 512, 3) * 4
+    center_xyz = torch.cat([xyz[:, :64], torch.full((2, 1, 3), 10.)], dim=1)
+    for min_radius, max_radius in [(0, 0.5), (0.2, 0.8)]:
+        idx = ball_query(min_radius, max_radius, 16, xyz, center_xyz)
+        assert idx.shape == (2, 65, 16) and idx.dtype == torch.int32
+
+        dist = _square_dist(xyz, center_xyz)
+        in_ball = (dist == 0) | ((dist >= min_radius**2) &
+                                 (dist < max_radius**2))
+        for b in range(2):
+            for m in range(65):
+                expected = in_ball[b, m].nonzero().view(-1)[:16].tolist()
+                if len(expected) == 0:
+                    expected = [0]
+                expected += [expected[0]] * (16 - len(expected))
+                assert idx[b, m].tolist() == expected
+
+
+def test_knn_cpu():
+    torch.manual_seed(0)
+    xyz = torch.rand(2, 128, 3)
+    center_xyz = torch.rand(2, 16, 3)
+    idx = knn(5, xyz, center_xyz)
+    assert idx.shape == (2, 5, 16) and idx.dtype == torch.int32
+    expected = _square_dist(xyz, center_xyz).argsort(dim=-1)[..., :5]
+    assert torch.equal(idx.long(), expected.transpose(2, 1))
+
+    idx_transposed = knn(5,
+                         xyz.transpose(2, 1).contiguous(),
+                         center_xyz.transpose(2, 1).contiguous(), True)
+    assert torch.equal(idx_transposed, idx)
+
+    # every point is its own nearest neighbour
+    idx = knn(1, xyz)
+    assert torch.equal(idx[:, 0].long(), torch.arange(128).expand(2, -1))
+
+
+def test_three_nn_interpolate_cpu():
+    torch.manual_seed(0)
+    source = torch.rand(2, 64, 3)
+    target = torch.rand(2, 256, 3)
+    dist, idx = three_nn(target, source)
+    assert dist.shape == idx.shape == (2, 256, 3)
+    expected_dist, expected_idx = _square_dist(source, target).topk(
+        3, dim=-1, largest=False)
+    assert torch.equal(idx.long(), expected_idx)
+    assert torch.allclose(dist, expected_dist.sqrt(), atol=1e-6)
+
+    features = torch.rand(2, 8, 64, requires_grad=True)
+    weight = torch.rand(2, 256, 3)
+    interpolated = three_interpolate(features, idx, weight)
+    expected = sum(features[0][:, idx[0, :, i].long()] * weight[0, :, i]
+                   for i in range(3))
+    assert torch.allclose(interpolated[0], expected)
+    interpolated.sum().backward()
+    assert features.grad.shape == features.shape
+
+
+@pytest.mark.parametrize('indices_shape', [(2, 10), (2, 10, 4)])
+def test_gather_and_group_cpu(indices_shape):
+    torch.manual_seed(0)
+    features = torch.rand(2, 8, 32)
+    indices = torch.randint(0, 32, indices_shape, dtype=torch.int32)
+    if len(indices_shape) == 2:
+        gathered = gather_points(features, indices)
+    else:
+        gathered = grouping_operation(features, indices)
+    assert gathered.shape == (2, 8) + indices_shape[1:]
+    for b in range(2):
+        expected = features[b][:, indices[b].long()]
+        assert torch.equal(gathered[b], expected)
@@ -974,6 +974,35 @@ def test_center_head():
         assert ret_list[1].shape[0] <= 500
         assert ret_list[2].shape[0] <= 500
 
+    # test get_targets
+    torch.manual_seed(0)
+    gt_bboxes_3d, gt_labels_3d = [], []
+    for num_gts in [20, 0, 35]:
+        boxes = torch.rand([num_gts, 9])
+        boxes[:, :2] = boxes[:, :2] * 120 - 60
+        boxes[:, 3:6] = boxes[:, 3:6] * 5 + 0.1
+        gt_bboxes_3d.append(LiDARInstance3DBoxes(boxes, box_dim=9))
+        gt_labels_3d.append(torch.randint(0, 10, [num_gts]))
+    heatmaps, anno_boxes, inds, masks = center_head.get_targets(
+        gt_bboxes_3d, gt_labels_3d)
+    for i in range(6):
+        assert heatmaps[i].shape == torch.Size(
+            [3, tasks[i]['num_class'], 128, 128])
+        assert anno_boxes[i].shape == torch.Size([3, 500, 10])
+        assert inds[i].shape == masks[i].shape == torch.Size([3, 500])
+        assert masks[i][1].sum() == 0 and heatmaps[i][1].sum() == 0
+        # every target center is a peak of the heatmap
+        num_pos = heatmaps[i].eq(1).sum()
+        assert masks[i].sum() >= num_pos > 0
+    # the batched targets are the targets of each sample
+    for b in range(3):
+        targets = center_head.get_targets_single(gt_bboxes_3d[b],
+                                                 gt_labels_3d[b])
+        for batch_target, target in zip((heatmaps, anno_boxes, inds, masks),
+                                        targets):
+            for i in range(6):
+                assert torch.equal(batch_target[i][b], target[i])
+
 
 def test_dcn_center_head():
     if not torch.cuda.is_available():
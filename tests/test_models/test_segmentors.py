@@ -350,3 +350,48 @@ def test_dgcnn():
         results = self.aug_test(scene_points, img_metas)
         assert results[0]['semantic_mask'].shape == torch.Size([500])
         assert results[1]['semantic_mask'].shape == torch.Size([200])
+
+
+def test_sliding_patch_generation():
+    set_random_seed(0, True)
+    pn2_ssg_cfg = _get_segmentor_cfg(
+        'pointnet2/pointnet2_ssg_16x2_cosine_200e_scannet_seg-3d-20class.py')
+    self = build_segmentor(pn2_ssg_cfg)
+    points = torch.rand(2000, 6) * torch.tensor([4.0, 3.0, 2.0, 1, 1, 1])
+    # points on the patch boundaries
+    points[:200, :2] = torch.round(points[:200, :2] * 4) / 4
+    num_points, block_size, eps = 64, 1.5, 1e-3
+    patch_points, patch_idxs = self._sliding_patch_generation(
+        points, num_points, block_size, 0.5, True, eps)
+    assert patch_points.shape == (patch_idxs.shape[0], 9)
+
+    # the patches are generated in order, each with all its points
+    coords = points[:, :3]
+    coord_max = coords.max(0)[0]
+    coord_min = coords.min(0)[0]
+    start = 0
+    for idx_y in range(3):
+        e_y = torch.min(coord_min[1] + idx_y * 0.75 + block_size, coord_max[1])
+        for idx_x in range(5):
+            e_x = torch.min(coord_min[0] + idx_x * 0.75 + block_size,
+                            coord_max[0])
+            cur_max = torch.stack([e_x, e_y, coord_max[2]])
+            cur_min = torch.stack(
+                [e_x - block_size, e_y - block_size, coord_min[2]])
+            cur_choice = ((coords >= cur_min - eps) &
+                          (coords <= cur_max + eps)).all(dim=1)
+            point_idxs = torch.nonzero(cur_choice, as_tuple=True)[0]
+            num_batch = int(np.ceil(point_idxs.shape[0] / num_points))
+            point_size = num_batch * num_points
+            choices = patch_idxs[start:start + point_size]
+            assert torch.equal(torch.unique(choices), point_idxs)
+            centered_coords = coords[choices].clone()
+            centered_coords[:, :2] -= cur_min[:2] + block_size / 2.0
+            expected_points = torch.cat([
+                centered_coords, points[choices, 3:],
+                coords[choices] / coord_max
+            ], 1)
+            assert torch.allclose(patch_points[start:start + point_size],
+                                  expected_points)
+            start += point_size
+    assert start == patch_idxs.shape[0]
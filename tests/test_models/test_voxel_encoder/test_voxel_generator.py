@@ -1,7 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import numpy as np
 
-from mmdet3d.core.voxel.voxel_generator import VoxelGenerator
+from mmdet3d.core.voxel.voxel_generator import VoxelGenerator, points_to_voxel
 
 
 def test_voxel_generator():
@@ -20,3 +20,46 @@ def test_voxel_generator():
     assert voxels.shape == (8, 1000, 4)
     assert np.all(coors == expected_coors)
     assert np.all(num_points_per_voxel == expected_num_points_per_voxel)
+
+
+def test_points_to_voxel():
+    np.random.seed(0)
+    voxel_size = np.array([0.5, 0.5, 1.0], dtype=np.float32)
+    point_cloud_range = np.array([0, 0, 0, 4, 4, 2], dtype=np.float32)
+    points = np.random.rand(2000, 4) * [5, 5, 3, 1] - [0.5, 0.5, 0.5, 0]
+    # points on the voxel boundaries
+    points[:500, :3] = np.round(points[:500, :3] * 2) / 2
+
+    for reverse_index, max_points, max_voxels in [(True, 35, 20000),
+                                                  (False, 5, 20000),
+                                                  (True, 3, 40)]:
+        voxels, coors, num_points_per_voxel = points_to_voxel(
+            points, voxel_size, point_cloud_range, max_points, reverse_index,
+            max_voxels)
+
+        # the points processed one after another
+        expected_coors, expected_points = [], []
+        for point in points:
+            coor = np.floor((point[:3] - point_cloud_range[:3]) / voxel_size)
+            if np.any(coor < 0) or np.any(coor >= [8, 8, 2]):
+                continue
+            coor = coor[::-1] if reverse_index else coor
+            coor = coor.astype(np.int32).tolist()
+            if coor not in expected_coors:
+                if len(expected_coors) == max_voxels:
+                    continue
+                expected_coors.append(coor)
+                expected_points.append([])
+            voxel_points = expected_points[expected_coors.index(coor)]
+            if len(voxel_points) < max_points:
+                voxel_points.append(point)
+
+        assert voxels.shape == (len(expected_coors), max_points, 4)
+        assert coors.dtype == np.int32
+        assert np.all(coors == np.array(expected_coors))
+        for voxel, num_points, voxel_points in zip(voxels,
+                                                   num_points_per_voxel,
+                                                   expected_points):
+            assert num_points == len(voxel_points)
+            assert np.all(voxel[:num_points] == np.array(voxel_points))
+            assert np.all(voxel[num_points:] == 0)
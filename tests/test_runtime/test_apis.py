@@ -2,20 +2,24 @@
 import os
 import tempfile
 from os.path import dirname, exists, join
+from unittest.mock import patch
 
 import numpy as np
 import pytest
 import torch
 from mmcv.parallel import MMDataParallel
+from torch.utils.data import DataLoader, DistributedSampler
 
-from mmdet3d.apis import (convert_SyncBN, inference_detector,
+from mmdet3d.apis import (InferenceSession, convert_SyncBN, inference_detector,
                           inference_mono_3d_detector,
                           inference_multi_modality_detector,
-                          inference_segmentor, init_model, show_result_meshlab,
+                          inference_segmentor, init_model,
+                          multi_gpu_stream_test, show_result_meshlab,
                           single_gpu_test)
 from mmdet3d.core import Box3DMode
 from mmdet3d.core.bbox import (CameraInstance3DBoxes, DepthInstance3DBoxes,
                                LiDARInstance3DBoxes)
+from mmdet3d.core.evaluation import SegEvaluator
 from mmdet3d.datasets import build_dataloader, build_dataset
 from mmdet3d.models import build_model
 
@@ -263,6 +267,30 @@ def test_inference_detector():
     assert labels_3d.shape[0] >= 0
 
 
+def test_inference_session():
+    if not torch.cuda.is_available():
+        pytest.skip('test requires GPU and torch+cuda')
+
+    pcd = 'tests/data/kitti/training/velodyne_reduced/000000.bin'
+    detector_cfg = 'configs/pointpillars/hv_pointpillars_secfpn_' \
+                   '6x8_160e_kitti-3d-3class.py'
+    detector = init_model(detector_cfg, device='cuda:0')
+    expected = inference_detector(detector, pcd)[0][0]
+
+    points = np.fromfile(pcd, dtype=np.float32)
+    with InferenceSession(detector, batch_size=2) as session:
+        # the last batch only has one point cloud
+        pcds = [pcd, points, session.loader.format_points(points)]
+        results = session(pcds)
+        assert len(results) == 3
+        for result in results:
+            assert torch.allclose(result['boxes_3d'].tensor,
+                                  expected['boxes_3d'].tensor)
+            assert torch.allclose(result['scores_3d'], expected['scores_3d'])
+            assert torch.equal(result['labels_3d'], expected['labels_3d'])
+        assert session([]) == []
+
+
 def test_inference_multi_modality_detector():
     # these two multi-modality models both only have GPU implementations
     if not torch.cuda.is_available():
@@ -360,3 +388,44 @@ def test_single_gpu_test():
     assert bboxes_3d.tensor.shape[1] == 7
     assert scores_3d.shape[0] >= 0
     assert labels_3d.shape[0] >= 0
+
+    # streaming evaluation gives the same metrics as evaluating the results
+    evaluator = dataset.build_evaluator()
+    for sample_idx, result in enumerate(results):
+        evaluator.update(sample_idx, result)
+    stream_results = evaluator.compute()
+    expected = dataset.evaluate(results)
+    for key in expected:
+        assert np.isclose(stream_results[key], expected[key])
+
+    evaluator = dataset.build_evaluator()
+    assert single_gpu_test(model, data_loader, evaluator=evaluator) == []
+    assert 'mAP_0.25' in evaluator.compute()
+
+
+def test_multi_gpu_stream_test():
+
+    class ToySegmentor(torch.nn.Module):
+
+        def forward(self, return_loss, rescale, points):
+            return [dict(semantic_mask=p) for p in points]
+
+    gt_labels = [torch.randint(0, 3, (20, )) for _ in range(5)]
+    dataset = [dict(points=torch.randint(0, 3, (20, ))) for _ in range(5)]
+    # the last rank of 2 gets the samples 1 and 3, then the first sample
+    # repeated to pad the dataset
+    sampler = DistributedSampler(
+        dataset, num_replicas=2, rank=1, shuffle=False)
+    data_loader = DataLoader(dataset, batch_size=2, sampler=sampler)
+    label2cat = {0: 'a', 1: 'b', 2: 'c'}
+    evaluator = SegEvaluator(
+        label2cat, ignore_index=255, gt_loader=lambda i: gt_labels[i])
+    with patch('mmdet3d.apis.test.get_dist_info', return_value=(1, 2)):
+        multi_gpu_stream_test(ToySegmentor(), data_loader, evaluator)
+
+    expected = SegEvaluator(
+        label2cat, ignore_index=255, gt_loader=lambda i: gt_labels[i])
+    for sample_idx in [1, 3]:
+        expected.update(sample_idx,
+                        dict(semantic_mask=dataset[sample_idx]['points']))
+    assert np.array_equal(evaluator.hist, expected.hist)
@@ -237,3 +237,43 @@ def test_aligned_anchor_generator_per_cls():
             interval = int(expected_multi_level_shapes[i][j][0] / 2)
             assert single_level_anchor[j][:2 * interval:interval].allclose(
                 expected_grid_anchors[i][j])
+
+
+def test_anchor_generator_cache():
+    anchor_generator_cfg = dict(
+        type='Anchor3DRangeGenerator',
+        ranges=[[0, -39.68, -1.78, 70.4, 39.68, -1.78]],
+        sizes=[[3.9, 1.6, 1.56]],
+        rotations=[0, 1.57],
+        cache_size=2)
+    anchor_generator = build_prior_generator(anchor_generator_cfg)
+
+    anchors = anchor_generator.grid_anchors([(200, 176)], device='cpu')
+    cached_anchors = anchor_generator.grid_anchors([(200, 176)],
+                                                   device=torch.device('cpu'))
+    assert cached_anchors[0] is anchors[0]
+    assert torch.equal(
+        anchors[0],
+        anchor_generator._grid_anchors([(200, 176)], device='cpu')[0])
+
+    # the least recently used anchors are dropped
+    anchor_generator.grid_anchors([(100, 88)], device='cpu')
+    anchor_generator.grid_anchors([(50, 44)], device='cpu')
+    assert len(anchor_generator.cached_anchors) == 2
+    new_anchors = anchor_generator.grid_anchors([(200, 176)], device='cpu')
+    assert new_anchors[0] is not anchors[0]
+    assert torch.equal(new_anchors[0], anchors[0])
+
+    anchor_generator_cfg = dict(
+        type='AlignedAnchor3DRangeGeneratorPerCls',
+        ranges=[[-100, -100, -1.80, 100, 100, -1.80],
+                [-100, -100, -1.30, 100, 100, -1.30]],
+        sizes=[[1.76, 0.63, 1.44], [2.35, 0.96, 1.59]],
+        rotations=[0, 1.57],
+        reshape_out=False)
+    anchor_generator = build_prior_generator(anchor_generator_cfg)
+    anchors = anchor_generator.grid_anchors([(100, 100), (50, 50)],
+                                            device='cpu')
+    cached_anchors = anchor_generator.grid_anchors([(100, 100), (50, 50)],
+                                                   device='cpu')
+    assert cached_anchors[0] is anchors[0]
@@ -76,6 +76,134 @@ def test_circle_nms():
     assert np.all(keep == expected_keep)
 
 
+def test_batched_circle_nms():
+    from mmdet3d.core.post_processing import batched_circle_nms, circle_nms
+    np.random.seed(0)
+    centers, scores, groups, thresh, expected_keep = [], [], [], [], []
+    for group, (num_dets, group_thresh) in enumerate([(50, 0.175), (0, 1.0),
+                                                      (200, 4.0),
+                                                      (120, 12.0)]):
+        group_centers = np.random.rand(num_dets, 2).astype(np.float32) * 40
+        group_scores = np.random.rand(num_dets).astype(np.float32)
+        if num_dets > 0:
+            keep = circle_nms(
+                np.concatenate([group_centers, group_scores[:, None]], 1),
+                group_thresh,
+                post_max_size=83)
+            expected_keep += [i + len(scores) for i in keep]
+        centers.extend(group_centers)
+        scores.extend(group_scores)
+        groups += [group] * num_dets
+        thresh += [group_thresh] * num_dets
+
+    keep = batched_circle_nms(
+        torch.tensor(np.array(centers)),
+        torch.tensor(np.array(scores)),
+        torch.tensor(thresh, dtype=torch.float64),
+        groups=torch.tensor(groups),
+        post_max_size=83)
+    assert keep.tolist() == expected_keep
+
+    boxes = torch.tensor([[-11.1100, 2.1300,
+                           0.8823], [-11.2810, 2.2422, 0.8914],
+                          [-10.3966, -0.3198, 0.8643],
+                          [5.6518, 9.9791, 0.8271], [5.6621, 9.0422, 0.7753]])
+    keep = batched_circle_nms(boxes[:, :2], boxes[:, 2], 0.175)
+    assert keep.tolist() == [1, 2, 3, 4]
+    keep = batched_circle_nms(boxes[:, :2], boxes[:, 2], 1.0)
+    assert keep.tolist() == [1, 2, 3]
+    keep = batched_circle_nms(boxes[:0, :2], boxes[:0, 2], 1.0)
+    assert keep.shape == (0, )
+
+
+@pytest.mark.parametrize('device', [
+    'cpu',
+    pytest.param(
+        'cuda',
+        marks=pytest.mark.skipif(
+            not torch.cuda.is_available(), reason='requires CUDA support'))
+])
+@pytest.mark.parametrize('use_rotate_nms', [True, False])
+def test_batched_nms_bev(device, use_rotate_nms):
+    from mmdet3d.core.post_processing import (batched_nms_bev, nms_bev,
+                                              nms_normal_bev)
+    nms_func = nms_bev if use_rotate_nms else nms_normal_bev
+    torch.manual_seed(0)
+    boxes, scores, groups, expected_keep = [], [], [], []
+    for group, num_boxes in enumerate([60, 0, 200, 1]):
+        centers = torch.rand(num_boxes, 2) * 40 - 20
+        dims = torch.rand(num_boxes, 2) * 4 + 0.5
+        angles = torch.rand(num_boxes, 1) * 3
+        group_boxes = torch.cat(
+            [centers - dims / 2, centers + dims / 2, angles], dim=1).to(device)
+        group_scores = torch.rand(num_boxes).to(device)
+        if num_boxes > 0:
+            keep = nms_func(group_boxes, group_scores, 0.1)
+            expected_keep += [int(i) + len(scores) for i in keep]
+        boxes.extend(group_boxes)
+        scores.extend(group_scores)
+        groups += [group] * num_boxes
+
+    boxes, scores = torch.stack(boxes), torch.stack(scores)
+    groups = torch.tensor(groups, device=device)
+    keep = batched_nms_bev(
+        boxes, scores, 0.1, groups=groups, use_rotate_nms=use_rotate_nms)
+    assert keep.tolist() == expected_keep
+
+    # fall back to a NMS call per group
+    keep = batched_nms_bev(
+        boxes,
+        scores,
+        0.1,
+        groups=groups,
+        use_rotate_nms=use_rotate_nms,
+        max_iters=1)
+    assert keep.tolist() == expected_keep
+
+    keep = batched_nms_bev(boxes[:0], scores[:0], 0.1)
+    assert keep.shape == (0, )
+
+
+def test_box3d_multiclass_nms():
+    from mmcv import Config
+
+    from mmdet3d.core.post_processing import box3d_multiclass_nms, nms_bev
+    torch.manual_seed(0)
+    centers = torch.rand(100, 2) * 20
+    dims = torch.rand(100, 2) * 4 + 0.5
+    bboxes_for_nms = torch.cat(
+        [centers - dims / 2, centers + dims / 2,
+         torch.rand(100, 1)], dim=1)
+    bboxes = torch.rand(100, 7)
+    scores = torch.rand(100, 4)
+    dir_scores = torch.randint(0, 2, (100, ))
+    cfg = Config(dict(use_rotate_nms=True, nms_thr=0.2))
+
+    results = box3d_multiclass_nms(bboxes, bboxes_for_nms, scores, 0.3, 20,
+                                   cfg, dir_scores)
+    expected_inds, expected_labels = [], []
+    for i in range(3):
+        cls_inds = torch.nonzero(scores[:, i] > 0.3).view(-1)
+        keep = nms_bev(bboxes_for_nms[cls_inds], scores[cls_inds, i], 0.2)
+        expected_inds.append(cls_inds[keep])
+        expected_labels.append(torch.full_like(keep, i))
+    expected_inds = torch.cat(expected_inds)
+    expected_labels = torch.cat(expected_labels)
+    expected_scores = scores[expected_inds, expected_labels]
+    assert len(expected_inds) > 20
+    order = expected_scores.sort(descending=True)[1][:20]
+    assert len(results) == 4
+    assert torch.equal(results[0], bboxes[expected_inds[order]])
+    assert torch.equal(results[1], expected_scores[order])
+    assert torch.equal(results[2], expected_labels[order])
+    assert torch.equal(results[3], dir_scores[expected_inds[order]])
+
+    results = box3d_multiclass_nms(bboxes, bboxes_for_nms, scores, 1.0, 20,
+                                   cfg)
+    assert results[0].shape == (0, 7)
+    assert results[1].shape == results[2].shape == (0, )
+
+
 # copied from tests/test_ops/test_iou3d.py from mmcv<=1.5
 @pytest.mark.skipif(
     not torch.cuda.is_available(), reason='requires CUDA support')
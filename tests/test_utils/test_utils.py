@@ -3,7 +3,9 @@ import numpy as np
 import pytest
 import torch
 
-from mmdet3d.core import array_converter, draw_heatmap_gaussian, points_img2cam
+from mmdet3d.core import (TensorCache, array_converter, draw_heatmap_gaussian,
+                          draw_heatmap_gaussian_batch, gaussian_radius,
+                          points_img2cam)
 from mmdet3d.core.bbox import CameraInstance3DBoxes
 from mmdet3d.models.utils import (filter_outside_objs, get_edge_indices,
                                   get_keypoints, handle_proj_objs)
@@ -16,6 +18,26 @@ def test_gaussian():
     draw_heatmap_gaussian(heatmap, ct_int, radius)
     assert torch.isclose(torch.sum(heatmap), torch.tensor(4.3505), atol=1e-3)
 
+    # draw the gaussians of several objects, some of them overlapping or
+    # across the borders of the heatmaps
+    heatmaps = torch.zeros((3, 32, 40))
+    map_inds = torch.tensor([0, 0, 1, 2, 2, 2])
+    centers = torch.tensor(
+        [[5, 5], [7, 6], [0, 31], [39, 0], [20, 10], [20, 10]],
+        dtype=torch.int32)
+    radius = torch.tensor([2, 4, 3, 6, 1, 5])
+    expected = torch.zeros((3, 32, 40))
+    for map_ind, center, r in zip(map_inds, centers, radius):
+        draw_heatmap_gaussian(expected[map_ind], center, int(r))
+    draw_heatmap_gaussian_batch(heatmaps, map_inds, centers, radius)
+    assert torch.equal(heatmaps, expected)
+
+    # radii of several objects at once
+    sizes = torch.tensor([[3.5, 1.2], [10.0, 4.0], [0.8, 0.6]])
+    radius = gaussian_radius((sizes[:, 0], sizes[:, 1]), min_overlap=0.1)
+    for size, r in zip(sizes, radius):
+        assert r == gaussian_radius(size, min_overlap=0.1)
+
 
 def test_array_converter():
     # to torch
@@ -183,6 +205,36 @@ def test_array_converter():
                                                [True, np.array([3.0])])
 
 
+def test_tensor_cache():
+    calls = []
+
+    def double(tensor, offset):
+        calls.append(offset)
+        return tensor * 2 + offset
+
+    cache = TensorCache(max_size=2)
+    tensor = torch.rand(4, 7)
+    value = cache.get(tensor, double, 1)
+    assert torch.allclose(value, tensor * 2 + 1)
+    assert cache.get(tensor.view(4, 7), double, 1) is value
+    assert len(calls) == 1
+
+    # other arguments, layouts and contents are other keys
+    cache.get(tensor, double, 2)
+    cache.get(tensor.t(), double, 1)
+    assert len(calls) == 3
+    tensor.add_(1)
+    assert torch.allclose(cache.get(tensor, double, 1), tensor * 2 + 1)
+    assert len(calls) == 4
+    assert len(cache._cache) == 2
+
+    # tensors that require grad are not cached
+    tensor = torch.rand(4, 7, requires_grad=True)
+    cache.get(tensor, double, 1)
+    cache.get(tensor, double, 1)
+    assert len(calls) == 6
+
+
 def test_points_img2cam():
     points = torch.tensor([[0.5764, 0.9109, 0.7576], [0.6656, 0.5498, 0.9813]])
     cam2img = torch.tensor([[700., 0., 450., 0.], [0., 700., 200., 0.],
@@ -0,0 +1,113 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import copy
+import multiprocessing as mp
+import os
+import os.path as osp
+import tempfile
+import time
+
+import mmcv
+import numpy as np
+
+from mmdet3d.datasets import dump_info_store, load_infos
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the startup time and the worker memory of '
+        '.pkl infos and memory-mapped info stores')
+    parser.add_argument('info', help='.pkl info file')
+    parser.add_argument(
+        '--store',
+        help='info store converted from the info file, it is converted to a '
+        'temporary file if not specified')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='number of forked workers, as dataloader workers')
+    args = parser.parse_args()
+    return args
+
+
+def memory_usage():
+    """Get the memory of the current process in MB.
+
+    ``Pss`` splits the shared pages among the processes mapping them and
+    ``Private`` only counts the pages owned by the process.
+    """
+    usage = dict()
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) == 3 and fields[2] == 'kB':
+                usage[fields[0][:-1]] = int(fields[1]) / 1024
+    return dict(
+        Rss=usage['Rss'],
+        Pss=usage['Pss'],
+        Private=usage['Private_Clean'] + usage['Private_Dirty'])
+
+
+def worker(infos, queue):
+    start_time = time.perf_counter()
+    for i in range(len(infos)):
+        # touch every object of the info as the data pipeline does
+        copy.deepcopy(infos[i])
+    queue.put((time.perf_counter() - start_time, memory_usage()))
+
+
+def run(name, load_fn, num_workers):
+    start_time = time.perf_counter()
+    data = load_fn()
+    infos = data['infos'] if isinstance(data, dict) else data
+    startup_time = time.perf_counter() - start_time
+
+    # workers are forked as the dataloader does on Linux
+    ctx = mp.get_context('fork')
+    queue = ctx.Queue()
+    workers = [
+        ctx.Process(target=worker, args=(infos, queue))
+        for _ in range(num_workers)
+    ]
+    for p in workers:
+        p.start()
+    results = [queue.get() for _ in workers]
+    for p in workers:
+        p.join()
+
+    epoch_time = np.mean([elapsed for elapsed, _ in results])
+    print(f'[{name}] startup: {startup_time:.3f} s, '
+          f'epoch per worker: {epoch_time:.3f} s')
+    main_usage = memory_usage()
+    print(f'[{name}] main process: ' +
+          ', '.join(f'{k} {v:.1f} MB' for k, v in main_usage.items()))
+    for key in ['Rss', 'Pss', 'Private']:
+        values = [usage[key] for _, usage in results]
+        print(f'[{name}] workers {key}: mean {np.mean(values):.1f} MB, '
+              f'total {np.sum(values):.1f} MB')
+
+
+def main():
+    args = parse_args()
+
+    tmp_dir = None
+    store_file = args.store
+    if store_file is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        store_file = osp.join(tmp_dir.name, 'infos.mmap')
+        start_time = time.perf_counter()
+        dump_info_store(mmcv.load(args.info, file_format='pkl'), store_file)
+        print(f'conversion: {time.perf_counter() - start_time:.3f} s')
+    print(f'pkl: {os.path.getsize(args.info) / 2**20:.1f} MB, '
+          f'store: {os.path.getsize(store_file) / 2**20:.1f} MB')
+
+    run('pkl', lambda: mmcv.load(args.info, file_format='pkl'), args.workers)
+    run('store', lambda: load_infos(store_file), args.workers)
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import mmcv
+import numpy as np
+
+from mmdet3d.core.evaluation.kitti_utils.eval import get_split_parts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the CPU and GPU rotated IoU backends used by '
+        'KITTI evaluation')
+    parser.add_argument(
+        'info', help='KITTI info file, e.g. data/kitti/kitti_infos_val.pkl')
+    parser.add_argument(
+        '--result',
+        help='KITTI-format detection annos (the pkl written through '
+        '`pklfile_prefix`). The ground truths are used as detections if '
+        'not specified')
+    parser.add_argument(
+        '--num-parts',
+        type=int,
+        default=200,
+        help='number of parts used to chunk the split, as in `eval_class`')
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='number of timed runs')
+    parser.add_argument(
+        '--backends',
+        nargs='+',
+        default=['cpu', 'gpu'],
+        choices=['cpu', 'gpu'],
+        help='backends to benchmark')
+    args = parser.parse_args()
+    return args
+
+
+def build_parts(gt_annos, dt_annos, num_parts):
+    """Concatenate the camera boxes of each part in the same way as
+    ``calculate_iou_partly`` does for the 3d metric."""
+
+    def to_boxes(annos):
+        loc = np.concatenate([a['location'] for a in annos], 0)
+        dims = np.concatenate([a['dimensions'] for a in annos], 0)
+        rots = np.concatenate([a['rotation_y'] for a in annos], 0)
+        return np.concatenate([loc, dims, rots[..., np.newaxis]], axis=1)
+
+    num_parts = min(num_parts, len(gt_annos))
+    parts = []
+    example_idx = 0
+    for num_part in get_split_parts(len(gt_annos), num_parts):
+        parts.append((to_boxes(gt_annos[example_idx:example_idx + num_part]),
+                      to_boxes(dt_annos[example_idx:example_idx + num_part])))
+        example_idx += num_part
+    return parts
+
+
+def run(rotate_iou_fn, parts):
+    ious = []
+    for gt_boxes, dt_boxes in parts:
+        # bev overlap
+        ious.append(
+            rotate_iou_fn(gt_boxes[:, [0, 2, 3, 5, 6]],
+                          dt_boxes[:, [0, 2, 3, 5, 6]], -1))
+        # intersection used by the 3d overlap
+        ious.append(
+            rotate_iou_fn(gt_boxes[:, [0, 2, 3, 5, 6]],
+                          dt_boxes[:, [0, 2, 3, 5, 6]], 2))
+    return ious
+
+
+def main():
+    args = parse_args()
+
+    gt_annos = [info['annos'] for info in mmcv.load(args.info)]
+    dt_annos = mmcv.load(args.result) if args.result else gt_annos
+    assert len(gt_annos) == len(dt_annos)
+    parts = build_parts(gt_annos, dt_annos, args.num_parts)
+    num_pairs = sum(gt.shape[0] * dt.shape[0] for gt, dt in parts)
+    print(f'{len(gt_annos)} samples, {len(parts)} parts, '
+          f'{num_pairs} box pairs per metric')
+
+    outputs = dict()
+    for backend in args.backends:
+        if backend == 'gpu':
+            from mmdet3d.core.evaluation.kitti_utils.rotate_iou import \
+                rotate_iou_gpu_eval as rotate_iou_fn
+        else:
+            from mmdet3d.core.evaluation.kitti_utils.rotate_iou_cpu import \
+                rotate_iou_cpu_eval as rotate_iou_fn
+        # the first run includes numba compilation
+        start_time = time.perf_counter()
+        outputs[backend] = run(rotate_iou_fn, parts)
+        warmup_time = time.perf_counter() - start_time
+
+        elapsed = []
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            run(rotate_iou_fn, parts)
+            elapsed.append(time.perf_counter() - start_time)
+        print(
+            f'[{backend}] first run (with compilation): {warmup_time:.3f} s, '
+            f'mean of {args.repeat} runs: {np.mean(elapsed):.3f} s, '
+            f'{num_pairs * 2 / np.mean(elapsed) / 1e6:.2f} M pairs / s')
+
+    if len(outputs) == 2:
+        max_diff = max(
+            np.abs(cpu_iou - gpu_iou).max(initial=0)
+            for cpu_iou, gpu_iou in zip(outputs['cpu'], outputs['gpu']))
+        print(f'max abs difference between backends: {max_diff:.3e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import os
+import platform
+import resource
+import time
+
+import mmcv
+import numpy as np
+import torch
+from mmcv import Config, DictAction
+from torch.utils.data import Subset
+
+import mmdet3d
+from mmdet3d.datasets import build_dataloader, build_dataset
+from mmdet3d.datasets.pipelines import Compose
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the data pipeline of a config on CPU')
+    parser.add_argument('config', help='config file path')
+    parser.add_argument(
+        '--split',
+        choices=['train', 'val', 'test'],
+        default='train',
+        help='dataset config to benchmark, i.e. `cfg.data[split]`')
+    parser.add_argument(
+        '--samples', type=int, default=200, help='samples to benchmark')
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=5,
+        help='samples run before timing the transforms, e.g. to compile '
+        'the numba functions')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        default=[0, 2, 4, 8],
+        help='values of `workers_per_gpu` to measure the throughput with')
+    parser.add_argument(
+        '--samples-per-gpu',
+        type=int,
+        help='batch size of the dataloader, defaults to '
+        '`cfg.data.samples_per_gpu`')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--out', help='output json file of the results')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file. If the value to '
+        'be overwritten is a list, it should be like key="[a,b]" or key=a,b '
+        'It also allows nested list/tuple values, e.g. key="[(a,b),(c,d)]" '
+        'Note that the quotation marks are necessary and that no white space '
+        'is allowed.')
+    args = parser.parse_args()
+    return args
+
+
+class TimedTransform:
+    """Wrap a transform to record its latency in seconds.
+
+    Args:
+        transform (callable): Transform to time.
+    """
+
+    def __init__(self, transform):
+        self.transform = transform
+        self.times = []
+
+    def __call__(self, results):
+        start_time = time.perf_counter()
+        results = self.transform(results)
+        self.times.append(time.perf_counter() - start_time)
+        return results
+
+    def __repr__(self):
+        return repr(self.transform)
+
+
+def find_pipelines(dataset):
+    """Find the pipelines of a dataset and of its wrapped datasets."""
+    if isinstance(getattr(dataset, 'pipeline', None), Compose):
+        return [dataset.pipeline]
+    if hasattr(dataset, 'datasets'):
+        return sum([find_pipelines(d) for d in dataset.datasets], [])
+    if hasattr(dataset, 'dataset'):
+        return find_pipelines(dataset.dataset)
+    return []
+
+
+def summarize(times):
+    """Latency statistics in milliseconds."""
+    times = np.array(times) * 1000
+    if len(times) == 0:
+        return dict(count=0)
+    return dict(
+        count=len(times),
+        mean=float(times.mean()),
+        p50=float(np.percentile(times, 50)),
+        p90=float(np.percentile(times, 90)),
+        p99=float(np.percentile(times, 99)),
+        max=float(times.max()))
+
+
+def peak_rss(pid='self'):
+    """Peak resident memory of a process in MB, read from /proc."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def benchmark_transforms(dataset, indices, warmup):
+    """Run the samples in the main process and time every transform."""
+    timed_transforms = []
+    for pipeline in find_pipelines(dataset):
+        pipeline.transforms = [TimedTransform(t) for t in pipeline.transforms]
+        timed_transforms.append(pipeline.transforms)
+
+    sample_times = []
+    for i, idx in enumerate(indices):
+        if i == warmup:
+            for transforms in timed_transforms:
+                for t in transforms:
+                    t.times.clear()
+        start_time = time.perf_counter()
+        dataset[idx]
+        if i >= warmup:
+            sample_times.append(time.perf_counter() - start_time)
+
+    # the transforms at the same position of the pipelines of concatenated
+    # datasets are merged
+    stats = []
+    for pos in range(max((len(t) for t in timed_transforms), default=0)):
+        transforms = [t[pos] for t in timed_transforms if pos < len(t)]
+        stats.append(
+            dict(
+                index=pos,
+                type=type(transforms[0].transform).__name__,
+                repr=repr(transforms[0]),
+                latency_ms=summarize(sum([t.times for t in transforms], []))))
+
+    for pipeline, transforms in zip(find_pipelines(dataset), timed_transforms):
+        pipeline.transforms = [t.transform for t in transforms]
+    return stats, summarize(sample_times)
+
+
+def benchmark_throughput(dataset, indices, samples_per_gpu, workers_per_gpu,
+                         seed):
+    """Measure the samples per second of a dataloader."""
+    data_loader = build_dataloader(
+        Subset(dataset, indices),
+        samples_per_gpu,
+        workers_per_gpu,
+        dist=False,
+        shuffle=False,
+        seed=seed)
+    num_batches = len(data_loader)
+    start_time = time.perf_counter()
+    data_iter = iter(data_loader)
+    next(data_iter)
+    first_batch_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for _ in range(num_batches - 1):
+        next(data_iter)
+    elapsed = time.perf_counter() - start_time
+    # read the memory of the workers before they exit
+    workers_rss = [peak_rss(w.pid) for w in getattr(data_iter, '_workers', [])]
+    workers_rss = [rss for rss in workers_rss if rss is not None]
+    del data_iter
+
+    num_timed = (num_batches - 1) * samples_per_gpu
+    return dict(
+        workers_per_gpu=workers_per_gpu,
+        samples_per_gpu=samples_per_gpu,
+        first_batch_s=first_batch_time,
+        samples_per_s=num_timed / elapsed if num_timed > 0 else None,
+        worker_peak_rss_mb=dict(
+            max=max(workers_rss) if workers_rss else None,
+            total=sum(workers_rss) if workers_rss else None))
+
+
+def main():
+    args = parse_args()
+
+    cfg = Config.fromfile(args.config)
+    if args.cfg_options is not None:
+        cfg.merge_from_dict(args.cfg_options)
+    data_cfg = cfg.data[args.split]
+    if args.split != 'train':
+        data_cfg.test_mode = True
+    samples_per_gpu = args.samples_per_gpu or cfg.data.samples_per_gpu
+
+    # the dataloader workers use a single thread as well
+    torch.set_num_threads(1)
+    np.random.seed(args.seed)
+    dataset = build_dataset(data_cfg)
+    num_samples = min(args.samples, len(dataset))
+    indices = np.random.RandomState(args.seed).permutation(
+        len(dataset))[:num_samples].tolist()
+
+    print(f'Timing the transforms on {num_samples} samples')
+    transforms, sample = benchmark_transforms(dataset, indices, args.warmup)
+    for stats in transforms:
+        latency = stats['latency_ms']
+        if latency['count'] == 0:
+            continue
+        print(f'{stats["index"]:>3} {stats["type"]:<32} '
+              f'p50 {latency["p50"]:8.3f} ms  p90 {latency["p90"]:8.3f} ms  '
+              f'p99 {latency["p99"]:8.3f} ms')
+    if sample['count'] > 0:
+        print(f'    {"sample":<32} p50 {sample["p50"]:8.3f} ms  '
+              f'p90 {sample["p90"]:8.3f} ms  p99 {sample["p99"]:8.3f} ms')
+
+    throughput = []
+    for workers_per_gpu in args.workers:
+        np.random.seed(args.seed)
+        result = benchmark_throughput(dataset, indices, samples_per_gpu,
+                                      workers_per_gpu, args.seed)
+        throughput.append(result)
+        samples_per_s = result['samples_per_s'] or float('nan')
+        print(f'workers_per_gpu={workers_per_gpu}: '
+              f'{samples_per_s:.1f} samples/s, '
+              f'first batch {result["first_batch_s"]:.2f} s')
+
+    results = dict(
+        config=args.config,
+        split=args.split,
+        num_samples=num_samples,
+        warmup=args.warmup,
+        transforms=transforms,
+        sample_latency_ms=sample,
+        throughput=throughput,
+        # ru_maxrss is in KB on Linux
+        main_peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss /
+        1024,
+        env=dict(
+            mmdet3d=mmdet3d.__version__,
+            torch=torch.__version__,
+            numpy=np.__version__,
+            python=platform.python_version(),
+            cpu_count=os.cpu_count()))
+    print(f'main process peak RSS: {results["main_peak_rss_mb"]:.1f} MB')
+    if args.out is not None:
+        mmcv.dump(results, args.out, indent=2)
+        print(f'results are written to {args.out}')
+    else:
+        print(mmcv.dump(results, file_format='json', indent=2))
+
+
+if __name__ == '__main__':
+    main()
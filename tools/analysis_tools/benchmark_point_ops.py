@@ -0,0 +1,148 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numba
+import numpy as np
+import torch
+
+from mmdet3d.ops import ball_query, furthest_point_sample, knn, three_nn
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the CPU point operators against brute-force '
+        'torch implementations')
+    parser.add_argument(
+        '--points',
+        help='point cloud `.bin` file of float32 values. Uniform random '
+        'points in a 10 m cube are used if not specified')
+    parser.add_argument(
+        '--load-dim',
+        type=int,
+        default=6,
+        help='number of values per point in the `.bin` file')
+    parser.add_argument(
+        '--num-points',
+        type=int,
+        default=20000,
+        help='number of points, the point cloud is sampled or repeated to '
+        'this size')
+    parser.add_argument(
+        '--batch-size', type=int, default=1, help='number of point clouds')
+    parser.add_argument(
+        '--num-centers',
+        type=int,
+        default=2048,
+        help='number of points sampled by furthest point sampling, used as '
+        'the centers of the neighbour queries')
+    parser.add_argument(
+        '--radius', type=float, default=0.2, help='radius of the ball query')
+    parser.add_argument(
+        '--sample-num',
+        type=int,
+        default=64,
+        help='number of neighbours of the ball query')
+    parser.add_argument(
+        '--k', type=int, default=16, help='number of neighbours of the knn')
+    parser.add_argument(
+        '--threads',
+        type=int,
+        nargs='+',
+        help='numbers of numba threads to measure, defaults to 1 and all '
+        'the threads')
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='number of timed runs')
+    args = parser.parse_args()
+    return args
+
+
+def square_dist(xyz, center_xyz):
+    return torch.cdist(center_xyz, xyz)**2
+
+
+def furthest_point_sample_torch(xyz, num_points):
+    batch_size, num_total = xyz.shape[:2]
+    idx = xyz.new_zeros((batch_size, num_points), dtype=torch.long)
+    min_dist = xyz.new_full((batch_size, num_total), 1e10)
+    batch_inds = torch.arange(batch_size)
+    for i in range(1, num_points):
+        last = xyz[batch_inds, idx[:, i - 1]].unsqueeze(1)
+        min_dist = torch.min(min_dist, ((xyz - last)**2).sum(-1))
+        idx[:, i] = min_dist.argmax(-1)
+    return idx
+
+
+def ball_query_torch(radius, sample_num, xyz, center_xyz):
+    in_ball = square_dist(xyz, center_xyz) < radius**2
+    # the first neighbours by index
+    order = torch.arange(xyz.shape[1], 0, -1).expand_as(in_ball)
+    return (in_ball * order).topk(sample_num, dim=-1)[1]
+
+
+def knn_torch(k, xyz, center_xyz):
+    return square_dist(xyz, center_xyz).topk(
+        k, dim=-1, largest=False)[1].transpose(2, 1)
+
+
+def three_nn_torch(target, source):
+    dist, idx = square_dist(source, target).topk(3, dim=-1, largest=False)
+    return dist.sqrt(), idx
+
+
+def measure(func, repeat):
+    func()
+    elapsed = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - start_time)
+    return np.mean(elapsed) * 1000
+
+
+def main():
+    args = parse_args()
+
+    rng = np.random.RandomState(0)
+    if args.points is not None:
+        points = np.fromfile(args.points, dtype=np.float32)
+        points = points.reshape(-1, args.load_dim)[:, :3]
+        points = points[rng.choice(points.shape[0], args.num_points)]
+    else:
+        points = rng.uniform(0, 10, (args.num_points, 3)).astype(np.float32)
+    xyz = torch.from_numpy(points).expand(args.batch_size, -1, -1)
+    xyz = xyz.contiguous()
+    center_idx = furthest_point_sample(xyz, args.num_centers).long()
+    center_xyz = torch.stack([xyz[b, center_idx[b]] for b in range(len(xyz))])
+    radius, sample_num = args.radius, args.sample_num
+
+    ops = [
+        ('furthest_point_sample',
+         lambda: furthest_point_sample(xyz, args.num_centers),
+         lambda: furthest_point_sample_torch(xyz, args.num_centers)),
+        ('ball_query',
+         lambda: ball_query(0, radius, sample_num, xyz, center_xyz),
+         lambda: ball_query_torch(radius, sample_num, xyz, center_xyz)),
+        ('knn', lambda: knn(args.k, xyz, center_xyz),
+         lambda: knn_torch(args.k, xyz, center_xyz)),
+        ('three_nn', lambda: three_nn(xyz, center_xyz),
+         lambda: three_nn_torch(xyz, center_xyz)),
+    ]
+    threads = args.threads or sorted({1, numba.config.NUMBA_NUM_THREADS})
+    print(f'{args.batch_size} x {args.num_points} points, '
+          f'{args.num_centers} centers, {torch.get_num_threads()} torch '
+          'threads')
+
+    for name, cpu_op, torch_op in ops:
+        torch_time = measure(torch_op, args.repeat)
+        for num_threads in threads:
+            numba.set_num_threads(num_threads)
+            # the untimed first run includes the numba compilation
+            cpu_time = measure(cpu_op, args.repeat)
+            print(f'{name}, {num_threads} threads: {cpu_time:.2f} ms, '
+                  f'brute-force torch {torch_time:.2f} ms '
+                  f'({torch_time / cpu_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numba
+import numpy as np
+
+from mmdet3d.core.voxel.voxel_generator import points_to_voxel
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the numba voxelization of `VoxelGenerator` '
+        'across grid sizes and numbers of threads')
+    parser.add_argument(
+        '--points',
+        help='point cloud `.bin` file of float32 values. Uniform random '
+        'points in the range are used if not specified')
+    parser.add_argument(
+        '--load-dim',
+        type=int,
+        default=5,
+        help='number of values per point in the `.bin` file')
+    parser.add_argument(
+        '--num-points',
+        type=int,
+        default=300000,
+        help='number of random points')
+    parser.add_argument(
+        '--point-cloud-range',
+        type=float,
+        nargs=6,
+        default=[-51.2, -51.2, -5.0, 51.2, 51.2, 3.0],
+        help='point cloud range (x_min, y_min, z_min, x_max, y_max, z_max)')
+    parser.add_argument(
+        '--voxel-sizes',
+        type=float,
+        nargs='+',
+        default=[0.2, 0.1, 0.075, 0.05],
+        help='sizes of the cubic voxels, one grid per size')
+    parser.add_argument(
+        '--max-points', type=int, default=10, help='max points per voxel')
+    parser.add_argument(
+        '--max-voxels', type=int, default=120000, help='max voxels')
+    parser.add_argument(
+        '--threads',
+        type=int,
+        nargs='+',
+        help='numbers of numba threads to measure, defaults to 1 and all '
+        'the threads')
+    parser.add_argument(
+        '--repeat', type=int, default=10, help='number of timed runs')
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+
+    pc_range = np.array(args.point_cloud_range, dtype=np.float32)
+    if args.points is not None:
+        points = np.fromfile(args.points, dtype=np.float32)
+        points = points.reshape(-1, args.load_dim)
+    else:
+        rng = np.random.RandomState(0)
+        points = rng.uniform(
+            np.append(pc_range[:3], 0), np.append(pc_range[3:], 1),
+            (args.num_points, 4)).astype(np.float32)
+    threads = args.threads or sorted({1, numba.config.NUMBA_NUM_THREADS})
+    print(f'{points.shape[0]} points, {len(threads)} thread settings')
+
+    for voxel_size in args.voxel_sizes:
+        voxel_size = np.full((3, ), voxel_size, dtype=np.float32)
+        grid_size = np.round((pc_range[3:] - pc_range[:3]) / voxel_size)
+        # memory of the int32 lookup array of the whole grid that a dense
+        # implementation allocates on every call
+        dense_mb = grid_size.prod() * 4 / 1024**2
+        for num_threads in threads:
+            numba.set_num_threads(num_threads)
+            # the first run includes numba compilation
+            voxels, _, _ = points_to_voxel(points, voxel_size, pc_range,
+                                           args.max_points, True,
+                                           args.max_voxels)
+            elapsed = []
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                points_to_voxel(points, voxel_size, pc_range, args.max_points,
+                                True, args.max_voxels)
+                elapsed.append(time.perf_counter() - start_time)
+            elapsed = np.array(elapsed) * 1000
+            print(f'grid {grid_size.astype(np.int64).tolist()} '
+                  f'(dense lookup {dense_mb:.0f} MB), '
+                  f'{num_threads} threads: {voxels.shape[0]} voxels, '
+                  f'mean {elapsed.mean():.2f} ms, '
+                  f'p50 {np.percentile(elapsed, 50):.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
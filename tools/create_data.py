@@ -14,7 +14,8 @@ def kitti_data_prep(root_path,
                     info_prefix,
                     version,
                     out_dir,
-                    with_plane=False):
+                    with_plane=False,
+                    packed_gt_database=False):
     """Prepare data related to Kitti dataset.
 
     Related data consists of '.pkl' files recording basic infos,
@@ -27,6 +28,8 @@ def kitti_data_prep(root_path,
         out_dir (str): Output directory of the groundtruth database info.
         with_plane (bool, optional): Whether to use plane information.
             Default: False.
+        packed_gt_database (bool, optional): Whether to pack the points of
+            the groundtruth database into one file. Default: False.
     """
     kitti.create_kitti_info_file(root_path, info_prefix, with_plane)
     kitti.create_reduced_point_cloud(root_path, info_prefix)
@@ -48,7 +51,8 @@ def kitti_data_prep(root_path,
         f'{out_dir}/{info_prefix}_infos_train.pkl',
         relative_path=False,
         mask_anno_path='instances_train.json',
-        with_mask=(version == 'mask'))
+        with_mask=(version == 'mask'),
+        packed=packed_gt_database)
 
 
 def nuscenes_data_prep(root_path,
@@ -56,7 +60,8 @@ def nuscenes_data_prep(root_path,
                        version,
                        dataset_name,
                        out_dir,
-                       max_sweeps=10):
+                       max_sweeps=10,
+                       packed_gt_database=False):
     """Prepare data related to nuScenes dataset.
 
     Related data consists of '.pkl' files recording basic infos,
@@ -70,6 +75,8 @@ def nuscenes_data_prep(root_path,
         out_dir (str): Output directory of the groundtruth database info.
         max_sweeps (int, optional): Number of input consecutive frames.
             Default: 10
+        packed_gt_database (bool, optional): Whether to pack the points of
+            the groundtruth database into one file. Default: False.
     """
     nuscenes_converter.create_nuscenes_infos(
         root_path, info_prefix, version=version, max_sweeps=max_sweeps)
@@ -86,8 +93,12 @@ def nuscenes_data_prep(root_path,
         root_path, info_train_path, version=version)
     nuscenes_converter.export_2d_annotation(
         root_path, info_val_path, version=version)
-    create_groundtruth_database(dataset_name, root_path, info_prefix,
-                                f'{out_dir}/{info_prefix}_infos_train.pkl')
+    create_groundtruth_database(
+        dataset_name,
+        root_path,
+        info_prefix,
+        f'{out_dir}/{info_prefix}_infos_train.pkl',
+        packed=packed_gt_database)
 
 
 def lyft_data_prep(root_path, info_prefix, version, max_sweeps=10):
@@ -152,7 +163,8 @@ def waymo_data_prep(root_path,
                     version,
                     out_dir,
                     workers,
-                    max_sweeps=5):
+                    max_sweeps=5,
+                    packed_gt_database=False):
     """Prepare the info file for waymo dataset.
 
     Args:
@@ -163,6 +175,8 @@ def waymo_data_prep(root_path,
         max_sweeps (int, optional): Number of input consecutive frames.
             Default: 5. Here we store pose information of these frames
             for later use.
+        packed_gt_database (bool, optional): Whether to pack the points of
+            the groundtruth database into one file. Default: False.
     """
     from tools.data_converter import waymo_converter as waymo
 
@@ -191,7 +205,8 @@ def waymo_data_prep(root_path,
         f'{out_dir}/{info_prefix}_infos_train.pkl',
         relative_path=False,
         with_mask=False,
-        num_worker=workers).create()
+        num_worker=workers,
+        packed=packed_gt_database).create()
 
 
 parser = argparse.ArgumentParser(description='Data converter arg parser')
@@ -223,6 +238,11 @@ parser.add_argument(
     default='./data/kitti',
     required=False,
     help='name of info pkl')
+parser.add_argument(
+    '--packed-gt-database',
+    action='store_true',
+    help='Whether to pack the points of the groundtruth database into one '
+    'memory-mapped file instead of one file per object.')
 parser.add_argument('--extra-tag', type=str, default='kitti')
 parser.add_argument(
     '--workers', type=int, default=4, help='number of threads to be used')
@@ -235,7 +255,8 @@ if __name__ == '__main__':
             info_prefix=args.extra_tag,
             version=args.version,
             out_dir=args.out_dir,
-            with_plane=args.with_plane)
+            with_plane=args.with_plane,
+            packed_gt_database=args.packed_gt_database)
     elif args.dataset == 'nuscenes' and args.version != 'v1.0-mini':
         train_version = f'{args.version}-trainval'
         nuscenes_data_prep(
@@ -244,7 +265,8 @@ if __name__ == '__main__':
             version=train_version,
             dataset_name='NuScenesDataset',
             out_dir=args.out_dir,
-            max_sweeps=args.max_sweeps)
+            max_sweeps=args.max_sweeps,
+            packed_gt_database=args.packed_gt_database)
         test_version = f'{args.version}-test'
         nuscenes_data_prep(
             root_path=args.root_path,
@@ -252,7 +274,8 @@ if __name__ == '__main__':
             version=test_version,
             dataset_name='NuScenesDataset',
             out_dir=args.out_dir,
-            max_sweeps=args.max_sweeps)
+            max_sweeps=args.max_sweeps,
+            packed_gt_database=args.packed_gt_database)
     elif args.dataset == 'nuscenes' and args.version == 'v1.0-mini':
         train_version = f'{args.version}'
         nuscenes_data_prep(
@@ -261,7 +284,8 @@ if __name__ == '__main__':
             version=train_version,
             dataset_name='NuScenesDataset',
             out_dir=args.out_dir,
-            max_sweeps=args.max_sweeps)
+            max_sweeps=args.max_sweeps,
+            packed_gt_database=args.packed_gt_database)
     elif args.dataset == 'lyft':
         train_version = f'{args.version}-train'
         lyft_data_prep(
@@ -282,7 +306,8 @@ if __name__ == '__main__':
             version=args.version,
             out_dir=args.out_dir,
             workers=args.workers,
-            max_sweeps=args.max_sweeps)
+            max_sweeps=args.max_sweeps,
+            packed_gt_database=args.packed_gt_database)
     elif args.dataset == 'scannet':
         scannet_data_prep(
             root_path=args.root_path,
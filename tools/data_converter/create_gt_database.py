@@ -13,6 +13,9 @@ from mmdet3d.core.bbox import box_np_ops as box_np_ops
 from mmdet3d.datasets import build_dataset
 from mmdet.core.evaluation.bbox_overlaps import bbox_overlaps
 
+# name of the file holding the points of all the objects in a packed database
+PACKED_FILENAME = 'packed_points.bin'
+
 
 def _poly2mask(mask_ann, img_h, img_w):
     if isinstance(mask_ann, list):
@@ -120,7 +123,8 @@ def create_groundtruth_database(dataset_class_name,
                                 lidar_only=False,
                                 bev_only=False,
                                 coors_range=None,
-                                with_mask=False):
+                                with_mask=False,
+                                packed=False):
     """Given the raw data, generate the ground truth database.
 
     Args:
@@ -141,6 +145,11 @@ def create_groundtruth_database(dataset_class_name,
             Default: True.
         with_mask (bool, optional): Whether to use mask.
             Default: False.
+        packed (bool, optional): Whether to pack the points of all the
+            objects into one file, ``packed_points.bin`` in the database
+            directory, instead of writing one file per object. The infos
+            then record the offset of each object in the file.
+            Default: False.
     """
     print(f'Create GT Database of {dataset_class_name}')
     dataset_cfg = dict(
@@ -225,6 +234,9 @@ def create_groundtruth_database(dataset_class_name,
                                      f'{info_prefix}_dbinfos_train.pkl')
     mmcv.mkdir_or_exist(database_save_path)
     all_db_infos = dict()
+    if packed:
+        packed_file = open(osp.join(database_save_path, PACKED_FILENAME), 'wb')
+        packed_offset = 0
     if with_mask:
         coco = COCO(osp.join(data_path, mask_anno_path))
         imgIds = coco.getImgIds()
@@ -304,8 +316,9 @@ def create_groundtruth_database(dataset_class_name,
                 mmcv.imwrite(object_img_patches[i], img_patch_path)
                 mmcv.imwrite(object_masks[i], mask_patch_path)
 
-            with open(abs_filepath, 'w') as f:
-                gt_points.tofile(f)
+            if not packed:
+                with open(abs_filepath, 'w') as f:
+                    gt_points.tofile(f)
 
             if (used_classes is None) or names[i] in used_classes:
                 db_info = {
@@ -317,6 +330,12 @@ def create_groundtruth_database(dataset_class_name,
                     'num_points_in_gt': gt_points.shape[0],
                     'difficulty': difficulty[i],
                 }
+                if packed:
+                    db_info['path'] = osp.join(f'{info_prefix}_gt_database',
+                                               PACKED_FILENAME)
+                    db_info['offset'] = packed_offset
+                    gt_points.astype(np.float32).tofile(packed_file)
+                    packed_offset += gt_points.shape[0]
                 local_group_id = group_ids[i]
                 # if local_group_id >= 0:
                 if local_group_id not in group_dict:
@@ -332,6 +351,9 @@ def create_groundtruth_database(dataset_class_name,
                 else:
                     all_db_infos[names[i]] = [db_info]
 
+    if packed:
+        packed_file.close()
+
     for k, v in all_db_infos.items():
         print(f'load {len(v)} {k} database infos')
 
@@ -364,6 +386,11 @@ class GTDatabaseCreater:
             Default: False.
         num_worker (int, optional): the number of parallel workers to use.
             Default: 8.
+        packed (bool, optional): Whether to pack the points of all the
+            objects into one file, ``packed_points.bin`` in the database
+            directory, instead of writing one file per object. The infos
+            then record the offset of each object in the file.
+            Default: False.
     """
 
     def __init__(self,
@@ -381,7 +408,8 @@ class GTDatabaseCreater:
                  bev_only=False,
                  coors_range=None,
                  with_mask=False,
-                 num_worker=8) -> None:
+                 num_worker=8,
+                 packed=False) -> None:
         self.dataset_class_name = dataset_class_name
         self.data_path = data_path
         self.info_prefix = info_prefix
@@ -397,6 +425,7 @@ class GTDatabaseCreater:
         self.coors_range = coors_range
         self.with_mask = with_mask
         self.num_worker = num_worker
+        self.packed = packed
         self.pipeline = None
 
     def create_single(self, input_dict):
@@ -470,8 +499,9 @@ class GTDatabaseCreater:
                 mmcv.imwrite(object_img_patches[i], img_patch_path)
                 mmcv.imwrite(object_masks[i], mask_patch_path)
 
-            with open(abs_filepath, 'w') as f:
-                gt_points.tofile(f)
+            if not self.packed:
+                with open(abs_filepath, 'w') as f:
+                    gt_points.tofile(f)
 
             if (self.used_classes is None) or names[i] in self.used_classes:
                 db_info = {
@@ -483,6 +513,10 @@ class GTDatabaseCreater:
                     'num_points_in_gt': gt_points.shape[0],
                     'difficulty': difficulty[i],
                 }
+                if self.packed:
+                    # the points are written to the packed file by the main
+                    # process in `create`
+                    db_info['gt_points'] = gt_points
                 local_group_id = group_ids[i]
                 # if local_group_id >= 0:
                 if local_group_id not in group_dict:
@@ -606,16 +640,29 @@ class GTDatabaseCreater:
         print('Make global unique group id')
         group_counter_offset = 0
         all_db_infos = dict()
+        if self.packed:
+            packed_file = open(
+                osp.join(self.database_save_path, PACKED_FILENAME), 'wb')
+            packed_offset = 0
         for single_db_infos in track_iter_progress(multi_db_infos):
             group_id = -1
             for name, name_db_infos in single_db_infos.items():
                 for db_info in name_db_infos:
                     group_id = max(group_id, db_info['group_id'])
                     db_info['group_id'] += group_counter_offset
+                    if self.packed:
+                        gt_points = db_info.pop('gt_points')
+                        db_info['path'] = osp.join(
+                            f'{self.info_prefix}_gt_database', PACKED_FILENAME)
+                        db_info['offset'] = packed_offset
+                        gt_points.astype(np.float32).tofile(packed_file)
+                        packed_offset += gt_points.shape[0]
                 if name not in all_db_infos:
                     all_db_infos[name] = []
                 all_db_infos[name].extend(name_db_infos)
             group_counter_offset += (group_id + 1)
+        if self.packed:
+            packed_file.close()
 
         for k, v in all_db_infos.items():
             print(f'load {len(v)} {k} database infos')
@@ -6,7 +6,7 @@ import numpy as np
 import torch
 from ts.torch_handler.base_handler import BaseHandler
 
-from mmdet3d.apis import inference_detector, init_model
+from mmdet3d.apis import InferenceSession, init_model
 from mmdet3d.core.points import get_points_type
 
 
@@ -14,7 +14,8 @@ class MMdet3dHandler(BaseHandler):
     """MMDetection3D Handler used in TorchServe.
 
     Handler to load models in MMDetection3D, and it will process data to get
-    predicted results. For now, it only supports SECOND.
+    predicted results. For now, it only supports SECOND. All the requests of
+    a TorchServe batch are forwarded together.
     """
     threshold = 0.5
     load_dim = 4
@@ -41,18 +42,22 @@ class MMdet3dHandler(BaseHandler):
         checkpoint = os.path.join(model_dir, serialized_file)
         self.config_file = os.path.join(model_dir, 'config.py')
         self.model = init_model(self.config_file, checkpoint, self.device)
+        # a TorchServe batch is never larger than the batch size of the model
+        self.session = InferenceSession(
+            self.model, batch_size=max(properties.get('batch_size', 1), 1))
         self.initialized = True
 
     def preprocess(self, data):
         """Preprocess function converts data into LiDARPoints class.
 
         Args:
-            data (List): Input data from the request.
+            data (List): Input data from the requests of the batch.
 
         Returns:
-            `LiDARPoints` : The preprocess function returns the input
-                point cloud data as LiDARPoints class.
+            List[`LiDARPoints`] : The preprocess function returns the input
+                point cloud data of each request as LiDARPoints class.
         """
+        points_list = []
         for row in data:
             # Compat layer: normally the envelope should just return the data
             # directly, but older versions of Torchserve didn't have envelope.
@@ -68,8 +73,9 @@ class MMdet3dHandler(BaseHandler):
                 points,
                 points_dim=points.shape[-1],
                 attribute_dims=self.attribute_dims)
+            points_list.append(points)
 
-        return points
+        return points_list
 
     def inference(self, data):
         """Inference Function.
@@ -78,14 +84,14 @@ class MMdet3dHandler(BaseHandler):
         given input request.
 
         Args:
-            data (`LiDARPoints`): LiDARPoints class passed to make
-                the inference request.
+            data (List[`LiDARPoints`]): LiDARPoints class of each request
+                of the batch, they are forwarded together.
 
         Returns:
-            List(dict) : The predicted result is returned in this function.
+            List(dict) : The predicted result of each request is returned in
+                this function.
         """
-        results, _ = inference_detector(self.model, data)
-        return results
+        return self.session(data)
 
     def postprocess(self, data):
         """Postprocess function.
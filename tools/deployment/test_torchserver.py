@@ -1,4 +1,6 @@
+import time
 from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import requests
@@ -20,6 +22,42 @@ def parse_args():
         '--device', default='cuda:0', help='Device used for inference')
     parser.add_argument(
         '--score-thr', type=float, default=0.5, help='3d bbox score threshold')
+    parser.add_argument(
+        '--benchmark',
+        action='store_true',
+        help='after the check, measure the latency and the throughput of the '
+        'server under load for several batch sizes and batch delays')
+    parser.add_argument(
+        '--management-addr',
+        default='127.0.0.1:8081',
+        help='Address and port of the management API of the server, used to '
+        'register the model with each batch size and batch delay')
+    parser.add_argument(
+        '--model-url',
+        help='url of the model archive, e.g. `second.mar` in the model '
+        'store. Defaults to `${model_name}.mar`')
+    parser.add_argument(
+        '--batch-sizes',
+        type=int,
+        nargs='+',
+        default=[1, 4, 8],
+        help='batch sizes of the model to measure')
+    parser.add_argument(
+        '--max-batch-delays',
+        type=int,
+        nargs='+',
+        default=[10, 50],
+        help='max batch delays (ms) of the model to measure')
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=16,
+        help='number of requests sent concurrently')
+    parser.add_argument(
+        '--num-requests',
+        type=int,
+        default=200,
+        help='number of timed requests per setting')
     args = parser.parse_args()
     return args
 
@@ -30,6 +68,61 @@ def parse_result(input):
     return result
 
 
+def register_model(args, batch_size, max_batch_delay):
+    """Register the model again with the given batching settings."""
+    url = 'http://' + args.management_addr + '/models'
+    requests.delete(f'{url}/{args.model_name}')
+    response = requests.post(
+        url,
+        params=dict(
+            url=args.model_url or f'{args.model_name}.mar',
+            model_name=args.model_name,
+            batch_size=batch_size,
+            max_batch_delay=max_batch_delay,
+            initial_workers=1,
+            synchronous='true'))
+    response.raise_for_status()
+
+
+def run_load(args, data):
+    """Send ``num_requests`` requests, ``concurrency`` at a time.
+
+    Returns:
+        tuple[np.ndarray, float]: Latency of each request in ms and the
+            total time in s.
+    """
+    url = 'http://' + args.inference_addr + '/predictions/' + args.model_name
+
+    def send(_):
+        start_time = time.perf_counter()
+        response = requests.post(url, data)
+        response.raise_for_status()
+        return time.perf_counter() - start_time
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        # warm up the worker
+        list(pool.map(send, range(args.concurrency)))
+        start_time = time.perf_counter()
+        latencies = list(pool.map(send, range(args.num_requests)))
+        total_time = time.perf_counter() - start_time
+    return np.array(latencies) * 1000, total_time
+
+
+def benchmark(args):
+    with open(args.pcd, 'rb') as f:
+        data = f.read()
+    print(f'{args.num_requests} requests, {args.concurrency} concurrent')
+    for batch_size in args.batch_sizes:
+        for max_batch_delay in args.max_batch_delays:
+            register_model(args, batch_size, max_batch_delay)
+            latencies, total_time = run_load(args, data)
+            print(f'batch size {batch_size}, '
+                  f'max batch delay {max_batch_delay} ms: '
+                  f'p50 {np.percentile(latencies, 50):.1f} ms, '
+                  f'p99 {np.percentile(latencies, 99):.1f} ms, '
+                  f'{args.num_requests / total_time:.1f} requests/s')
+
+
 def main(args):
     # build the model from a config file and a checkpoint file
     model = init_model(args.config, args.checkpoint, device=args.device)
@@ -50,6 +143,9 @@ def main(args):
     server_result = parse_result(response.json())
     assert np.allclose(model_result, server_result)
 
+    if args.benchmark:
+        benchmark(args)
+
 
 if __name__ == '__main__':
     args = parse_args()
@@ -0,0 +1,36 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import os.path as osp
+
+import mmcv
+
+from mmdet3d.datasets import dump_info_store
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Convert .pkl info files to memory-mapped info stores')
+    parser.add_argument('infos', nargs='+', help='.pkl info files')
+    parser.add_argument(
+        '--out-dir',
+        help='directory of the info stores, defaults to the directory of '
+        'each info file')
+    parser.add_argument(
+        '--suffix', default='.mmap', help='suffix of the info stores')
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    for info_file in args.infos:
+        out_dir = args.out_dir or osp.dirname(info_file)
+        out_file = osp.join(
+            out_dir,
+            osp.splitext(osp.basename(info_file))[0] + args.suffix)
+        print(f'Converting {info_file} to {out_file}')
+        dump_info_store(mmcv.load(info_file, file_format='pkl'), out_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,7 +12,7 @@ from mmcv.runner import (get_dist_info, init_dist, load_checkpoint,
                          wrap_fp16_model)
 
 import mmdet
-from mmdet3d.apis import single_gpu_test
+from mmdet3d.apis import multi_gpu_stream_test, single_gpu_test
 from mmdet3d.datasets import build_dataloader, build_dataset
 from mmdet3d.models import build_model
 from mmdet.apis import multi_gpu_test, set_random_seed
@@ -68,6 +68,12 @@ def parse_args():
         nargs='+',
         help='evaluation metrics, which depends on the dataset, e.g., "bbox",'
         ' "segm", "proposal" for COCO, and "mAP", "recall" for PASCAL VOC')
+    parser.add_argument(
+        '--stream-eval',
+        action='store_true',
+        help='evaluate the results while testing instead of collecting them '
+        'first (only applicable with --eval, distributed testing is only '
+        'supported by semantic segmentation)')
     parser.add_argument('--show', action='store_true', help='show results')
     parser.add_argument(
         '--show-dir', help='directory where results will be saved')
@@ -139,6 +145,10 @@ def main():
     if args.eval and args.format_only:
         raise ValueError('--eval and --format_only cannot be both specified')
 
+    if args.stream_eval and (not args.eval or args.out):
+        raise ValueError('--stream-eval requires --eval and cannot be used '
+                         'with --out')
+
     if args.out is not None and not args.out.endswith(('.pkl', '.pickle')):
         raise ValueError('The output file must be a pkl file.')
 
@@ -225,6 +235,40 @@ def main():
         # segmentation dataset has `PALETTE` attribute
         model.PALETTE = dataset.PALETTE
 
+    eval_kwargs = cfg.get('evaluation', {}).copy()
+    # hard-code way to remove EvalHook args
+    for key in [
+            'interval', 'tmpdir', 'start', 'gpu_collect', 'save_best', 'rule'
+    ]:
+        eval_kwargs.pop(key, None)
+    kwargs = {} if args.eval_options is None else args.eval_options
+    eval_kwargs.update(dict(metric=args.eval, **kwargs))
+
+    if args.stream_eval:
+        evaluator = dataset.build_evaluator(**eval_kwargs)
+        if not distributed:
+            model = MMDataParallel(model, device_ids=cfg.gpu_ids)
+            single_gpu_test(
+                model,
+                data_loader,
+                args.show,
+                args.show_dir,
+                evaluator=evaluator)
+        else:
+            if not hasattr(evaluator, 'all_reduce'):
+                raise ValueError(
+                    f'{type(evaluator).__name__} does not support '
+                    '--stream-eval in distributed testing')
+            model = MMDistributedDataParallel(
+                model.cuda(),
+                device_ids=[torch.cuda.current_device()],
+                broadcast_buffers=False)
+            multi_gpu_stream_test(model, data_loader, evaluator)
+        rank, _ = get_dist_info()
+        if rank == 0:
+            print(evaluator.compute())
+        return
+
     if not distributed:
         model = MMDataParallel(model, device_ids=cfg.gpu_ids)
         outputs = single_gpu_test(model, data_loader, args.show, args.show_dir)
@@ -241,18 +285,9 @@ def main():
         if args.out:
             print(f'\nwriting results to {args.out}')
             mmcv.dump(outputs, args.out)
-        kwargs = {} if args.eval_options is None else args.eval_options
         if args.format_only:
             dataset.format_results(outputs, **kwargs)
         if args.eval:
-            eval_kwargs = cfg.get('evaluation', {}).copy()
-            # hard-code way to remove EvalHook args
-            for key in [
-                    'interval', 'tmpdir', 'start', 'gpu_collect', 'save_best',
-                    'rule'
-            ]:
-                eval_kwargs.pop(key, None)
-            eval_kwargs.update(dict(metric=args.eval, **kwargs))
             print(dataset.evaluate(outputs, **eval_kwargs))
 
 